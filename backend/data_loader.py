@@ -2,14 +2,19 @@
 Data Loader Script for Space Cargo System
 
 This script loads data from CSV files in the data folder into the database.
-It ensures existing database entries are cleared before loading new data.
+By default it clears existing database entries before loading new data;
+with --upsert it updates rows in place, keyed on the CSV item_id/container_id.
+
+CSV files are read in parallel and rows are written with batched bulk_create
+statements inside a single transaction.
 """
 
 import os
 import csv
 import sys
+import argparse
 import pathlib
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 import django
 
 # Add Django project to path and set up Django
@@ -17,12 +22,24 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'spacecargo.settings')
 django.setup()
 
+from django.db import transaction
+from django.db.models import Q
+
 # Import Django models after setup
 from placement.models import Container, Item, PlacementHistory
 
 # Path to data directory
 DATA_DIR = pathlib.Path(__file__).parent.parent / "data"
 
+# Rows per bulk_create statement
+DEFAULT_BATCH_SIZE = 1000
+
+# Columns an upsert updates: only those read from the CSV, so runtime state
+# (usage counters, placement flags) and defaults edited since the first load
+# are left alone
+CONTAINER_FIELDS = ["width_cm", "height_cm", "depth_cm"]
+ITEM_FIELDS = ["width_cm", "height_cm", "depth_cm", "weight_kg", "priority"]
+
 def reset_database():
     """Clear all existing data in the database and recreate tables."""
     # In Django, we'll just delete all records
@@ -31,127 +48,158 @@ def reset_database():
     PlacementHistory.objects.all().delete()
     print("Database reset complete.")
 
-def load_containers(session=None):
-    """Load containers from CSV files in the data folder."""
-    container_count = 0
-    
-    # First, process containers.csv
+def read_csv_file(file_path):
+    """Read all rows of a CSV file into a list of dictionaries."""
+    with open(file_path, 'r', newline='') as file:
+        return list(csv.DictReader(file))
+
+def read_csv_files(file_paths, workers=None):
+    """Read several CSV files in parallel, returning (path, rows) pairs in input order."""
+    if not file_paths:
+        return []
+    with ThreadPoolExecutor(max_workers=workers or min(len(file_paths), os.cpu_count() or 1)) as executor:
+        return list(zip(file_paths, executor.map(read_csv_file, file_paths)))
+
+def container_from_row(row):
+    """Build an unsaved Container from a CSV row."""
+    return Container(
+        name=row["container_id"],
+        width_cm=int(float(row["width_cm"])),
+        height_cm=int(float(row["height_cm"])),
+        depth_cm=int(float(row["depth_cm"])),
+        max_weight_kg=1000.0,  # Default max weight
+        zone="General",  # Default zone
+        used_volume=0.0,
+        used_weight=0.0,
+        is_full=False
+    )
+
+def item_from_row(row):
+    """Build an unsaved Item from a CSV row."""
+    # Default values for optional fields
+    priority = int(row["priority"]) if "priority" in row and row["priority"] and row["priority"] != "N/A" else 1
+
+    return Item(
+        name=row["item_id"],  # Use item_id as the name
+        width_cm=float(row["width_cm"]),
+        height_cm=float(row["height_cm"]),
+        depth_cm=float(row["depth_cm"]),
+        weight_kg=float(row["mass_kg"]),
+        priority=priority,
+        preferred_zone="General",  # Default zone
+        is_placed=False,
+        sensitive=False  # Default value
+    )
+
+def build_objects(files, key_column, factory, label):
+    """
+    Turn parsed CSV rows into model instances keyed on ``key_column``.
+
+    A key seen again in a later row or file replaces the earlier instance.
+    """
+    objects = {}
+    for file_path, rows in files:
+        file_count = 0
+        for row in rows:
+            try:
+                objects[row[key_column]] = factory(row)
+                file_count += 1
+            except Exception as e:
+                print(f"Error loading {label} {row.get(key_column, 'unknown')} from {file_path}: {e}")
+        print(f"Read {file_count} {label}s from {file_path}")
+    return objects
+
+def save_objects(model, objects, fields, batch_size, upsert):
+    """
+    Write model instances with bulk statements.
+
+    In upsert mode, instances whose name already exists take over that row's
+    primary key and are updated in place; the rest are inserted.
+    """
+    if not upsert:
+        model.objects.bulk_create(list(objects.values()), batch_size=batch_size)
+        return len(objects), 0
+
+    existing = dict(model.objects.filter(name__in=list(objects)).values_list("name", "id"))
+    for name, obj in objects.items():
+        if name in existing:
+            obj.pk = existing[name]
+    # INSERT ... ON CONFLICT (id) DO UPDATE: existing rows are updated by primary key
+    model.objects.bulk_create(
+        list(objects.values()), batch_size=batch_size,
+        update_conflicts=True, unique_fields=["id"], update_fields=fields
+    )
+    updated = sum(1 for name in objects if name in existing)
+    return len(objects) - updated, updated
+
+def container_files():
+    """Container CSV files, with containers.csv first."""
     containers_file = DATA_DIR / "containers.csv"
-    if containers_file.exists():
-        with open(containers_file, 'r', newline='') as file:
-            csv_reader = csv.DictReader(file)
-            for row in csv_reader:
-                try:
-                    # Create container from CSV data - using the correct model attributes
-                    container = Container(
-                        name=row["container_id"],
-                        width_cm=int(float(row["width_cm"])),
-                        height_cm=int(float(row["height_cm"])),
-                        depth_cm=int(float(row["depth_cm"])),
-                        max_weight_kg=1000.0,  # Default max weight
-                        zone="General",  # Default zone
-                        used_volume=0.0,
-                        used_weight=0.0,
-                        is_full=False
-                    )
-                    container.save()
-                    container_count += 1
-                except Exception as e:
-                    print(f"Error loading container {row.get('container_id', 'unknown')}: {e}")
-        
-        print(f"Loaded {container_count} containers from {containers_file}")
-    
-    # Then process any additional container CSV files
-    for file_path in DATA_DIR.glob("*container*.csv"):
-        if file_path != containers_file:  # Skip if it's the main containers.csv we already processed
-            with open(file_path, 'r', newline='') as file:
-                csv_reader = csv.DictReader(file)
-                file_container_count = 0
-                for row in csv_reader:
-                    try:
-                        # Create container from CSV data - using the correct model attributes
-                        container = Container(
-                            name=row["container_id"],
-                            width_cm=int(float(row["width_cm"])),
-                            height_cm=int(float(row["height_cm"])),
-                            depth_cm=int(float(row["depth_cm"])),
-                            max_weight_kg=1000.0,  # Default max weight
-                            zone="General",  # Default zone
-                            used_volume=0.0,
-                            used_weight=0.0,
-                            is_full=False
-                        )
-                        container.save()
-                        container_count += 1
-                        file_container_count += 1
-                    except Exception as e:
-                        print(f"Error loading container {row.get('container_id', 'unknown')} from {file_path}: {e}")
-                
-                print(f"Loaded {file_container_count} containers from {file_path}")
-    
-    return container_count
-
-def load_items(session=None):
-    """Load items from CSV files in the data folder."""
-    item_count = 0
-    
-    # Process items CSV files
-    for file_path in DATA_DIR.glob("*item*.csv"):
-        with open(file_path, 'r', newline='') as file:
-            csv_reader = csv.DictReader(file)
-            file_item_count = 0
-            for row in csv_reader:
-                try:
-                    # Default values for optional fields
-                    priority = int(row["priority"]) if "priority" in row and row["priority"] and row["priority"] != "N/A" else 1
-                    
-                    # Create item from CSV data - using the correct field names that match the Item model
-                    item = Item(
-                        name=row["item_id"],  # Use item_id as the name
-                        width_cm=float(row["width_cm"]),
-                        height_cm=float(row["height_cm"]),
-                        depth_cm=float(row["depth_cm"]),
-                        weight_kg=float(row["mass_kg"]),
-                        priority=priority,
-                        preferred_zone="General",  # Default zone
-                        is_placed=False,
-                        sensitive=False  # Default value
-                    )
-                    item.save()
-                    item_count += 1
-                    file_item_count += 1
-                except Exception as e:
-                    print(f"Error loading item {row.get('name', 'unknown')} ({row.get('item_id', 'unknown')}) from {file_path}: {e}")
-            
-            print(f"Loaded {file_item_count} items from {file_path}")
-    
-    return item_count
-
-def main():
+    others = sorted(p for p in DATA_DIR.glob("*container*.csv") if p != containers_file)
+    return ([containers_file] if containers_file.exists() else []) + others
+
+def item_files():
+    """Item CSV files in the data folder."""
+    return sorted(DATA_DIR.glob("*item*.csv"))
+
+def load_data(batch_size=DEFAULT_BATCH_SIZE, upsert=False, workers=None):
+    """
+    Load containers and items from the data folder in one transaction.
+
+    Returns:
+        Dictionary of created/updated counts per model
+    """
+    containers_paths = container_files()
+    parsed = read_csv_files(containers_paths + item_files(), workers)
+    containers = build_objects(parsed[:len(containers_paths)], "container_id", container_from_row, "container")
+    items = build_objects(parsed[len(containers_paths):], "item_id", item_from_row, "item")
+
+    with transaction.atomic():
+        if not upsert:
+            reset_database()
+        containers_created, containers_updated = save_objects(Container, containers, CONTAINER_FIELDS, batch_size, upsert)
+        items_created, items_updated = save_objects(Item, items, ITEM_FIELDS, batch_size, upsert)
+        if upsert:
+            # bulk_create bypasses Item.save(), so rebuild the usage counters of
+            # containers whose size or whose items' size or weight was just updated
+            Container.objects.filter(
+                Q(name__in=list(containers)) | Q(items__name__in=list(items))
+            ).reconcile_usage()
+
+    return {
+        "containers_created": containers_created,
+        "containers_updated": containers_updated,
+        "items_created": items_created,
+        "items_updated": items_updated
+    }
+
+def main(argv=None):
     """Main function to load all data."""
+    parser = argparse.ArgumentParser(description="Load CSV data into the database")
+    parser.add_argument("--upsert", action="store_true",
+                        help="update existing rows by item_id/container_id instead of resetting the database")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="rows per bulk insert/update statement")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="threads used to read CSV files")
+    args = parser.parse_args(argv)
+
     print(f"Loading data from {DATA_DIR}")
-    
+
     # Check if data directory exists
     if not DATA_DIR.exists():
         print(f"Error: Data directory {DATA_DIR} does not exist.")
         return
-    
-    # Reset database (clear existing data)
-    reset_database()
-    
+
     try:
-        # Load containers first
-        container_count = load_containers()
-        
-        # Load items
-        item_count = load_items()
-        
+        counts = load_data(batch_size=args.batch_size, upsert=args.upsert, workers=args.workers)
+
         print(f"\nData loading complete:")
-        print(f"- {container_count} containers loaded")
-        print(f"- {item_count} items loaded")
-        
+        print(f"- {counts['containers_created']} containers loaded, {counts['containers_updated']} updated")
+        print(f"- {counts['items_created']} items loaded, {counts['items_updated']} updated")
+
     except Exception as e:
         print(f"Error loading data: {e}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
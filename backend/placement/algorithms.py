@@ -3,18 +3,46 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import json
 import logging
 import os
+import time
 from pathlib import Path
 from django.conf import settings
 
+from . import export
+from .expiry_index import ExpiryIndex, remember
+from .importer import atomic_write_csv, atomic_write_json
+from .metrics import STAGE_LATENCY, timed_stage
+from .recommendations import DEFAULT_TOP_K, RecommendationEngine
+from .simulation import SimulationEngine
+from .statistics import PlacementStatistics
+from .trace import get_tracer
+from .undocking import DEFAULT_OBJECTIVE, ReturnPlanner
+
 logger = logging.getLogger(__name__)
+load_trace = get_tracer('load')
+results_trace = get_tracer('results')
+stats_trace = get_tracer('stats')
+
+
+# Latest return plan, kept until the undocking it describes is completed
+RETURN_PLAN_FILE = 'return_plan.json'
+
+
+def _column_filter(columns):
+    """``usecols`` for read_csv: None reads everything, unknown names are ignored."""
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return lambda column: column in wanted
 
 class PlacementManager:
     def __init__(self):
         self.data_dir = getattr(settings, 'DATA_DIR', Path(__file__).resolve().parent.parent.parent / 'data')
         self.data_dir.mkdir(exist_ok=True)
         
+    @timed_stage('load')
     def load_from_csv(self, items_path=None, containers_path=None):
         """Load data from CSV files in the data directory."""
         if not items_path:
@@ -22,24 +50,23 @@ class PlacementManager:
         if not containers_path:
             containers_path = self.data_dir / 'containers.csv'
         
-        print(f"DEBUG: Looking for items at {items_path}")
-        print(f"DEBUG: Looking for containers at {containers_path}")
+        load_trace.debug(lambda: f"Looking for items at {items_path}")
+        load_trace.debug(lambda: f"Looking for containers at {containers_path}")
         
         if not items_path.exists() or not containers_path.exists():
             logger.warning(f"CSV files not found: {items_path} or {containers_path}")
-            print(f"DEBUG: CSV files not found: {items_path} or {containers_path}")
             return None, None
         
         try:
             # Load items data
             items_df = pd.read_csv(items_path)
-            print(f"DEBUG: Loaded items: {len(items_df)} items")
-            print(f"DEBUG: Items columns: {items_df.columns.tolist()}")
-            print(f"DEBUG: First few items: {items_df.head().to_dict()}")
+            load_trace.debug(lambda: f"Loaded items: {len(items_df)} items")
+            load_trace.debug(lambda: f"Items columns: {items_df.columns.tolist()}")
+            load_trace.debug(lambda: f"First few items: {items_df.head().to_dict()}")
             
             # Check if mass_kg exists but weight_kg doesn't, and rename if needed
             if 'mass_kg' in items_df.columns and 'weight_kg' not in items_df.columns:
-                print(f"DEBUG: Renaming mass_kg to weight_kg")
+                load_trace.debug("Renaming mass_kg to weight_kg")
                 items_df = items_df.rename(columns={'mass_kg': 'weight_kg'})
             
             # Ensure required columns exist
@@ -47,31 +74,29 @@ class PlacementManager:
             for col in required_item_columns:
                 if col not in items_df.columns:
                     logger.error(f"Missing required column in items CSV: {col}")
-                    print(f"DEBUG: Missing required column in items CSV: {col}")
                     return None, None
             
             # Load containers data
             containers_df = pd.read_csv(containers_path)
-            print(f"DEBUG: Loaded containers: {len(containers_df)} containers")
-            print(f"DEBUG: Containers columns: {containers_df.columns.tolist()}")
-            print(f"DEBUG: First few containers: {containers_df.head().to_dict()}")
+            load_trace.debug(lambda: f"Loaded containers: {len(containers_df)} containers")
+            load_trace.debug(lambda: f"Containers columns: {containers_df.columns.tolist()}")
+            load_trace.debug(lambda: f"First few containers: {containers_df.head().to_dict()}")
             
             # Ensure required columns exist
             required_container_columns = ['container_id', 'width_cm', 'height_cm', 'depth_cm', 'zone']
             for col in required_container_columns:
                 if col not in containers_df.columns:
                     logger.error(f"Missing required column in containers CSV: {col}")
-                    print(f"DEBUG: Missing required column in containers CSV: {col}")
                     return None, None
             
             # Add max_weight_kg if missing
             if 'max_weight_kg' not in containers_df.columns:
-                print(f"DEBUG: Adding max_weight_kg column with default value 1000")
+                load_trace.debug("Adding max_weight_kg column with default value 1000")
                 containers_df['max_weight_kg'] = 1000
             
             # Add container name if missing
             if 'name' not in containers_df.columns:
-                print(f"DEBUG: Adding name column based on container_id")
+                load_trace.debug("Adding name column based on container_id")
                 containers_df['name'] = containers_df['container_id'].apply(lambda x: f"Container {x}")
             
             # Calculate volumes
@@ -92,9 +117,9 @@ class PlacementManager:
             return items_df, containers_df
         except Exception as e:
             logger.error(f"Error loading CSV files: {str(e)}")
-            print(f"DEBUG: Error loading CSV files: {str(e)}")
             return None, None
     
+    @timed_stage('preprocess')
     def preprocess_data(self, items_df, containers_df):
         """Preprocess items and containers data."""
         # Standardize column names
@@ -119,6 +144,7 @@ class PlacementManager:
         
         return items_df, containers_df
     
+    @timed_stage('sensitivity')
     def calculate_sensitivity(self, items_df):
         """Calculate item sensitivity based on name similarity."""
         from sklearn.feature_extraction.text import TfidfVectorizer
@@ -144,6 +170,8 @@ class PlacementManager:
         # Preprocess data
         items_df, containers_df = self.preprocess_data(items_df, containers_df)
         
+        pack_started = time.perf_counter()
+        
         # Sort items by priority (highest first), then by expiry date (closest first)
         sorted_items = items_df.copy()
         if 'priority' in sorted_items.columns:
@@ -289,24 +317,26 @@ class PlacementManager:
         # Create DataFrames from results
         placements_df = pd.DataFrame(placements)
         unplaced_df = sorted_items[sorted_items['item_id'].isin(unplaced_items)]
+        STAGE_LATENCY.observe(time.perf_counter() - pack_started, stage='pack')
         
         # Save results to CSV
-        if not placements_df.empty:
-            placements_df.to_csv(self.data_dir / 'placed_items.csv', index=False)
-        
-        if not unplaced_df.empty:
-            unplaced_df.to_csv(self.data_dir / 'unplaced_items.csv', index=False)
+        with STAGE_LATENCY.time(stage='persist'):
+            if not placements_df.empty:
+                placements_df.to_csv(self.data_dir / 'placed_items.csv', index=False)
+            
+            if not unplaced_df.empty:
+                unplaced_df.to_csv(self.data_dir / 'unplaced_items.csv', index=False)
         
         return placements_df, unplaced_df
     
     def get_placement_efficiency(self):
         """Calculate the efficiency metrics of current placement arrangement."""
         try:
-            print("DEBUG: Starting get_placement_efficiency")
+            stats_trace.debug("Starting get_placement_efficiency")
             # Load data
             items_df, containers_df = self.load_from_csv()
             if items_df is None or containers_df is None:
-                print("DEBUG: Failed to load items or containers data")
+                stats_trace.warning("Failed to load items or containers data")
                 return {
                     "success": False,
                     "message": "Failed to load data from CSV files",
@@ -315,104 +345,18 @@ class PlacementManager:
             
             # Load placement results
             placements_df, unplaced_df = self.load_results()
-            print(f"DEBUG: Placements: {placements_df}")
-            # Calculate basic metrics
-            total_items = len(items_df)
-            print(f"DEBUG: Total items: {total_items}")
-            placed_items = len(placements_df) if placements_df is not None else 0
-            print(f"DEBUG: Placed items: {placed_items}")
-            unplaced_items = total_items - placed_items
-            print(f"DEBUG: Unplaced items: {unplaced_items}")
-            
-            # Calculate placement rate
-            placement_rate = (placed_items / total_items * 100) if total_items > 0 else 0
-            print(f"DEBUG: Placement rate: {placement_rate}%")
-            
-            # Calculate volume utilization
-            total_container_volume = containers_df['volume'].sum()
-            print(f"DEBUG: Total container volume: {total_container_volume}")
-            used_volume = 0
-            container_utilization = []
-            
-            if placements_df is not None and not placements_df.empty:
-                # Fix: Convert container_id to string if needed to ensure type matching
-                if 'container_id' in placements_df.columns:
-                    placements_df['container_id'] = placements_df['container_id'].astype(str)
-                
-                # Calculate the total volume used by all placed items
-                for _, item in placements_df.iterrows():
-                    item_volume = item['width_cm'] * item['depth_cm'] * item['height_cm']
-                    used_volume += item_volume
-                    print(f"DEBUG: Added item volume: {item_volume}, total used volume now: {used_volume}")
-                
-                # Process each container
-                for _, container in containers_df.iterrows():
-                    container_id = str(container['container_id'])
-                    container_volume = container['volume']
-                    print(f"DEBUG: Processing container {container_id} with volume {container_volume}")
-                    
-                    # Find items in this container
-                    container_items = placements_df[placements_df['container_id'].astype(str) == container_id]
-                    print(f"DEBUG: Container {container_id} has {len(container_items)} items")
-                    
-                    # Calculate volume used in this container
-                    container_used_volume = 0
-                    for _, item in container_items.iterrows():
-                        item_volume = item['width_cm'] * item['depth_cm'] * item['height_cm']
-                        container_used_volume += item_volume
-                        print(f"DEBUG: Item volume: {item_volume}, container used volume now: {container_used_volume}")
-                    
-                    # Calculate utilization for this container
-                    container_util = (container_used_volume / container_volume * 100) if container_volume > 0 else 0
-                    print(f"DEBUG: Container {container_id} used volume: {container_used_volume}")
-                    print(f"DEBUG: Container {container_id} utilization: {container_util}%")
-                    
-                    container_utilization.append({
-                        "container_id": container_id,
-                        "name": container.get('name', f"Container {container_id}"),
-                        "zone": container['zone'],
-                        "volume_cm3": float(container_volume),
-                        "used_volume_cm3": float(container_used_volume),
-                        "utilization_percent": float(container_util)
-                    })
-            else:
-                # If no placements, set all containers to 0 utilization
-                for _, container in containers_df.iterrows():
-                    container_id = str(container['container_id'])
-                    container_volume = container['volume']
-                    container_utilization.append({
-                        "container_id": container_id,
-                        "name": container.get('name', f"Container {container_id}"),
-                        "zone": container['zone'],
-                        "volume_cm3": float(container_volume),
-                        "used_volume_cm3": 0.0,
-                        "utilization_percent": 0.0
-                    })
-            
-            # Calculate overall volume utilization
-            volume_utilization = (used_volume / total_container_volume * 100) if total_container_volume > 0 else 0
-            print(f"DEBUG: Overall volume utilization: {volume_utilization}%")
-            
+
+            # Totals, per-zone and per-container utilization in one vectorized pass
+            statistics = PlacementStatistics(containers_df, placements_df, total_items=len(items_df))
             result = {
                 "success": True,
-                "statistics": {
-                    "total_items": int(total_items),
-                    "placed_items": int(placed_items),
-                    "unplaced_items": int(unplaced_items),
-                    "placement_rate_percent": float(placement_rate),
-                    "volume_utilization_percent": float(volume_utilization),
-                    "total_container_volume_cm3": float(total_container_volume),
-                    "used_volume_cm3": float(used_volume),
-                    "container_utilization": container_utilization
-                }
+                "statistics": statistics.summary()
             }
-            print(f"DEBUG: Returning result: {result}")
             return result
         except Exception as e:
             logger.error(f"Error calculating placement efficiency: {str(e)}")
-            print(f"DEBUG: Error calculating placement efficiency: {str(e)}")
             import traceback
-            print(f"DEBUG: Traceback: {traceback.format_exc()}")
+            stats_trace.debug(lambda: f"Traceback: {traceback.format_exc()}")
             return {
                 "success": False,
                 "message": f"Error calculating statistics: {str(e)}",
@@ -426,8 +370,8 @@ class PlacementManager:
         alt_placed_path = self.data_dir / 'placement_results.csv'
         unplaced_path = self.data_dir / 'unplaced_items.csv'
         
-        print(f"DEBUG: Looking for placed items at {placed_path} or {alt_placed_path}")
-        print(f"DEBUG: Looking for unplaced items at {unplaced_path}")
+        results_trace.debug(lambda: f"Looking for placed items at {placed_path} or {alt_placed_path}")
+        results_trace.debug(lambda: f"Looking for unplaced items at {unplaced_path}")
         
         placements_df = None
         unplaced_df = None
@@ -436,282 +380,165 @@ class PlacementManager:
         if placed_path.exists():
             try:
                 placements_df = pd.read_csv(placed_path)
-                print(f"DEBUG: Loaded placed items from {placed_path}: {len(placements_df)} items")
-                print(f"DEBUG: Placed items columns: {placements_df.columns.tolist()}")
-                print(f"DEBUG: First few placed items: {placements_df.head().to_dict()}")
+                results_trace.debug(lambda: f"Loaded placed items from {placed_path}: {len(placements_df)} items")
+                results_trace.debug(lambda: f"Placed items columns: {placements_df.columns.tolist()}")
+                results_trace.debug(lambda: f"First few placed items: {placements_df.head().to_dict()}")
             except Exception as e:
                 logger.error(f"Error loading placed items from {placed_path}: {str(e)}")
-                print(f"DEBUG: Error loading placed items from {placed_path}: {str(e)}")
         
         # If not found, try the alternative filename
         elif alt_placed_path.exists():
             try:
                 placements_df = pd.read_csv(alt_placed_path)
-                print(f"DEBUG: Loaded placed items from {alt_placed_path}: {len(placements_df)} items")
-                print(f"DEBUG: Placed items columns: {placements_df.columns.tolist()}")
-                print(f"DEBUG: First few placed items: {placements_df.head().to_dict()}")
+                results_trace.debug(lambda: f"Loaded placed items from {alt_placed_path}: {len(placements_df)} items")
+                results_trace.debug(lambda: f"Placed items columns: {placements_df.columns.tolist()}")
+                results_trace.debug(lambda: f"First few placed items: {placements_df.head().to_dict()}")
             except Exception as e:
                 logger.error(f"Error loading placed items from {alt_placed_path}: {str(e)}")
-                print(f"DEBUG: Error loading placed items from {alt_placed_path}: {str(e)}")
         else:
-            print(f"DEBUG: Placed items file not found at {placed_path} or {alt_placed_path}")
+            results_trace.debug(lambda: f"Placed items file not found at {placed_path} or {alt_placed_path}")
         
         if unplaced_path.exists():
             try:
                 unplaced_df = pd.read_csv(unplaced_path)
-                print(f"DEBUG: Loaded unplaced items: {len(unplaced_df)} items")
-                print(f"DEBUG: Unplaced items columns: {unplaced_df.columns.tolist()}")
-                print(f"DEBUG: First few unplaced items: {unplaced_df.head().to_dict()}")
+                results_trace.debug(lambda: f"Loaded unplaced items: {len(unplaced_df)} items")
+                results_trace.debug(lambda: f"Unplaced items columns: {unplaced_df.columns.tolist()}")
+                results_trace.debug(lambda: f"First few unplaced items: {unplaced_df.head().to_dict()}")
             except Exception as e:
                 logger.error(f"Error loading unplaced items: {str(e)}")
-                print(f"DEBUG: Error loading unplaced items: {str(e)}")
         else:
-            print(f"DEBUG: Unplaced items file not found at {unplaced_path}")
+            results_trace.debug(lambda: f"Unplaced items file not found at {unplaced_path}")
         
         return placements_df, unplaced_df
     
-    def get_recommendations(self):
-        """Get placement recommendations for unplaced items."""
+    def get_recommendations(self, top_k=DEFAULT_TOP_K):
+        """Get ranked placement recommendations for unplaced items."""
         items_df, containers_df = self.load_from_csv()
         placements_df, unplaced_df = self.load_results()
         
         if items_df is None or containers_df is None or unplaced_df is None or unplaced_df.empty:
             return []
         
-        recommendations = []
-        
-        for _, item in unplaced_df.iterrows():
-            item_id = item['item_id']
-            item_volume = item['width_cm'] * item['depth_cm'] * item['height_cm']
-            preferred_zone = item.get('preferred_zone')
-            
-            # First try preferred zone
-            best_container_id = None
-            best_utilization = float('inf')
-            best_reasoning = ""
-            zone_match = False
-            
-            # Filter containers that can fit the item
-            valid_containers = []
-            
-            for _, container in containers_df.iterrows():
-                container_id = container['container_id']
-                container_volume = container['volume']
-                container_zone = container['zone']
-                
-                # Calculate current utilization
-                current_utilization = 0
-                if placements_df is not None:
-                    container_placements = placements_df[placements_df['container_id'] == container_id]
-                    for _, placement in container_placements.iterrows():
-                        current_utilization += placement['width_cm'] * placement['depth_cm'] * placement['height_cm']
-                
-                remaining_volume = container_volume - current_utilization
-                
-                if remaining_volume >= item_volume:
-                    valid_containers.append({
-                        'container_id': container_id,
-                        'container_name': container.get('name', f"Container {container_id}"),
-                        'zone': container_zone,
-                        'remaining_volume': remaining_volume,
-                        'utilization': current_utilization / container_volume if container_volume > 0 else 0
-                    })
-            
-            # Find best container
-            if valid_containers:
-                # First try preferred zone
-                preferred_containers = [c for c in valid_containers if c['zone'] == preferred_zone]
-                
-                if preferred_containers:
-                    # Sort by utilization (choose one with highest utilization to maximize space efficiency)
-                    preferred_containers.sort(key=lambda x: x['utilization'], reverse=True)
-                    best_container = preferred_containers[0]
-                    best_container_id = best_container['container_id']
-                    best_reasoning = f"Container is in the preferred zone ({preferred_zone})"
-                    zone_match = True
-                else:
-                    # Sort all containers by remaining volume (choose smallest that can fit)
-                    valid_containers.sort(key=lambda x: x['remaining_volume'])
-                    best_container = valid_containers[0]
-                    best_container_id = best_container['container_id']
-                    best_reasoning = f"No containers available in preferred zone ({preferred_zone}). Selected container in zone {best_container['zone']} with sufficient space."
-            
-            if best_container_id:
-                score = 100 if zone_match else 70
-                recommendations.append({
-                    "item_id": item_id,
-                    "item_name": item['name'],
-                    "container_id": best_container_id,
-                    "container_name": next((c['container_name'] for c in valid_containers if c['container_id'] == best_container_id), ""),
-                    "reasoning": best_reasoning,
-                    "score": score
-                })
-        
-        # Sort recommendations by score
-        recommendations.sort(key=lambda x: x["score"], reverse=True)
-        
-        return recommendations
+        return RecommendationEngine(containers_df, placements_df, items_df).recommend(unplaced_df, top_k=top_k)
     
-    def identify_waste(self):
-        """Identify expired items and items with zero uses left."""
-        print("DEBUG: identify_waste called")
-        items_df, _ = self.load_from_csv()
-        
-        # Try to load placement data directly from CSV files
-        placed_path = self.data_dir / 'placed_items.csv'
-        print(f"DEBUG: Looking for placed items at {placed_path}")
-        
-        placements_df = None
-        if placed_path.exists():
-            try:
-                placements_df = pd.read_csv(placed_path)
-                print(f"DEBUG: Loaded placed items: {len(placements_df)} items")
-            except Exception as e:
-                print(f"DEBUG: Error loading placed items: {str(e)}")
-                logger.error(f"Error loading placed items: {str(e)}")
-        
-        if items_df is None or placements_df is None:
-            print("DEBUG: No items or placements data found")
+    def identify_waste(self, as_of=None):
+        """
+        Identify expired items and items with zero uses left.
+
+        ``as_of`` defaults to today; passing a future date answers which
+        placed items will have become waste by then.
+        """
+        index = self.get_expiry_index()
+        if index is None:
+            logger.warning("No items or placements data found for waste identification")
             return []
-        
-        waste_items = []
-        today = datetime.now().date()
-        print(f"DEBUG: Today's date: {today}")
-        
-        for _, item in items_df.iterrows():
-            item_id = item['item_id']
-            
-            # Check if item is placed
-            if placements_df is not None and item_id in placements_df['item_id'].values:
-                placement = placements_df[placements_df['item_id'] == item_id].iloc[0]
-                container_id = placement['container_id']
-                position = (placement['x_cm'], placement['y_cm'], placement['z_cm'])
-                
-                should_add = False
-                reason = ""
-                
-                # Check expiry date if column exists
-                if 'expiry_date' in items_df.columns and pd.notna(item.get('expiry_date')):
-                    try:
-                        expiry_date = pd.to_datetime(item['expiry_date']).date()
-                        print(f"DEBUG: Item {item_id} expiry date: {expiry_date}")
-                        if expiry_date <= today:
-                            should_add = True
-                            reason = "Expired"
-                    except Exception as e:
-                        print(f"DEBUG: Error processing expiry date for item {item_id}: {str(e)}")
-                
-                # Check usage limit if column exists
-                if 'usage_limit' in items_df.columns and pd.notna(item.get('usage_limit')):
-                    if int(item['usage_limit']) <= 0:
-                        should_add = True
-                        reason = "Out of Uses"
-                
-                if should_add:
-                    print(f"DEBUG: Adding item {item_id} as waste with reason: {reason}")
-                    waste_items.append({
-                        "item_id": item_id,
-                        "name": item['name'],
-                        "reason": reason,
-                        "containerId": container_id,
-                        "position": {
-                            "startCoordinates": {
-                                "width": position[0],
-                                "depth": position[1],
-                                "height": position[2]
-                            },
-                            "endCoordinates": {
-                                "width": position[0] + item['width_cm'],
-                                "depth": position[1] + item['depth_cm'],
-                                "height": position[2] + item['height_cm']
-                            }
-                        }
-                    })
-        
-        print(f"DEBUG: Found {len(waste_items)} waste items")
-        return waste_items
+        return index.waste_as_of(as_of)
     
-    def simulate_days(self, num_days, items_to_use=None):
-        """Simulate the passage of time and track expiration and usage."""
-        items_df, _ = self.load_from_csv()
-        
-        if items_df is None:
+    @timed_stage('return_plan')
+    def plan_return(self, undocking_container_id, undocking_date, max_weight, objective=DEFAULT_OBJECTIVE):
+        """
+        Choose the waste items (as of ``undocking_date``) that fill the
+        undocking container up to ``max_weight`` and plan their retrieval.
+        The plan is kept for ``complete_undocking``.
+        """
+        items_path = self.data_dir / 'input_items.csv'
+        placement_path = self._placement_path()
+        if not items_path.exists() or placement_path is None:
+            return {"success": False, "message": "No items or placements data found"}
+
+        items_df = pd.read_csv(items_path, usecols=_column_filter(
+            ['item_id', 'name', 'width_cm', 'depth_cm', 'height_cm', 'mass_kg', 'weight_kg']))
+        arrangement_df = pd.concat(export.iter_arrangement(placement_path, items_path), ignore_index=True)
+        waste_items = self.identify_waste(undocking_date)
+
+        plan = ReturnPlanner(items_df, arrangement_df).plan(
+            waste_items, undocking_container_id, undocking_date, max_weight, objective=objective)
+        item_ids = plan.pop('itemIds')
+        atomic_write_json({'undockingContainerId': str(undocking_container_id), 'itemIds': item_ids},
+                          self.data_dir / RETURN_PLAN_FILE)
+        return plan
+    
+    def complete_undocking(self, undocking_container_id):
+        """
+        Remove the items of the stored return plan from the items and
+        placement files, one rewrite per file, and from the expiry index.
+        """
+        plan_path = self.data_dir / RETURN_PLAN_FILE
+        plan = json.loads(plan_path.read_text()) if plan_path.exists() else None
+        if plan is None or plan['undockingContainerId'] != str(undocking_container_id):
+            return {
+                "success": False,
+                "message": f"No return plan for container {undocking_container_id}",
+                "itemsRemoved": 0
+            }
+
+        item_ids = set(plan['itemIds'])
+        index = self.get_expiry_index()
+        items_path = self.data_dir / 'input_items.csv'
+        removed = set()
+        for path in (items_path, self.data_dir / 'placed_items.csv', self.data_dir / 'placement_results.csv'):
+            if not path.exists():
+                continue
+            # Read as text so the remaining rows are written back unchanged
+            frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+            matched = frame['item_id'].str.strip().isin(item_ids)
+            if matched.any():
+                removed.update(frame.loc[matched, 'item_id'].str.strip())
+                atomic_write_csv(frame[~matched], path)
+
+        if index is not None:
+            remember(index.without(item_ids), items_path, self._placement_path())
+        plan_path.unlink()
+        logger.info(f"Undocked {len(removed)} items with container {undocking_container_id}")
+        return {
+            "success": True,
+            "message": f"Removed {len(removed)} waste items with container {undocking_container_id}",
+            "itemsRemoved": len(removed)
+        }
+    
+    def get_expiry_index(self):
+        """Return the expiry index for the current items and placement CSVs."""
+        return ExpiryIndex.from_csv(self.data_dir / 'input_items.csv', self._placement_path())
+    
+    def _placement_path(self):
+        """Return the placement results file in use, preferring placed_items.csv."""
+        for name in ('placed_items.csv', 'placement_results.csv'):
+            path = self.data_dir / name
+            if path.exists():
+                return path
+        return None
+    
+    def simulate_days(self, num_days=None, items_to_use=None, to_timestamp=None):
+        """
+        Simulate the passage of time and track expiration and usage.
+
+        ``items_to_use`` is a usage schedule (see ``SimulationEngine``); entries
+        without a ``day`` are used on every simulated day. When ``to_timestamp``
+        is given it overrides ``num_days``.
+        """
+        items_path = self.data_dir / 'input_items.csv'
+        if not items_path.exists():
             return {
                 "success": False,
                 "message": "No items data found"
             }
+        # Keep placeholders such as "N/A" verbatim so the file round-trips unchanged
+        items_df = pd.read_csv(items_path, keep_default_na=False, na_values=[''])
         
-        # Convert today's date
         today = datetime.now()
-        new_date = today + timedelta(days=num_days)
-        
-        # Track changes
-        items_used = []
-        items_expired = []
-        items_depleted = []
-        
-        # Get copies to modify
-        modified_items = items_df.copy()
-        
-        # Process item usage
-        if items_to_use:
-            for item_to_use in items_to_use:
-                item_id = item_to_use.get('item_id')
-                if item_id:
-                    # Find the item in the dataframe
-                    item_idx = modified_items[modified_items['item_id'] == item_id].index
-                    
-                    if not item_idx.empty:
-                        idx = item_idx[0]
-                        # Reduce usage limit if it exists
-                        if 'usage_limit' in modified_items.columns:
-                            current_uses = modified_items.at[idx, 'usage_limit']
-                            
-                            if pd.notna(current_uses) and current_uses > 0:
-                                # Decrement usage
-                                modified_items.at[idx, 'usage_limit'] = current_uses - 1
-                                
-                                items_used.append({
-                                    "item_id": item_id,
-                                    "name": modified_items.at[idx, 'name'],
-                                    "remaining_uses": current_uses - 1
-                                })
-                                
-                                # Check if depleted
-                                if current_uses - 1 == 0:
-                                    items_depleted.append({
-                                        "item_id": item_id,
-                                        "name": modified_items.at[idx, 'name']
-                                    })
-        
-        # Process expirations
-        for idx, item in modified_items.iterrows():
-            if 'expiry_date' in item and pd.notna(item['expiry_date']):
-                try:
-                    expiry_date = pd.to_datetime(item['expiry_date']).date()
-                    new_date_only = new_date.date()
-                    
-                    # Today < expiry date <= new date
-                    if today.date() < expiry_date <= new_date_only:
-                        items_expired.append({
-                            "item_id": item['item_id'],
-                            "name": item['name']
-                        })
-                except:
-                    pass
-        
-        # Save modified items back to CSV
-        modified_items.to_csv(self.data_dir / 'input_items.csv', index=False)
+        if to_timestamp is not None:
+            num_days = (pd.Timestamp(to_timestamp).date() - today.date()).days
         
-        return {
-            "success": True,
-            "newDate": new_date.strftime('%Y-%m-%d'),
-            "changes": {
-                "itemsUsed": items_used,
-                "itemsExpired": items_expired,
-                "itemsDepletedToday": items_depleted
-            }
-        }
+        engine = SimulationEngine(items_df)
+        result = engine.run(today, num_days or 0, items_to_use)
+        
+        # Only rewrite the items file when some usage was actually applied
+        if result["changes"]["itemsUsed"]:
+            updated = [format(uses, '.15g') for uses in engine.usage]
+            items_df['usage_limit'] = np.where(np.isnan(engine.usage), items_df['usage_limit'].astype(object), updated)
+            items_df.to_csv(items_path, index=False)
+        
+        return {"success": True, **result}
     
     def generate_log(self, action_type, user_id, item_id, details=None):
         """Generate a log entry for an action."""
@@ -768,76 +595,69 @@ class PlacementManager:
             logger.error(f"Error loading logs: {str(e)}")
             return []
     
-    def load_containers(self):
-        """Load containers data from CSV."""
+    def load_containers(self, columns=None):
+        """Load containers data from CSV, optionally reading only ``columns``."""
         try:
             containers_path = self.data_dir / 'containers.csv'
             
             if not containers_path.exists():
                 logger.warning(f"Containers file not found: {containers_path}")
-                print(f"DEBUG: Containers file not found: {containers_path}")
                 return None
             
-            containers_df = pd.read_csv(containers_path)
-            print(f"DEBUG: Loaded containers: {len(containers_df)} containers")
+            containers_df = pd.read_csv(containers_path, usecols=_column_filter(columns))
+            load_trace.debug(lambda: f"Loaded containers: {len(containers_df)} containers")
             
             return containers_df
         except Exception as e:
             logger.error(f"Error loading containers: {str(e)}")
-            print(f"DEBUG: Error loading containers: {str(e)}")
             return None
     
-    def load_items(self):
-        """Load items data from CSV."""
+    def load_items(self, columns=None):
+        """Load items data from CSV, optionally reading only ``columns``."""
         try:
             items_path = self.data_dir / 'input_items.csv'
             
             if not items_path.exists():
                 logger.warning(f"Items file not found: {items_path}")
-                print(f"DEBUG: Items file not found: {items_path}")
                 return None
             
-            items_df = pd.read_csv(items_path)
-            print(f"DEBUG: Loaded items: {len(items_df)} items")
+            items_df = pd.read_csv(items_path, usecols=_column_filter(columns))
+            load_trace.debug(lambda: f"Loaded items: {len(items_df)} items")
             
             return items_df
         except Exception as e:
             logger.error(f"Error loading items: {str(e)}")
-            print(f"DEBUG: Error loading items: {str(e)}")
             return None
     
-    def load_placement(self):
-        """Load placement data from CSV."""
+    def load_placement(self, columns=None):
+        """Load placement data from CSV, optionally reading only ``columns``."""
         try:
             # Check both possible filenames for placements
             placed_path = self.data_dir / 'placed_items.csv'
             alt_placed_path = self.data_dir / 'placement_results.csv'
             
-            print(f"DEBUG: Looking for placed items at {placed_path} or {alt_placed_path}")
+            results_trace.debug(lambda: f"Looking for placed items at {placed_path} or {alt_placed_path}")
             
             # First try the original filename
             if placed_path.exists():
                 try:
-                    placements_df = pd.read_csv(placed_path)
-                    print(f"DEBUG: Loaded placed items from {placed_path}: {len(placements_df)} items")
+                    placements_df = pd.read_csv(placed_path, usecols=_column_filter(columns))
+                    results_trace.debug(lambda: f"Loaded placed items from {placed_path}: {len(placements_df)} items")
                     return placements_df
                 except Exception as e:
                     logger.error(f"Error loading placed items from {placed_path}: {str(e)}")
-                    print(f"DEBUG: Error loading placed items from {placed_path}: {str(e)}")
             
             # If not found, try the alternative filename
             elif alt_placed_path.exists():
                 try:
-                    placements_df = pd.read_csv(alt_placed_path)
-                    print(f"DEBUG: Loaded placed items from {alt_placed_path}: {len(placements_df)} items")
+                    placements_df = pd.read_csv(alt_placed_path, usecols=_column_filter(columns))
+                    results_trace.debug(lambda: f"Loaded placed items from {alt_placed_path}: {len(placements_df)} items")
                     return placements_df
                 except Exception as e:
                     logger.error(f"Error loading placed items from {alt_placed_path}: {str(e)}")
-                    print(f"DEBUG: Error loading placed items from {alt_placed_path}: {str(e)}")
             else:
-                print(f"DEBUG: Placed items file not found at {placed_path} or {alt_placed_path}")
+                results_trace.debug(lambda: f"Placed items file not found at {placed_path} or {alt_placed_path}")
                 return None
         except Exception as e:
             logger.error(f"Error loading placement: {str(e)}")
-            print(f"DEBUG: Error loading placement: {str(e)}")
             return None
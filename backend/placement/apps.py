@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class PlacementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'placement'
+
+    def ready(self):
+        from django.conf import settings
+        from . import trace
+        trace.configure(getattr(settings, 'PLACEMENT_TRACE', None))
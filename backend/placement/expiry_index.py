@@ -0,0 +1,185 @@
+"""
+Expiry index for waste identification.
+
+Placed items are kept ordered by their parsed expiry date next to a separate
+set of items with no uses left, so "what is waste on date X" is a binary
+search plus the matching slice instead of a scan over every item.
+"""
+
+import copy
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+_ITEM_COLUMNS = ['item_id', 'name', 'width_cm', 'depth_cm', 'height_cm', 'expiry_date', 'usage_limit']
+
+# Indexes built from CSV files, keyed by the files' identity (path, mtime, size)
+_index_cache = {}
+_index_cache_lock = threading.Lock()
+
+
+def _file_key(path):
+    """Return a cache key that changes whenever the file is rewritten."""
+    if path is None or not path.exists():
+        return (str(path), None, None)
+    stat = path.stat()
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _to_day(value):
+    """Normalize a date-like value to a numpy datetime64 at midnight."""
+    return np.datetime64(pd.Timestamp(value).normalize().to_datetime64(), 'ns')
+
+
+def remember(index, items_path, placements_path):
+    """
+    Cache ``index`` as the index of the files' current contents, e.g. after
+    the files were rewritten with the same change already applied to it.
+
+    The cached index is shared: every request for the same files gets the
+    same instance, so it is never changed in place. A change builds a new
+    index (``ExpiryIndex.without``), is written to the files, and the new
+    index is remembered under their new identity; requests still holding the
+    old instance keep a consistent view.
+    """
+    key = (_file_key(items_path), _file_key(placements_path))
+    with _index_cache_lock:
+        _index_cache.clear()
+        _index_cache[key] = index
+
+
+class ExpiryIndex:
+    """
+    Index of placed items by expiry date and remaining uses.
+
+    Expiry dates are parsed once into a sorted datetime64 array, positions are
+    joined from a hash map of placements, and depleted items are held in a
+    dict so membership checks are O(1). Instances are not changed after
+    construction (see ``remember``).
+    """
+
+    def __init__(self, items_df, placements_df):
+        self._positions = {}
+        if placements_df is not None and not placements_df.empty:
+            columns = [placements_df[c].tolist() for c in ('item_id', 'container_id', 'x_cm', 'y_cm', 'z_cm')]
+            for item_id, container_id, x, y, z in zip(*columns):
+                # First placement wins, matching the previous .iloc[0] lookup
+                self._positions.setdefault(str(item_id), (container_id, x, y, z))
+
+        items_df = items_df.reset_index(drop=True)
+        keys = items_df['item_id'].astype(str).to_numpy()
+        placed = np.fromiter((k in self._positions for k in keys), dtype=bool, count=len(keys))
+
+        self._item_ids = items_df['item_id'].tolist()
+        self._keys = keys
+        self._names = items_df['name'].tolist()
+        self._dims = items_df[['width_cm', 'depth_cm', 'height_cm']].to_numpy(dtype=float)
+
+        if 'expiry_date' in items_df.columns:
+            expiry = pd.to_datetime(items_df['expiry_date'], errors='coerce').dt.normalize().to_numpy()
+        else:
+            expiry = np.full(len(items_df), np.datetime64('NaT'), dtype='datetime64[ns]')
+        rows = np.flatnonzero(placed & ~np.isnat(expiry))
+        order = np.argsort(expiry[rows], kind='stable')
+        self._expiry = expiry[rows][order]
+        self._expiry_rows = rows[order]
+
+        self._depleted = {}
+        if 'usage_limit' in items_df.columns:
+            uses = pd.to_numeric(items_df['usage_limit'], errors='coerce').to_numpy(dtype=float)
+            for row in np.flatnonzero(placed & (uses <= 0)):
+                self._depleted[keys[row]] = int(row)
+
+    @classmethod
+    def from_csv(cls, items_path, placements_path):
+        """
+        Return the index for the given CSV files, rebuilding it only when
+        either file has changed since the last build.
+        """
+        key = (_file_key(items_path), _file_key(placements_path))
+        with _index_cache_lock:
+            index = _index_cache.get(key)
+        record_cache('expiry_index', index is not None)
+        if index is not None:
+            return index
+
+        if not items_path.exists() or placements_path is None or not placements_path.exists():
+            return None
+
+        header = pd.read_csv(items_path, nrows=0).columns
+        items_df = pd.read_csv(items_path, usecols=[c for c in _ITEM_COLUMNS if c in header])
+        placements_df = pd.read_csv(placements_path)
+        index = cls(items_df, placements_df)
+        logger.info(f"Built expiry index: {len(index._expiry)} dated items, {len(index._depleted)} depleted")
+
+        remember(index, items_path, placements_path)
+        return index
+
+    def __len__(self):
+        return len(self._expiry) + len(self._depleted)
+
+    def waste_as_of(self, as_of=None):
+        """
+        Return placed items that are waste on the given date (default today):
+        those expiring on or before it, plus items with zero uses left.
+        """
+        as_of = _to_day(as_of if as_of is not None else pd.Timestamp.now())
+        k = np.searchsorted(self._expiry, as_of, side='right')
+
+        waste_items = []
+        for row in self._expiry_rows[:k]:
+            if self._keys[row] not in self._depleted:
+                waste_items.append(self._waste_entry(row, "Expired"))
+        for row in self._depleted.values():
+            waste_items.append(self._waste_entry(row, "Out of Uses"))
+        return waste_items
+
+    def expiring_between(self, start, end):
+        """Return item ids whose expiry falls after ``start`` and on or before ``end``."""
+        lo = np.searchsorted(self._expiry, _to_day(start), side='right')
+        hi = np.searchsorted(self._expiry, _to_day(end), side='right')
+        return [self._item_ids[row] for row in self._expiry_rows[lo:hi]]
+
+    def without(self, item_ids):
+        """
+        Return a new index without the given items (e.g. after undocking).
+
+        This index is left unchanged; the per-item arrays that removal does
+        not touch are shared with the copy.
+        """
+        keys = {str(item_id) for item_id in item_ids}
+        index = copy.copy(self)
+        index._positions = {key: value for key, value in self._positions.items() if key not in keys}
+        index._depleted = {key: row for key, row in self._depleted.items() if key not in keys}
+        keep = ~np.isin(self._keys[self._expiry_rows], list(keys))
+        index._expiry = self._expiry[keep]
+        index._expiry_rows = self._expiry_rows[keep]
+        return index
+
+    def _waste_entry(self, row, reason):
+        container_id, x, y, z = self._positions[self._keys[row]]
+        width, depth, height = self._dims[row].tolist()
+        return {
+            "item_id": self._item_ids[row],
+            "name": self._names[row],
+            "reason": reason,
+            "containerId": container_id,
+            "position": {
+                "startCoordinates": {
+                    "width": x,
+                    "depth": y,
+                    "height": z
+                },
+                "endCoordinates": {
+                    "width": x + width,
+                    "depth": y + depth,
+                    "height": z + height
+                }
+            }
+        }
@@ -0,0 +1,141 @@
+"""
+Streaming export of the stored placement arrangement.
+
+The placement CSV is read in chunks and each chunk is encoded and yielded
+straight away, so an export starts sending immediately and uses memory
+proportional to the chunk size, not the number of placements.
+
+Formats:
+    csv     Header line plus one row per placement
+    ndjson  One JSON object per line
+    binary  Columnar batches (layout below), for bulk loaders
+
+Binary layout (all integers little-endian uint32)::
+
+    b'SCARR' version(1 byte)
+    schema length, schema JSON ({"columns": [{"name": ..., "type": "float64" | "utf8"}]})
+    repeated batches:
+        row count (0 terminates the stream)
+        per column, in schema order:
+            float64: row count x float64
+            utf8:    (row count + 1) offsets, then the concatenated UTF-8 bytes
+"""
+
+import json
+import struct
+
+import numpy as np
+import pandas as pd
+
+ARRANGEMENT_COLUMNS = ['item_id', 'container_id', 'x_cm', 'y_cm', 'z_cm', 'width_cm', 'depth_cm', 'height_cm']
+_TEXT_COLUMNS = ('item_id', 'container_id')
+# Extents of the item as placed, i.e. its orientation in the container
+_EXTENT_COLUMNS = ['width_cm', 'depth_cm', 'height_cm']
+
+CHUNK_ROWS = 10000
+BINARY_MAGIC = b'SCARR\x01'
+
+
+def _item_extents(items_path):
+    """Item dimensions keyed by item id, for placement files that only store coordinates."""
+    if items_path is None or not items_path.exists():
+        return None
+    items = pd.read_csv(items_path, usecols=lambda column: column in ['item_id'] + _EXTENT_COLUMNS)
+    items['item_id'] = items['item_id'].astype(str)
+    return items.drop_duplicates('item_id').set_index('item_id')
+
+
+def iter_arrangement(placement_path, items_path=None, chunk_rows=CHUNK_ROWS):
+    """
+    Yield the stored arrangement as DataFrames of at most ``chunk_rows`` rows
+    with exactly ``ARRANGEMENT_COLUMNS``.
+    """
+    extents = None
+    for chunk in pd.read_csv(placement_path, chunksize=chunk_rows):
+        chunk = chunk.reindex(columns=ARRANGEMENT_COLUMNS)
+        for column in _TEXT_COLUMNS:
+            chunk[column] = chunk[column].astype(str)
+        if chunk[_EXTENT_COLUMNS].isna().any().any():
+            if extents is None:
+                extents = _item_extents(items_path)
+            if extents is not None:
+                known = extents.reindex(chunk['item_id'])
+                for column in _EXTENT_COLUMNS:
+                    chunk[column] = chunk[column].fillna(pd.Series(known[column].to_numpy(), index=chunk.index))
+        yield chunk
+
+
+def csv_stream(chunks):
+    yield ','.join(ARRANGEMENT_COLUMNS) + '\n'
+    for chunk in chunks:
+        yield chunk.to_csv(header=False, index=False)
+
+
+def ndjson_stream(chunks):
+    for chunk in chunks:
+        yield chunk.to_json(orient='records', lines=True).rstrip('\n') + '\n'
+
+
+def _utf8_column(values):
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets.tobytes() + b''.join(encoded)
+
+
+def binary_stream(chunks):
+    schema = json.dumps({'columns': [
+        {'name': column, 'type': 'utf8' if column in _TEXT_COLUMNS else 'float64'}
+        for column in ARRANGEMENT_COLUMNS
+    ]}).encode()
+    yield BINARY_MAGIC + struct.pack('<I', len(schema)) + schema
+    for chunk in chunks:
+        parts = [struct.pack('<I', len(chunk))]
+        for column in ARRANGEMENT_COLUMNS:
+            if column in _TEXT_COLUMNS:
+                parts.append(_utf8_column(chunk[column].tolist()))
+            else:
+                parts.append(pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype='<f8').tobytes())
+        yield b''.join(parts)
+    yield struct.pack('<I', 0)
+
+
+def read_binary(data):
+    """Decode a binary export back into one DataFrame (used by tests and clients in Python)."""
+    if not data.startswith(BINARY_MAGIC):
+        raise ValueError('Not an arrangement export')
+    offset = len(BINARY_MAGIC)
+    (schema_length,) = struct.unpack_from('<I', data, offset)
+    offset += 4
+    columns = json.loads(data[offset:offset + schema_length])['columns']
+    offset += schema_length
+
+    batches = []
+    while True:
+        (rows,) = struct.unpack_from('<I', data, offset)
+        offset += 4
+        if rows == 0:
+            break
+        batch = {}
+        for column in columns:
+            if column['type'] == 'float64':
+                batch[column['name']] = np.frombuffer(data, dtype='<f8', count=rows, offset=offset)
+                offset += rows * 8
+            else:
+                offsets = np.frombuffer(data, dtype='<u4', count=rows + 1, offset=offset)
+                offset += (rows + 1) * 4
+                blob = data[offset:offset + int(offsets[-1])]
+                batch[column['name']] = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(rows)]
+                offset += int(offsets[-1])
+        batches.append(pd.DataFrame(batch))
+    if not batches:
+        return pd.DataFrame({column['name']: [] for column in columns})
+    return pd.concat(batches, ignore_index=True)
+
+
+# format -> (content type, file extension, encoder)
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv', csv_stream),
+    'ndjson': ('application/x-ndjson', 'ndjson', ndjson_stream),
+    'binary': ('application/octet-stream', 'bin', binary_stream),
+}
@@ -0,0 +1,177 @@
+"""
+Packed box geometry for the 3D container views.
+
+Every placed box becomes three fixed-width records instead of a JSON object,
+so a browser can wrap the response in typed arrays without parsing it.
+Boxes are grouped by container, each container a contiguous slice, and the
+header says where each slice starts.
+
+Layout (little-endian)::
+
+    b'SCGEO' version(1 byte)
+    uint32 header length, header JSON (space padded so the data section
+    starts on a 4-byte boundary), then the data section:
+        positions  box count x 3 float32 (x_cm, y_cm, z_cm)
+        sizes      box count x 3 float32 (width_cm, depth_cm, height_cm)
+        codes      box count uint32: priority in the low 16 bits, plus
+                   WASTE and MERGED flags
+
+The header holds ``boxCount``, the byte ``offset`` of each array within the
+data section, the flag values, and per container its ``id``, ``size``,
+``first`` box and box ``count``.
+
+With ``min_size`` (level of detail), boxes whose largest extent is under
+``min_size`` cm are merged per ``min_size`` grid cell into one bounding
+box flagged MERGED, carrying the highest priority among them and WASTE if
+any of them is waste.
+"""
+
+import hashlib
+import json
+import struct
+
+import numpy as np
+import pandas as pd
+
+from . import export
+
+GEOMETRY_MAGIC = b'SCGEO\x01'
+CONTENT_TYPE = 'application/octet-stream'
+
+PRIORITY_MASK = 0xFFFF
+WASTE = 1 << 16
+MERGED = 1 << 17
+
+_POSITION_COLUMNS = ['x_cm', 'y_cm', 'z_cm']
+_SIZE_COLUMNS = ['width_cm', 'depth_cm', 'height_cm']
+
+
+def etag(paths, *variant):
+    """
+    Tag for the geometry built from ``paths`` with the given request
+    ``variant``, computed from file identities (path, mtime, size) only.
+    """
+    parts = []
+    for path in paths:
+        if path is not None and path.exists():
+            stat = path.stat()
+            parts.append((str(path), stat.st_mtime_ns, stat.st_size))
+        else:
+            parts.append((str(path), None, None))
+    return hashlib.blake2b(repr((parts, variant)).encode(), digest_size=16).hexdigest()
+
+
+def load_boxes(placement_path, items_path, container_ids=None, waste_ids=()):
+    """
+    Return one row per placed box with positions, sizes, ``container_id``
+    and ``code``, limited to ``container_ids`` when given.
+    """
+    chunks = [chunk if container_ids is None else chunk[chunk['container_id'].isin(container_ids)]
+              for chunk in export.iter_arrangement(placement_path, items_path)]
+    boxes = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=export.ARRANGEMENT_COLUMNS)
+
+    priority = np.zeros(len(boxes), dtype=np.uint32)
+    if items_path is not None and items_path.exists():
+        items = pd.read_csv(items_path, usecols=lambda column: column in ('item_id', 'priority'))
+        if 'priority' in items.columns:
+            items['item_id'] = items['item_id'].astype(str)
+            by_id = items.drop_duplicates('item_id').set_index('item_id')['priority']
+            known = pd.to_numeric(by_id.reindex(boxes['item_id']), errors='coerce').fillna(0)
+            priority = known.clip(0, PRIORITY_MASK).to_numpy(dtype=np.uint32)
+
+    waste = boxes['item_id'].isin({str(item_id) for item_id in waste_ids}).to_numpy()
+    boxes['code'] = priority | np.where(waste, WASTE, 0).astype(np.uint32)
+    boxes[_POSITION_COLUMNS + _SIZE_COLUMNS] = boxes[_POSITION_COLUMNS + _SIZE_COLUMNS].astype(float).fillna(0.0)
+    return boxes[['container_id'] + _POSITION_COLUMNS + _SIZE_COLUMNS + ['code']]
+
+
+def merge_small(boxes, min_size):
+    """Replace boxes smaller than ``min_size`` cm by one bounding box per grid cell."""
+    small = boxes[_SIZE_COLUMNS].max(axis=1).to_numpy() < min_size
+    if not small.any():
+        return boxes
+
+    tiny = boxes[small]
+    lo = tiny[_POSITION_COLUMNS].to_numpy()
+    hi = lo + tiny[_SIZE_COLUMNS].to_numpy()
+    cells = np.floor(lo / min_size).astype(np.int64)
+    frame = pd.DataFrame({
+        'container_id': tiny['container_id'].to_numpy(),
+        'cx': cells[:, 0], 'cy': cells[:, 1], 'cz': cells[:, 2],
+        'x0': lo[:, 0], 'y0': lo[:, 1], 'z0': lo[:, 2],
+        'x1': hi[:, 0], 'y1': hi[:, 1], 'z1': hi[:, 2],
+        'priority': tiny['code'].to_numpy() & PRIORITY_MASK,
+        'waste': tiny['code'].to_numpy() & WASTE,
+    })
+    groups = frame.groupby(['container_id', 'cx', 'cy', 'cz'], sort=False).agg(
+        x0=('x0', 'min'), y0=('y0', 'min'), z0=('z0', 'min'),
+        x1=('x1', 'max'), y1=('y1', 'max'), z1=('z1', 'max'),
+        priority=('priority', 'max'), waste=('waste', 'max'),
+    ).reset_index()
+    merged = pd.DataFrame({
+        'container_id': groups['container_id'],
+        'x_cm': groups['x0'], 'y_cm': groups['y0'], 'z_cm': groups['z0'],
+        'width_cm': groups['x1'] - groups['x0'],
+        'depth_cm': groups['y1'] - groups['y0'],
+        'height_cm': groups['z1'] - groups['z0'],
+        'code': (groups['priority'] | groups['waste'] | MERGED).astype(np.uint32),
+    })
+    return pd.concat([boxes[~small], merged], ignore_index=True)
+
+
+def encode(boxes, containers_df=None):
+    """Pack ``boxes`` (as from ``load_boxes``) into the binary layout above."""
+    sizes = {}
+    order = []
+    if containers_df is not None and not containers_df.empty:
+        ids = containers_df['container_id'].astype(str)
+        extents = containers_df[_SIZE_COLUMNS].astype(float).to_numpy().tolist()
+        sizes = dict(zip(ids, extents))
+        order = ids.tolist()
+    present = pd.unique(boxes['container_id'])
+    present_set = set(present)
+    order = [c for c in order if c in present_set] + [c for c in present if c not in sizes]
+
+    rank = pd.Series(np.arange(len(order)), index=order)
+    boxes = boxes.iloc[np.argsort(rank.reindex(boxes['container_id']).to_numpy(), kind='stable')]
+    counts = boxes['container_id'].value_counts().reindex(order).fillna(0).astype(int).tolist()
+    firsts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(int).tolist() if counts else []
+
+    count = len(boxes)
+    header = {
+        'boxCount': count,
+        'offsets': {'positions': 0, 'sizes': 12 * count, 'codes': 24 * count},
+        'flags': {'priorityMask': PRIORITY_MASK, 'waste': WASTE, 'merged': MERGED},
+        'containers': [
+            {'id': container_id, 'size': sizes.get(container_id), 'first': first, 'count': n}
+            for container_id, first, n in zip(order, firsts, counts)
+        ],
+    }
+    header = json.dumps(header, separators=(',', ':')).encode()
+    preamble = len(GEOMETRY_MAGIC) + 4
+    header += b' ' * (-(preamble + len(header)) % 4)
+
+    return b''.join([
+        GEOMETRY_MAGIC,
+        struct.pack('<I', len(header)),
+        header,
+        boxes[_POSITION_COLUMNS].to_numpy(dtype='<f4').tobytes(),
+        boxes[_SIZE_COLUMNS].to_numpy(dtype='<f4').tobytes(),
+        boxes['code'].to_numpy(dtype='<u4').tobytes(),
+    ])
+
+
+def decode(data):
+    """Return ``(header, positions, sizes, codes)`` from an encoded payload."""
+    if not data.startswith(GEOMETRY_MAGIC):
+        raise ValueError('Not a geometry payload')
+    (length,) = struct.unpack_from('<I', data, len(GEOMETRY_MAGIC))
+    start = len(GEOMETRY_MAGIC) + 4
+    header = json.loads(data[start:start + length])
+    base = start + length
+    count = header['boxCount']
+    offsets = header['offsets']
+    positions = np.frombuffer(data, dtype='<f4', count=3 * count, offset=base + offsets['positions']).reshape(-1, 3)
+    sizes = np.frombuffer(data, dtype='<f4', count=3 * count, offset=base + offsets['sizes']).reshape(-1, 3)
+    codes = np.frombuffer(data, dtype='<u4', count=count, offset=base + offsets['codes'])
+    return header, positions, sizes, codes
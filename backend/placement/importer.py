@@ -0,0 +1,307 @@
+"""
+Batch import of items and containers into the CSV dataset store.
+
+A batch (an uploaded CSV file or a JSON list of records) is validated as a
+whole: every check is a vectorized mask over the batch, and a row is kept
+only if it passes them all. Good rows are upserted by id into
+``DATA_DIR/input_items.csv`` or ``DATA_DIR/containers.csv`` with a single
+atomic write, so one bad row does not block the rest of the batch. Rejected
+rows come back as a compact report, one entry per row listing its errors.
+
+Values are kept as the text they arrived as, so stored rows that are not
+touched by an import are written back byte for byte.
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .metrics import timed_stage
+
+# Rejected rows listed in a report; the counts always cover the whole batch
+MAX_REPORTED_ROWS = 100
+
+# Writers of the same store file are serialized so upserts cannot interleave
+_write_lock = threading.Lock()
+
+
+class BatchError(ValueError):
+    """The batch as a whole cannot be imported (unreadable or missing columns)."""
+
+
+ITEMS = {
+    'name': 'items',
+    'filename': 'input_items.csv',
+    'id_column': 'item_id',
+    'required': ['item_id', 'name', 'width_cm', 'height_cm', 'depth_cm', 'weight_kg'],
+    # column -> (lower bound, upper bound, lower bound inclusive)
+    'ranges': {
+        'width_cm': (0, None, False),
+        'height_cm': (0, None, False),
+        'depth_cm': (0, None, False),
+        'weight_kg': (0, None, False),
+        'priority': (1, 100, True),
+        'usage_limit': (0, None, True),
+    },
+    # Accepted alternative names: the stored file's mass_kg and the
+    # camelCase keys the placement API and frontend use
+    'aliases': {
+        'mass_kg': 'weight_kg', 'mass': 'weight_kg', 'itemId': 'item_id',
+        'width': 'width_cm', 'depth': 'depth_cm', 'height': 'height_cm',
+        'preferredZone': 'preferred_zone', 'expiryDate': 'expiry_date', 'usageLimit': 'usage_limit',
+    },
+}
+
+CONTAINERS = {
+    'name': 'containers',
+    'filename': 'containers.csv',
+    'id_column': 'container_id',
+    'required': ['container_id', 'width_cm', 'height_cm', 'depth_cm', 'zone'],
+    'ranges': {
+        'width_cm': (0, None, False),
+        'height_cm': (0, None, False),
+        'depth_cm': (0, None, False),
+        'max_weight_kg': (0, None, False),
+    },
+    'aliases': {
+        'containerId': 'container_id', 'width': 'width_cm', 'depth': 'depth_cm', 'height': 'height_cm',
+        'maxWeight': 'max_weight_kg',
+    },
+}
+
+
+def apply_aliases(frame, dataset):
+    """
+    Fold alias columns into their canonical columns, row by row.
+
+    A row with no value under the canonical name takes the alias value, so a
+    batch mixing ``itemId`` and ``item_id`` records keeps every id. An alias
+    without its canonical column is renamed in place.
+    """
+    for alias, column in dataset['aliases'].items():
+        if alias not in frame.columns:
+            continue
+        if column not in frame.columns:
+            frame = frame.rename(columns={alias: column})
+            continue
+        present = frame[column].notna() & frame[column].astype(str).ne('')
+        frame = frame.assign(**{column: frame[column].where(present, frame[alias])}).drop(columns=alias)
+    return frame
+
+
+def _unique_header(header):
+    """Number repeated column names the way pandas does (``a``, ``a.1``, ...)."""
+    seen = {}
+    unique = []
+    for name in header:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        unique.append(f'{name}.{count}' if count else name)
+    return unique
+
+
+def _read_csv(upload):
+    """
+    Parse an uploaded CSV into strings, flagging rows whose field count
+    differs from the header.
+
+    Flagged rows are padded or cut to the header so row numbers stay aligned
+    and ``validate`` rejects them; pandas would instead take an extra field
+    in the first row as an index column and shift every value.
+    """
+    try:
+        content = upload.read()
+        text = content.decode('utf-8-sig') if isinstance(content, bytes) else content
+        rows = [row for row in csv.reader(io.StringIO(text, newline=''), skipinitialspace=True) if row]
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise BatchError(f'Unreadable CSV: {e}')
+    if not rows:
+        raise BatchError('Unreadable CSV: the file is empty')
+
+    header, rows = _unique_header(rows[0]), rows[1:]
+    width = len(header)
+    malformed = np.array([len(row) != width for row in rows], dtype=bool)
+    rows = [(row + [''] * width)[:width] for row in rows]
+    return pd.DataFrame(rows, columns=header, dtype=str), malformed
+
+
+def read_batch(upload=None, records=None):
+    """
+    Return the batch as a DataFrame of strings ('' for missing values), and
+    a boolean array marking rows with the wrong number of fields (CSV only).
+
+    ``upload`` is a CSV file object; ``records`` is parsed JSON, either a
+    list of objects or an object holding one under ``items``/``containers``.
+    """
+    if upload is not None:
+        return _read_csv(upload)
+
+    if isinstance(records, dict):
+        records = records.get('items', records.get('containers'))
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise BatchError('Expected a CSV file upload or a JSON list of records')
+    # Text form of every value, matching what a CSV upload produces; values
+    # are converted one by one, as a numeric column with gaps would turn 5 into 5.0
+    text = [{key: '' if value is None else str(value) for key, value in record.items()} for record in records]
+    return pd.DataFrame.from_records(text).fillna('').astype(str), None
+
+
+def validate(frame, dataset, zones=None, malformed=None):
+    """
+    Split a batch into accepted rows and per-row errors.
+
+    Returns ``(accepted, errors, rejected)``: the accepted rows with
+    canonical column names, up to ``MAX_REPORTED_ROWS`` error entries
+    ``{'row', 'id', 'errors'}`` (``row`` is 1-based within the batch), and
+    the total number of rejected rows. Item ``preferred_zone`` values must
+    be one of ``zones`` when it is given and non-empty. Rows flagged in
+    ``malformed`` (see ``read_batch``) are always rejected.
+    """
+    frame = apply_aliases(frame, dataset)
+    missing = [column for column in dataset['required'] if column not in frame.columns]
+    if missing:
+        raise BatchError(f"Missing required columns: {', '.join(missing)}")
+
+    frame = frame.apply(lambda column: column.str.strip())
+    id_column = dataset['id_column']
+    checks = []
+    if malformed is not None:
+        checks.append(('number of fields does not match the header', pd.Series(malformed, index=frame.index)))
+    for column in dataset['required']:
+        checks.append((f'{column} is required', frame[column].eq('')))
+
+    for column, (low, high, inclusive) in dataset['ranges'].items():
+        if column not in frame.columns:
+            continue
+        present = frame[column].ne('')
+        values = pd.to_numeric(frame[column], errors='coerce')
+        checks.append((f'{column} must be a number', present & values.isna()))
+        in_range = pd.Series(True, index=frame.index)
+        if low is not None:
+            in_range &= values.ge(low) if inclusive else values.gt(low)
+        if high is not None:
+            in_range &= values.le(high)
+        bounds = f"{'>=' if inclusive else '>'} {low}" + (f' and <= {high}' if high is not None else '')
+        checks.append((f'{column} must be {bounds}', present & values.notna() & ~in_range))
+
+    checks.append((f'duplicate {id_column} in batch',
+                   frame[id_column].ne('') & frame[id_column].duplicated(keep=False)))
+
+    if zones is not None and len(zones) and 'preferred_zone' in frame.columns:
+        zone = frame['preferred_zone']
+        checks.append(('preferred_zone is not a known zone', zone.ne('') & ~zone.isin(zones)))
+
+    messages = [message for message, _ in checks]
+    failed = np.column_stack([mask.to_numpy(dtype=bool) for _, mask in checks])
+    bad = failed.any(axis=1)
+
+    errors = []
+    for position in np.flatnonzero(bad)[:MAX_REPORTED_ROWS]:
+        errors.append({
+            'row': int(position) + 1,
+            'id': frame[id_column].iat[position] or None,
+            'errors': [messages[j] for j in np.flatnonzero(failed[position])],
+        })
+    return frame[~bad].reset_index(drop=True), errors, int(bad.sum())
+
+
+def _read_store(path):
+    if not path.exists():
+        return None
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def known_zones(data_dir=None):
+    """Zones of the stored containers, or None when there are none yet."""
+    store = _read_store((data_dir or settings.DATA_DIR) / CONTAINERS['filename'])
+    if store is None or 'zone' not in store.columns or store.empty:
+        return None
+    return pd.Index(store['zone'].str.strip().unique())
+
+
+def _atomic_write(path, dump):
+    """Write ``path`` through a temporary file in the same directory, swapped in with ``os.replace``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', newline='') as handle:
+            dump(handle)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def atomic_write_csv(frame, path):
+    _atomic_write(path, lambda handle: frame.to_csv(handle, index=False))
+
+
+def atomic_write_json(data, path):
+    _atomic_write(path, lambda handle: json.dump(data, handle))
+
+
+@timed_stage('import_upsert')
+def upsert(rows, dataset, data_dir=None):
+    """
+    Insert or replace ``rows`` by id in the dataset's store file in one write.
+
+    Existing rows keep their position and columns; the stored file's own
+    column names win over canonical ones (e.g. ``mass_kg`` for weight).
+    Returns ``(inserted, updated)``.
+    """
+    path = (data_dir or settings.DATA_DIR) / dataset['filename']
+    id_column = dataset['id_column']
+    with _write_lock:
+        store = _read_store(path)
+        if store is None:
+            store = pd.DataFrame(columns=list(rows.columns), dtype=str)
+        # Write incoming columns under the names the file already uses
+        stored_names = {column: alias for alias, column in dataset['aliases'].items()
+                        if alias in store.columns and column not in store.columns}
+        rows = rows.rename(columns=stored_names)
+        stored_columns = list(store.columns)
+
+        store = store.assign(**{id_column: store[id_column].str.strip()})
+        store = store.drop_duplicates(id_column, keep='last').set_index(id_column)
+        incoming = rows.set_index(id_column)
+        updated = int(incoming.index.isin(store.index).sum())
+        order = store.index.append(incoming.index[~incoming.index.isin(store.index)])
+
+        # Incoming values win; columns the batch lacks keep the stored values
+        columns = stored_columns + [c for c in incoming.columns if c not in stored_columns]
+        combined = incoming.combine_first(store).reindex(order).fillna('').rename_axis(id_column).reset_index()
+        atomic_write_csv(combined[columns], path)
+    return len(order) - len(store), updated
+
+
+def import_batch(dataset, upload=None, records=None, data_dir=None):
+    """Read, validate and upsert one batch, returning the report for the API response."""
+    frame, malformed = read_batch(upload=upload, records=records)
+    zones = known_zones(data_dir) if dataset is ITEMS else None
+    accepted, errors, rejected = validate(frame, dataset, zones=zones, malformed=malformed)
+    inserted = updated = 0
+    if not accepted.empty:
+        inserted, updated = upsert(accepted, dataset, data_dir=data_dir)
+
+    imported = len(accepted)
+    name = dataset['name']
+    message = f'Imported {imported} {name}'
+    if rejected:
+        message += f', rejected {rejected}'
+    return {
+        'success': rejected == 0,
+        'message': message,
+        'imported': imported,
+        'inserted': inserted,
+        'updated': updated,
+        'rejected': rejected,
+        'errors': errors,
+        'errors_truncated': rejected > len(errors),
+    }
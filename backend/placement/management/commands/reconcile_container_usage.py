@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from placement.models import Container
+
+class Command(BaseCommand):
+    help = 'Rebuild the used_volume, used_weight and is_full counters of every container from its items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--container', action='append', dest='containers', default=None,
+                            help='Container name to reconcile (repeatable); defaults to all containers')
+
+    def handle(self, *args, **options):
+        containers = Container.objects.all()
+        if options['containers']:
+            containers = containers.filter(name__in=options['containers'])
+
+        updated = containers.reconcile_usage()
+        self.stdout.write(self.style.SUCCESS(f'Reconciled usage counters for {updated} containers'))
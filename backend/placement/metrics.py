@@ -0,0 +1,219 @@
+"""
+In-process metrics for the placement app, rendered in the Prometheus text format.
+
+Recording is a dict lookup, a bisect and a few additions under a lock, so it
+is cheap enough for every request. Nothing is formatted until ``/metrics`` is
+scraped, and gauges backed by callbacks are only evaluated at scrape time.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; spans fast cached lookups up to full placement runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f'{self.name}{_labels(self.labelnames, key)} {_number(v)}' for key, v in items]
+
+
+class Gauge(_Metric):
+    """
+    Point-in-time value per label set.
+
+    ``set_function`` registers a callback returning ``{label values: value}``
+    (or a plain number for unlabelled gauges) that runs only when scraped.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        self._function = function
+
+    def render(self):
+        if self._function is not None:
+            values = self._function()
+            items = list(values.items()) if isinstance(values, dict) else [((), values)]
+        else:
+            with self._lock:
+                items = list(self._values.items()) or ([((), 0)] if not self.labelnames else [])
+        return self.header() + [f'{self.name}{_labels(self.labelnames, key)} {_number(v)}' for key, v in items]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram per label set."""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][slot] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def render(self):
+        with self._lock:
+            items = [(key, (list(counts), total, n)) for key, (counts, total, n) in self._values.items()]
+        lines = self.header()
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, [le])} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {total!r}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {n}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    'placement_http_request_duration_seconds', 'Request latency by route.', ('method', 'route', 'status')))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    'placement_http_requests_in_flight', 'Requests currently being handled.'))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    'placement_stage_duration_seconds', 'Time spent in each placement stage.', ('stage',)))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    'placement_cache_lookups_total', 'Cache lookups by cache and result (hit or miss).', ('cache', 'result')))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    'placement_cache_hit_ratio', 'Fraction of cache lookups that were hits.', ('cache',)))
+
+
+def _hit_ratios():
+    lookups = CACHE_LOOKUPS.snapshot()
+    ratios = {}
+    for cache in {key[0] for key in lookups}:
+        hits = lookups.get((cache, 'hit'), 0)
+        total = hits + lookups.get((cache, 'miss'), 0)
+        ratios[(cache,)] = hits / total if total else 0.0
+    return ratios
+
+
+CACHE_HIT_RATIO.set_function(_hit_ratios)
+
+
+def record_cache(cache, hit):
+    CACHE_LOOKUPS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def timed_stage(stage):
+    """Decorator recording the wrapped call's duration as placement stage ``stage``."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with STAGE_LATENCY.time(stage=stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def render():
+    return REGISTRY.render()
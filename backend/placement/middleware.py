@@ -0,0 +1,63 @@
+import logging
+import time
+
+from .metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT
+from .profiling import PROFILES_PATH, finish_capture, profiling_requested, start_capture
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record request latency per route.
+
+    Routes are labelled with their URL pattern (``placement/items/<pk>/``)
+    rather than the raw path so the number of series stays bounded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            match = getattr(request, 'resolver_match', None)
+            route = match.route if match is not None and match.route else 'unmatched'
+            REQUEST_LATENCY.observe(time.perf_counter() - start,
+                                    method=request.method, route=route, status=status)
+
+
+class ProfilingMiddleware:
+    """
+    Profile exactly one request when it carries the profiling token.
+
+    The capture id is returned in ``X-Profile-Id``; see ``placement.profiling``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path.startswith(PROFILES_PATH) or not profiling_requested(request):
+            return self.get_response(request)
+        profiler = start_capture()
+        if profiler is None:
+            return self.get_response(request)
+
+        try:
+            response = self.get_response(request)
+            # Include rendering of lazily rendered (DRF) responses
+            if callable(getattr(response, 'render', None)):
+                response = response.render()
+        finally:
+            profile_id = finish_capture(profiler)
+        logger.info(f"Profiled {request.method} {request.path} as {profile_id}")
+        response['X-Profile-Id'] = profile_id
+        return response
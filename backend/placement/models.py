@@ -1,4 +1,47 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThanOrEqual
+
+# A container counts as full once this fraction of its volume is used
+FULL_THRESHOLD = 0.95
+
+CONTAINER_VOLUME = F('width_cm') * F('height_cm') * F('depth_cm')
+ITEM_VOLUME = F('width_cm') * F('height_cm') * F('depth_cm')
+
+
+class ContainerQuerySet(models.QuerySet):
+    def adjust_usage(self, volume_delta, weight_delta):
+        """
+        Add to the usage counters of the selected containers in a single UPDATE.
+
+        The counters are changed with F() expressions, so concurrent placements
+        never overwrite each other, and is_full is recomputed in the same statement.
+        """
+        new_volume = F('used_volume') + volume_delta
+        return self.update(
+            used_volume=new_volume,
+            used_weight=F('used_weight') + weight_delta,
+            is_full=Case(
+                When(GreaterThanOrEqual(new_volume, CONTAINER_VOLUME * FULL_THRESHOLD), then=Value(True)),
+                default=Value(False)
+            )
+        )
+
+    def reconcile_usage(self):
+        """Rebuild the usage counters of the selected containers from their items."""
+        totals = Item.objects.filter(container=OuterRef('pk')).order_by().values('container')
+        with transaction.atomic():
+            updated = self.update(
+                used_volume=Coalesce(Subquery(totals.annotate(total=Sum(ITEM_VOLUME)).values('total')), Value(0.0)),
+                used_weight=Coalesce(Subquery(totals.annotate(total=Sum('weight_kg')).values('total')), Value(0.0))
+            )
+            self.update(is_full=Case(
+                When(Q(used_volume__gte=CONTAINER_VOLUME * FULL_THRESHOLD), then=Value(True)),
+                default=Value(False)
+            ))
+        return updated
+
 
 # Create your models here.
 class Container(models.Model):
@@ -11,6 +54,8 @@ class Container(models.Model):
     used_volume = models.FloatField(default=0)
     used_weight = models.FloatField(default=0)
     is_full = models.BooleanField(default=False)
+
+    objects = ContainerQuerySet.as_manager()
     
     def __str__(self):
         return f"{self.name} ({self.zone})"
@@ -49,6 +94,38 @@ class Item(models.Model):
     def volume(self):
         return self.width_cm * self.height_cm * self.depth_cm
 
+    def save(self, *args, **kwargs):
+        """Save the item and move its volume and weight between container counters."""
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = Item.objects.filter(pk=self.pk).values(
+                    'container_id', 'width_cm', 'height_cm', 'depth_cm', 'weight_kg'
+                ).first()
+            super().save(*args, **kwargs)
+
+            current = (self.container_id, self.volume, self.weight_kg)
+            if previous is not None:
+                before = (
+                    previous['container_id'],
+                    previous['width_cm'] * previous['height_cm'] * previous['depth_cm'],
+                    previous['weight_kg']
+                )
+                if before == current:
+                    return
+                if before[0] is not None:
+                    Container.objects.filter(pk=before[0]).adjust_usage(-before[1], -before[2])
+            if current[0] is not None:
+                Container.objects.filter(pk=current[0]).adjust_usage(current[1], current[2])
+
+    def delete(self, *args, **kwargs):
+        """Delete the item and release its space in its container."""
+        with transaction.atomic():
+            container_id = Item.objects.filter(pk=self.pk).values_list('container_id', flat=True).first()
+            if container_id is not None:
+                Container.objects.filter(pk=container_id).adjust_usage(-self.volume, -self.weight_kg)
+            return super().delete(*args, **kwargs)
+
 class PlacementHistory(models.Model):
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
     container = models.ForeignKey(Container, on_delete=models.CASCADE)
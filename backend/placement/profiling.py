@@ -0,0 +1,103 @@
+"""
+Opt-in cProfile capture of a single request.
+
+A request is profiled when it carries ``X-Profile: <token>`` or
+``?profile=<token>`` matching ``settings.PROFILE_TOKEN``; profiling is off
+when no token is configured, whatever DEBUG says. The pstats file is
+written to ``settings.PROFILE_DIR``, which keeps only the newest
+``settings.PROFILE_MAX_FILES`` captures, and the response carries its id in
+``X-Profile-Id``. Fetch it from ``/profiles/<id>/`` as a text summary or,
+with ``?format=pstats``, as the raw file for snakeviz/gprof2dot.
+"""
+
+import cProfile
+import hmac
+import io
+import pstats
+import re
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_PARAM = 'profile'
+PROFILES_PATH = '/profiles/'
+SUMMARY_LINES = 60
+
+_PROFILE_ID = re.compile(r'^[0-9]+-[0-9a-f]{8}$')
+# cProfile cannot run two profilers at once on 3.12+; one capture at a time
+_capture_lock = threading.Lock()
+
+
+def _authorized(value):
+    token = getattr(settings, 'PROFILE_TOKEN', None)
+    if not (token and value):
+        return False
+    # Compared as bytes: compare_digest rejects non-ASCII str
+    return hmac.compare_digest(str(value).encode(), str(token).encode())
+
+
+def profiling_requested(request):
+    return _authorized(request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_PARAM))
+
+
+def _profile_dir():
+    directory = settings.PROFILE_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def save_profile(profiler):
+    """Write a finished profiler to the profile directory and return its id."""
+    profile_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+    directory = _profile_dir()
+    profiler.dump_stats(directory / f'{profile_id}.pstats')
+
+    # Keep the directory bounded: drop the oldest captures
+    captures = sorted(directory.glob('*.pstats'))
+    for stale in captures[:-settings.PROFILE_MAX_FILES]:
+        stale.unlink(missing_ok=True)
+    return profile_id
+
+
+def start_capture():
+    """Return an enabled profiler, or None while another capture is running."""
+    if not _capture_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def finish_capture(profiler):
+    profiler.disable()
+    _capture_lock.release()
+    return save_profile(profiler)
+
+
+def profile_path(profile_id):
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = settings.PROFILE_DIR / f'{profile_id}.pstats'
+    return path if path.exists() else None
+
+
+def profile_view(request, profile_id):
+    """Return a stored capture as a cumulative-time summary or the raw pstats file."""
+    if not profiling_requested(request):
+        return HttpResponseForbidden('Profiling token required')
+    path = profile_path(profile_id)
+    if path is None:
+        raise Http404('Unknown profile id')
+
+    if request.GET.get('format') == 'pstats':
+        return FileResponse(path.open('rb'), as_attachment=True, filename=path.name,
+                            content_type='application/octet-stream')
+
+    stream = io.StringIO()
+    stats = pstats.Stats(str(path), stream=stream)
+    stats.sort_stats('cumulative').print_stats(SUMMARY_LINES)
+    return HttpResponse(stream.getvalue(), content_type='text/plain; charset=utf-8')
@@ -0,0 +1,160 @@
+"""
+Batch placement recommendations for unplaced items.
+
+Container residual volume and weight are computed once from the placement
+snapshot, then every unplaced item is scored against every container as a
+boolean fit matrix. Candidates are ranked per item with one ``lexsort``:
+feasible containers in the item's preferred zone first (fullest first, to
+keep space efficient), then feasible containers elsewhere (smallest residual
+first). Items are processed in chunks so memory stays bounded for large
+inventories.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .statistics import PlacementStatistics
+
+DEFAULT_TOP_K = 3
+PREFERRED_ZONE_SCORE = 100
+OTHER_ZONE_SCORE = 70
+
+# Items scored per matrix block (rows x containers booleans/floats)
+CHUNK_ROWS = 4096
+
+_ITEM_COLUMNS = ['name', 'width_cm', 'depth_cm', 'height_cm', 'mass_kg', 'weight_kg', 'preferred_zone']
+
+
+def _numeric(df, column, default=0.0):
+    if column not in df.columns:
+        return np.full(len(df), default, dtype=float)
+    return pd.to_numeric(df[column], errors='coerce').fillna(default).to_numpy(dtype=float)
+
+
+def _item_mass(df):
+    """Item mass in kg, from ``mass_kg`` or ``weight_kg``, 0 when unknown."""
+    for column in ('mass_kg', 'weight_kg'):
+        if column in df.columns:
+            return _numeric(df, column)
+    return np.zeros(len(df))
+
+
+def _with_item_details(unplaced_df, items_df):
+    """Fill dimensions, mass and preferred zone of unplaced rows from the items frame."""
+    missing = [c for c in _ITEM_COLUMNS if c not in unplaced_df.columns and items_df is not None and c in items_df.columns]
+    if not missing:
+        return unplaced_df.reset_index(drop=True)
+    details = items_df[['item_id'] + missing].copy()
+    details['item_id'] = details['item_id'].astype(str)
+    details = details.drop_duplicates('item_id')
+    unplaced = unplaced_df.assign(_key=unplaced_df['item_id'].astype(str))
+    merged = unplaced.merge(details.rename(columns={'item_id': '_key'}), on='_key', how='left')
+    return merged.drop(columns='_key').reset_index(drop=True)
+
+
+class RecommendationEngine:
+    """
+    Rank containers for unplaced items against one placement snapshot.
+
+    Args:
+        containers_df: Containers with ``container_id``, ``zone``, dimensions
+            and optionally ``max_weight_kg`` and ``name``
+        placements_df: Current placements (``container_id`` and item dimensions)
+        items_df: Item inventory, used for item masses and to complete unplaced
+            rows that only carry ``item_id``
+    """
+
+    def __init__(self, containers_df, placements_df=None, items_df=None):
+        self.items_df = items_df
+        stats = PlacementStatistics(containers_df, placements_df)
+        containers_df = containers_df.reset_index(drop=True)
+
+        self.container_ids = containers_df['container_id'].tolist()
+        self.container_names = stats.names
+        self.container_zones = stats.zones
+        self.residual_volume = stats.capacity - stats.used
+        self.utilization = np.divide(stats.used, stats.capacity,
+                                     out=np.zeros_like(stats.used), where=stats.capacity > 0)
+
+        max_weight = _numeric(containers_df, 'max_weight_kg', default=np.inf)
+        used_weight = np.zeros(len(containers_df))
+        if placements_df is not None and not placements_df.empty and 'container_id' in placements_df.columns:
+            placed = placements_df
+            if 'mass_kg' not in placed.columns and 'weight_kg' not in placed.columns and items_df is not None:
+                placed = _with_item_details(placed[['item_id', 'container_id']], items_df)
+            codes = pd.Index(stats.container_ids).get_indexer(placed['container_id'].astype(str))
+            known = codes >= 0
+            used_weight = np.bincount(codes[known], weights=_item_mass(placed)[known], minlength=len(containers_df))
+        self.residual_weight = max_weight - used_weight
+
+    def recommend(self, unplaced_df, top_k=DEFAULT_TOP_K):
+        """
+        Return recommendations for every unplaced item that fits somewhere.
+
+        Each entry describes the best container and lists up to ``top_k - 1``
+        ranked ``alternatives``. Entries are ordered by score, best first.
+        """
+        if unplaced_df is None or unplaced_df.empty or not self.container_ids:
+            return []
+        top_k = max(1, int(top_k))
+        unplaced = _with_item_details(unplaced_df, self.items_df)
+
+        volume = _numeric(unplaced, 'width_cm') * _numeric(unplaced, 'depth_cm') * _numeric(unplaced, 'height_cm')
+        mass = _item_mass(unplaced)
+        # Intern zones once so zone matching is an integer comparison
+        zone_values = pd.Series(list(self.container_zones) + (unplaced['preferred_zone'].tolist()
+                                if 'preferred_zone' in unplaced.columns else [None] * len(unplaced)), dtype=object)
+        zone_codes, _ = pd.factorize(zone_values)
+        container_zone = zone_codes[:len(self.container_ids)]
+        item_zone = zone_codes[len(self.container_ids):]
+
+        item_ids = unplaced['item_id'].tolist()
+        item_names = unplaced['name'].tolist() if 'name' in unplaced.columns else [None] * len(unplaced)
+        preferred = zone_values.iloc[len(self.container_ids):].tolist()
+
+        recommendations = []
+        for start in range(0, len(unplaced), CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, len(unplaced))
+            fits = ((volume[start:stop, None] <= self.residual_volume[None, :]) &
+                    (mass[start:stop, None] <= self.residual_weight[None, :]))
+            in_zone = (item_zone[start:stop, None] == container_zone[None, :]) & (item_zone[start:stop, None] >= 0)
+
+            # Tier 0: fits in preferred zone, 1: fits elsewhere, 2: does not fit
+            tier = np.where(fits, np.where(in_zone, 0, 1), 2)
+            within_tier = np.where(in_zone, -self.utilization[None, :], self.residual_volume[None, :])
+            order = np.lexsort((within_tier, tier), axis=-1)[:, :top_k]
+            ranked_tiers = np.take_along_axis(tier, order, axis=1)
+
+            for row in np.flatnonzero(ranked_tiers[:, 0] < 2):
+                index = start + row
+                recommendations.append(self._entry(item_ids[index], item_names[index], preferred[index],
+                                                   order[row].tolist(), ranked_tiers[row].tolist()))
+
+        recommendations.sort(key=lambda x: x["score"], reverse=True)
+        return recommendations
+
+    def _candidate(self, column, tier):
+        return {
+            "container_id": self.container_ids[column],
+            "container_name": self.container_names[column],
+            "zone": self.container_zones[column],
+            "score": PREFERRED_ZONE_SCORE if tier == 0 else OTHER_ZONE_SCORE
+        }
+
+    def _entry(self, item_id, item_name, preferred_zone, columns, tiers):
+        candidates = [self._candidate(column, tier) for column, tier in zip(columns, tiers) if tier < 2]
+        best = candidates[0]
+        if tiers[0] == 0:
+            reasoning = f"Container is in the preferred zone ({preferred_zone})"
+        else:
+            reasoning = (f"No containers available in preferred zone ({preferred_zone}). "
+                         f"Selected container in zone {best['zone']} with sufficient space.")
+        return {
+            "item_id": item_id,
+            "item_name": item_name,
+            "container_id": best['container_id'],
+            "container_name": best['container_name'],
+            "reasoning": reasoning,
+            "score": best['score'],
+            "alternatives": candidates[1:]
+        }
@@ -1,7 +1,27 @@
 from rest_framework import serializers
 from .models import Container, Item, PlacementHistory
+from .pagination import requested_fields
 
-class ContainerSerializer(serializers.ModelSerializer):
+
+class SparseFieldsMixin:
+    """
+    Drop output fields not named in the request's ``?fields=`` parameter.
+
+    Only applies to GET requests, so writes still validate every field.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        fields = requested_fields(request)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class ContainerSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Container model with included calculated fields.
     """
@@ -19,10 +39,14 @@ class ContainerSerializer(serializers.ModelSerializer):
     
     def get_item_count(self, obj):
         """Return the number of items in this container."""
-        return obj.items.count()
+        # Annotated by ContainerViewSet's queryset; count directly otherwise
+        item_count = getattr(obj, 'item_count', None)
+        if item_count is None:
+            return obj.items.count()
+        return item_count
 
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Item model with calculated volume field.
     """
@@ -53,7 +77,7 @@ class ItemSerializer(serializers.ModelSerializer):
         return None
 
 
-class PlacementHistorySerializer(serializers.ModelSerializer):
+class PlacementHistorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for PlacementHistory model with detailed item and container info.
     """
@@ -160,7 +184,24 @@ class UndockingPlanSerializer(serializers.Serializer):
     """
     undocking_container_id = serializers.CharField()
     undocking_date = serializers.DateTimeField()
-    max_weight = serializers.FloatField()
+    max_weight = serializers.FloatField(min_value=0)
+
+
+class ScheduleEntrySerializer(serializers.Serializer):
+    """
+    Serializer for one usage schedule entry; an entry without ``day`` is
+    used on every simulated day.
+    """
+    item_id = serializers.CharField(required=False)
+    itemId = serializers.CharField(required=False)
+    name = serializers.CharField(required=False)
+    day = serializers.IntegerField(required=False, allow_null=True, min_value=1)
+    uses = serializers.FloatField(required=False, min_value=0)
+
+    def validate(self, attrs):
+        if not any(attrs.get(key) for key in ('item_id', 'itemId', 'name')):
+            raise serializers.ValidationError('Each entry needs an item_id, itemId or name')
+        return attrs
 
 
 class SimulationRequestSerializer(serializers.Serializer):
@@ -169,7 +210,4 @@ class SimulationRequestSerializer(serializers.Serializer):
     """
     num_of_days = serializers.IntegerField(required=False)
     to_timestamp = serializers.DateTimeField(required=False)
-    items_to_be_used_per_day = serializers.ListField(
-        child=serializers.DictField(),
-        required=False
-    )
+    items_to_be_used_per_day = ScheduleEntrySerializer(many=True, required=False)
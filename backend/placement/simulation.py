@@ -0,0 +1,145 @@
+"""
+Vectorized time simulation for the CSV-backed placement data.
+
+A whole usage schedule is turned into a (days x scheduled items) matrix and
+applied with cumulative sums, and expirations over the full date range come
+from one array comparison, so simulating a year costs about the same as
+simulating a day.
+"""
+
+import logging
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _entry_item_id(entry):
+    """Return the item id of a schedule entry, accepting snake or camel case."""
+    for key in ('item_id', 'itemId'):
+        if entry.get(key) not in (None, ''):
+            return entry[key]
+    return None
+
+
+class SimulationEngine:
+    """
+    Applies a multi-day usage schedule to a snapshot of the items data.
+
+    Schedule entries are dicts with ``item_id`` (or ``itemId``) or ``name``,
+    an optional ``day`` (1-based; omitted means the item is used every day)
+    and an optional ``uses`` count (default 1).
+    """
+
+    def __init__(self, items_df):
+        self.items_df = items_df.reset_index(drop=True)
+        self._item_ids = self.items_df['item_id'].tolist()
+        self._names = self.items_df['name'].tolist() if 'name' in self.items_df.columns else [None] * len(self._item_ids)
+        self._keys = self.items_df['item_id'].astype(str).to_numpy()
+        self._row_of = {key: row for row, key in enumerate(self._keys)}
+        self._row_of_name = {}
+        for row, name in enumerate(self._names):
+            self._row_of_name.setdefault(str(name), row)
+
+        if 'usage_limit' in self.items_df.columns:
+            self.usage = pd.to_numeric(self.items_df['usage_limit'], errors='coerce').to_numpy(dtype=float, copy=True)
+        else:
+            self.usage = np.full(len(self.items_df), np.nan)
+
+        if 'expiry_date' in self.items_df.columns:
+            self.expiry = pd.to_datetime(self.items_df['expiry_date'], errors='coerce').dt.normalize().to_numpy()
+        else:
+            self.expiry = np.full(len(self.items_df), np.datetime64('NaT'), dtype='datetime64[ns]')
+
+    def _entry(self, row):
+        return {"item_id": self._item_ids[row], "name": self._names[row]}
+
+    def _resolve_schedule(self, schedule, num_days):
+        """Turn schedule entries into parallel (row, day, uses) arrays; day 0 means every day."""
+        rows, days, uses = [], [], []
+        for entry in schedule or []:
+            item_id = _entry_item_id(entry)
+            if item_id is not None:
+                row = self._row_of.get(str(item_id))
+            else:
+                row = self._row_of_name.get(str(entry.get('name')))
+            if row is None:
+                continue
+            day = int(entry.get('day') or 0)
+            if day < 0 or day > num_days:
+                continue
+            rows.append(row)
+            days.append(day)
+            uses.append(float(entry.get('uses', 1)))
+        return np.asarray(rows, dtype=int), np.asarray(days, dtype=int), np.asarray(uses, dtype=float)
+
+    def run(self, start_date, num_days, schedule=None):
+        """
+        Simulate ``num_days`` days from ``start_date``.
+
+        Updates ``self.usage`` in place and returns the per-day change sets
+        plus the aggregated changes over the whole range.
+        """
+        num_days = max(int(num_days), 0)
+        dates = [start_date + timedelta(days=d + 1) for d in range(num_days)]
+        day_changes = [
+            {"day": d + 1, "date": date.strftime('%Y-%m-%d'), "itemsUsed": [], "itemsExpired": [], "itemsDepleted": []}
+            for d, date in enumerate(dates)
+        ]
+        items_used, items_depleted = [], []
+
+        rows, days, uses = self._resolve_schedule(schedule, num_days)
+        if num_days and len(rows):
+            columns, col_of_entry = np.unique(rows, return_inverse=True)
+            matrix = np.zeros((num_days, len(columns)))
+            recurring = days == 0
+            matrix += np.bincount(col_of_entry[recurring], weights=uses[recurring], minlength=len(columns))
+            np.add.at(matrix, (days[~recurring] - 1, col_of_entry[~recurring]), uses[~recurring])
+
+            # Only items with a positive usage limit are consumable
+            limits = self.usage[columns]
+            limits = np.where(np.isnan(limits), 0.0, np.maximum(limits, 0.0))
+            used_before = np.cumsum(matrix, axis=0) - matrix
+            applied = np.clip(np.minimum(matrix, limits - used_before), 0.0, None)
+            remaining = limits - np.cumsum(applied, axis=0)
+            self.usage[columns] = np.where(np.isnan(self.usage[columns]), np.nan, remaining[-1])
+
+            for d, c in zip(*np.nonzero(applied)):
+                row = columns[c]
+                entry = self._entry(row)
+                day_changes[d]["itemsUsed"].append({**entry, "remaining_uses": float(remaining[d, c])})
+                if remaining[d, c] <= 0:
+                    day_changes[d]["itemsDepleted"].append(entry)
+                    items_depleted.append(entry)
+
+            total_applied = applied.sum(axis=0)
+            for c in np.flatnonzero(total_applied):
+                row = columns[c]
+                items_used.append({
+                    **self._entry(row),
+                    "uses": float(total_applied[c]),
+                    "remaining_uses": float(remaining[-1, c])
+                })
+
+        start_day = np.datetime64(pd.Timestamp(start_date).normalize().to_datetime64(), 'ns')
+        dated = np.flatnonzero(~np.isnat(self.expiry))
+        offsets = (self.expiry[dated] - start_day) // np.timedelta64(1, 'D')
+        in_range = (offsets > 0) & (offsets <= num_days)
+        order = np.argsort(offsets[in_range], kind='stable')
+        items_expired = []
+        for row, offset in zip(dated[in_range][order], offsets[in_range][order]):
+            entry = self._entry(row)
+            day_changes[offset - 1]["itemsExpired"].append(entry)
+            items_expired.append(entry)
+
+        return {
+            "newDate": (start_date + timedelta(days=num_days)).strftime('%Y-%m-%d'),
+            "changes": {
+                "itemsUsed": items_used,
+                "itemsExpired": items_expired,
+                "itemsDepletedToday": items_depleted
+            },
+            "days": day_changes
+        }
@@ -0,0 +1,133 @@
+"""
+Vectorized placement statistics for the CSV-backed placement data.
+
+Placement volumes are computed as one column and summed per container with a
+single ``np.bincount`` over interned container codes; zone totals are another
+``bincount`` over the per-container arrays. Totals, per-zone and per-container
+utilization all come out of one pass and are shared by ``statistics/``,
+``results/`` and the dashboard.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _volume(df):
+    """Width x depth x height per row, with missing dimensions counted as 0."""
+    dims = [pd.to_numeric(df[c], errors='coerce') if c in df.columns else pd.Series(0.0, index=df.index)
+            for c in ('width_cm', 'depth_cm', 'height_cm')]
+    return (dims[0] * dims[1] * dims[2]).fillna(0.0).to_numpy(dtype=float)
+
+
+def _percent(used, total):
+    return np.divide(used * 100.0, total, out=np.zeros_like(used, dtype=float), where=total > 0)
+
+
+class PlacementStatistics:
+    """
+    Utilization of every container and zone for one placement snapshot.
+
+    Args:
+        containers_df: Containers with ``container_id``, ``zone`` and either a
+            ``volume`` column or the three dimension columns
+        placements_df: Placements with ``container_id`` and item dimensions
+        total_items: Number of items in the inventory (for the placement rate)
+    """
+
+    def __init__(self, containers_df, placements_df=None, total_items=None):
+        containers_df = containers_df.reset_index(drop=True)
+        self.container_ids = containers_df['container_id'].astype(str).to_numpy()
+        self.names = (containers_df['name'] if 'name' in containers_df.columns
+                      else pd.Series([f"Container {cid}" for cid in self.container_ids])).tolist()
+        self.zones = (containers_df['zone'] if 'zone' in containers_df.columns
+                      else pd.Series([None] * len(containers_df))).tolist()
+
+        if 'volume' in containers_df.columns:
+            self.capacity = pd.to_numeric(containers_df['volume'], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+        else:
+            self.capacity = _volume(containers_df)
+
+        self.placed_items = 0
+        self.total_used_volume = 0.0
+        self.used = np.zeros(len(self.container_ids))
+        self.counts = np.zeros(len(self.container_ids), dtype=int)
+        if placements_df is not None and not placements_df.empty:
+            volume = _volume(placements_df)
+            self.placed_items = len(placements_df)
+            self.total_used_volume = float(volume.sum())
+            if 'container_id' in placements_df.columns:
+                # Intern container ids once; placements in unknown containers get -1
+                codes = pd.Index(self.container_ids).get_indexer(placements_df['container_id'].astype(str))
+                known = codes >= 0
+                self.used = np.bincount(codes[known], weights=volume[known], minlength=len(self.container_ids))
+                self.counts = np.bincount(codes[known], minlength=len(self.container_ids))
+
+        self.total_items = self.placed_items if total_items is None else total_items
+        self.utilization = _percent(self.used, self.capacity)
+
+    @property
+    def total_capacity(self):
+        return float(self.capacity.sum())
+
+    def container_utilization(self):
+        """Per-container rows, in the order of the containers frame."""
+        return [
+            {
+                "container_id": cid,
+                "name": name,
+                "zone": zone,
+                "volume_cm3": float(capacity),
+                "used_volume_cm3": float(used),
+                "item_count": int(count),
+                "utilization_percent": float(utilization)
+            }
+            for cid, name, zone, capacity, used, count, utilization in zip(
+                self.container_ids, self.names, self.zones, self.capacity, self.used, self.counts, self.utilization
+            )
+        ]
+
+    def zone_utilization(self):
+        """Per-zone rows aggregated from the per-container arrays."""
+        zone_codes, zone_names = pd.factorize(pd.Series(self.zones, dtype=object), use_na_sentinel=False)
+        capacity = np.bincount(zone_codes, weights=self.capacity, minlength=len(zone_names))
+        used = np.bincount(zone_codes, weights=self.used, minlength=len(zone_names))
+        counts = np.bincount(zone_codes, weights=self.counts, minlength=len(zone_names))
+        containers = np.bincount(zone_codes, minlength=len(zone_names))
+        utilization = _percent(used, capacity)
+        return [
+            {
+                "zone": zone,
+                "containers": int(n),
+                "volume_cm3": float(c),
+                "used_volume_cm3": float(u),
+                "item_count": int(k),
+                "utilization_percent": float(p)
+            }
+            for zone, n, c, u, k, p in zip(zone_names, containers, capacity, used, counts, utilization)
+        ]
+
+    def summary(self):
+        """Totals plus per-zone and per-container utilization."""
+        total_capacity = self.total_capacity
+        return {
+            "total_items": int(self.total_items),
+            "placed_items": int(self.placed_items),
+            "unplaced_items": int(self.total_items - self.placed_items),
+            "placement_rate_percent": float(self.placed_items / self.total_items * 100) if self.total_items > 0 else 0.0,
+            "volume_utilization_percent": float(self.total_used_volume / total_capacity * 100) if total_capacity > 0 else 0.0,
+            "total_container_volume_cm3": total_capacity,
+            "used_volume_cm3": self.total_used_volume,
+            "zone_utilization": self.zone_utilization(),
+            "container_utilization": self.container_utilization()
+        }
+
+    def utilization_by_container(self):
+        """``{container_id: {utilization, used_volume, total_volume}}`` as returned by ``results/``."""
+        return {
+            cid: {
+                'utilization': round(float(utilization), 2),
+                'used_volume': round(float(used), 2),
+                'total_volume': round(float(capacity), 2)
+            }
+            for cid, capacity, used, utilization in zip(self.container_ids, self.capacity, self.used, self.utilization)
+        }
@@ -1,3 +1,823 @@
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+import pandas as pd
+import io
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from . import export, geometry, metrics, trace
+from .algorithms import PlacementManager
+from .expiry_index import ExpiryIndex
+from .models import Container, Item, PlacementHistory
+from .recommendations import RecommendationEngine
+from .statistics import PlacementStatistics
+from .undocking import solve_knapsack
+
+
+class DataDirTestCase(TestCase):
+    """Runs each test against its own empty ``settings.DATA_DIR`` (``self.data_dir``)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.data_dir = self.temporary_dir()
+        self.override_settings(DATA_DIR=self.data_dir)
+
+    def temporary_dir(self):
+        """A temporary directory removed when the test ends."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return Path(directory.name)
+
+    def override_settings(self, **overrides):
+        """Override settings until the test ends."""
+        settings_override = override_settings(**overrides)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class ListQueryCountTests(TestCase):
+    """List endpoints must not issue queries per row."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def create_rows(self, count):
+        for i in range(count):
+            container = Container.objects.create(
+                name=f"C{Container.objects.count()}", width_cm=100, height_cm=100, depth_cm=100,
+                max_weight_kg=500, zone="Storage"
+            )
+            for j in range(2):
+                item = Item.objects.create(
+                    name=f"I{i}-{j}", width_cm=10, height_cm=10, depth_cm=10,
+                    weight_kg=1, container=container, is_placed=True
+                )
+                PlacementHistory.objects.create(item=item, container=container)
+
+    def count_list_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def assert_constant_queries(self, url, expected_rows_per_batch):
+        self.create_rows(3)
+        small_count, small_rows = self.count_list_queries(url)
+        self.create_rows(30)
+        large_count, large_rows = self.count_list_queries(url)
+
+        self.assertEqual(len(small_rows), 3 * expected_rows_per_batch)
+        self.assertEqual(len(large_rows), 33 * expected_rows_per_batch)
+        self.assertEqual(small_count, large_count)
+        self.assertLessEqual(large_count, 2)
+
+    def test_container_list(self):
+        self.assert_constant_queries('/api/placement/containers/', 1)
+
+    def test_container_list_item_count(self):
+        self.create_rows(2)
+        _, rows = self.count_list_queries('/api/placement/containers/')
+        self.assertEqual([row['item_count'] for row in rows], [2, 2])
+
+    def test_item_list(self):
+        self.assert_constant_queries('/api/placement/items/', 2)
+
+    def test_item_list_container_fields(self):
+        self.create_rows(1)
+        _, rows = self.count_list_queries('/api/placement/items/')
+        self.assertEqual({(row['container_name'], row['container_zone']) for row in rows}, {("C0", "Storage")})
+
+    def test_history_list(self):
+        self.assert_constant_queries('/api/placement/history/', 2)
+
+
+class PaginationAndFieldsTests(TestCase):
+    """Opt-in cursor pages and ?fields= on the viewsets."""
+
+    def setUp(self):
+        self.client = APIClient()
+        container = Container.objects.create(
+            name="C", width_cm=100, height_cm=100, depth_cm=100, max_weight_kg=500, zone="Storage"
+        )
+        for i in range(25):
+            Item.objects.create(name=f"I{i}", width_cm=1, height_cm=1, depth_cm=1, weight_kg=1, container=container)
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get('/api/placement/items/')
+        self.assertEqual(len(response.json()), 25)
+
+    def test_cursor_pages_cover_all_rows_once(self):
+        url = '/api/placement/items/?page_size=10'
+        seen = []
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page['results']), 10)
+            seen.extend(row['id'] for row in page['results'])
+            url = page['next']
+        self.assertEqual(seen, sorted(Item.objects.values_list('id', flat=True)))
+
+    def test_history_pages_match_unpaged_order(self):
+        container = Container.objects.get()
+        items = list(Item.objects.order_by('id'))
+        for i, item in enumerate(items):
+            entry = PlacementHistory.objects.create(item=item, container=container)
+            # Several entries share a placement date
+            PlacementHistory.objects.filter(pk=entry.pk).update(
+                placement_date=entry.placement_date.replace(year=2020, day=1 + (i * 7) % 5))
+
+        unpaged = [row['id'] for row in self.client.get('/api/placement/history/').json()]
+        url = '/api/placement/history/?page_size=4&fields=id'
+        paged = []
+        while url:
+            page = self.client.get(url).json()
+            paged.extend(row['id'] for row in page['results'])
+            url = page['next']
+        self.assertEqual(paged, unpaged)
+        self.assertEqual(unpaged, list(PlacementHistory.objects.order_by('-placement_date', '-id')
+                                       .values_list('id', flat=True)))
+
+    def test_fields_restrict_output_and_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/placement/items/?fields=id,name')
+        self.assertEqual(set(response.json()[0]), {'id', 'name'})
+        self.assertNotIn('weight_kg', queries.captured_queries[-1]['sql'])
+        self.assertNotIn('placement_container', queries.captured_queries[-1]['sql'])
+
+    def test_fields_with_related_value(self):
+        response = self.client.get('/api/placement/items/?fields=name,container_name&page_size=5')
+        self.assertEqual(response.json()['results'][0], {'name': 'I0', 'container_name': 'C'})
+
+
+class PlacementStatisticsTests(TestCase):
+    """Vectorized utilization must match a straightforward per-container sum."""
+
+    def setUp(self):
+        self.containers = pd.DataFrame({
+            'container_id': ['A', 'B', 'C'],
+            'name': ['Alpha', 'Beta', 'Gamma'],
+            'zone': ['Lab', 'Lab', 'Storage'],
+            'width_cm': [10, 20, 10], 'depth_cm': [10, 10, 10], 'height_cm': [10, 10, 0],
+        })
+        self.placements = pd.DataFrame({
+            'item_id': ['i1', 'i2', 'i3', 'i4'],
+            'container_id': ['A', 'A', 'B', 'missing'],
+            'width_cm': [5, 5, 10, 1], 'depth_cm': [10, 10, 10, 1], 'height_cm': [10, 2, 10, 1],
+        })
+
+    def test_per_container_and_zone(self):
+        stats = PlacementStatistics(self.containers, self.placements, total_items=5)
+        summary = stats.summary()
+
+        by_id = {row['container_id']: row for row in summary['container_utilization']}
+        self.assertEqual(by_id['A']['used_volume_cm3'], 600.0)
+        self.assertEqual(by_id['A']['item_count'], 2)
+        self.assertAlmostEqual(by_id['A']['utilization_percent'], 60.0)
+        self.assertEqual(by_id['B']['utilization_percent'], 50.0)
+        self.assertEqual(by_id['C']['utilization_percent'], 0.0)
+
+        zones = {row['zone']: row for row in summary['zone_utilization']}
+        self.assertEqual(zones['Lab']['volume_cm3'], 3000.0)
+        self.assertEqual(zones['Lab']['used_volume_cm3'], 1600.0)
+        self.assertEqual(zones['Lab']['item_count'], 3)
+
+        # Totals include placements whose container is unknown
+        self.assertEqual(summary['placed_items'], 4)
+        self.assertEqual(summary['unplaced_items'], 1)
+        self.assertEqual(summary['used_volume_cm3'], 1601.0)
+
+    def test_results_shape(self):
+        utilization = PlacementStatistics(self.containers, self.placements).utilization_by_container()
+        self.assertEqual(utilization['A'], {'utilization': 60.0, 'used_volume': 600.0, 'total_volume': 1000.0})
+
+    def test_no_placements(self):
+        summary = PlacementStatistics(self.containers, None, total_items=3).summary()
+        self.assertEqual(summary['placed_items'], 0)
+        self.assertTrue(all(row['used_volume_cm3'] == 0.0 for row in summary['container_utilization']))
+
+
+class RecommendationEngineTests(TestCase):
+    """Batch recommendations rank preferred-zone fits first, then the tightest fit elsewhere."""
+
+    def setUp(self):
+        self.containers = pd.DataFrame({
+            'container_id': ['L1', 'L2', 'S1', 'S2'],
+            'zone': ['Lab', 'Lab', 'Storage', 'Storage'],
+            'width_cm': [10, 10, 10, 20], 'depth_cm': [10, 10, 10, 10], 'height_cm': [10, 10, 10, 10],
+            'max_weight_kg': [100, 100, 100, 5],
+        })
+        self.placements = pd.DataFrame({
+            'item_id': ['p1'], 'container_id': ['L2'],
+            'width_cm': [5], 'depth_cm': [10], 'height_cm': [10], 'mass_kg': [1],
+        })
+
+    def recommend(self, unplaced, **kwargs):
+        return RecommendationEngine(self.containers, self.placements).recommend(pd.DataFrame(unplaced), **kwargs)
+
+    def test_preferred_zone_prefers_fullest_container(self):
+        [rec] = self.recommend({'item_id': ['a'], 'name': ['A'], 'width_cm': [5], 'depth_cm': [5], 'height_cm': [5],
+                                'mass_kg': [1], 'preferred_zone': ['Lab']})
+        self.assertEqual(rec['container_id'], 'L2')
+        self.assertEqual(rec['score'], 100)
+        self.assertEqual([alt['container_id'] for alt in rec['alternatives']], ['L1', 'S1'])
+
+    def test_fallback_respects_residual_volume_and_weight(self):
+        # Too big for L2's residual space and too heavy for S2
+        [rec] = self.recommend({'item_id': ['b'], 'name': ['B'], 'width_cm': [10], 'depth_cm': [10], 'height_cm': [8],
+                                'mass_kg': [10], 'preferred_zone': ['Dock']}, top_k=5)
+        self.assertEqual(rec['score'], 70)
+        self.assertEqual([rec['container_id']] + [alt['container_id'] for alt in rec['alternatives']], ['L1', 'S1'])
+
+    def test_items_that_fit_nowhere_are_skipped(self):
+        recs = self.recommend({'item_id': ['c'], 'name': ['C'], 'width_cm': [50], 'depth_cm': [50], 'height_cm': [50],
+                               'mass_kg': [1], 'preferred_zone': ['Lab']})
+        self.assertEqual(recs, [])
+
+
+class MetricsEndpointTests(TestCase):
+    """Requests are recorded per route pattern and exposed as Prometheus text."""
+
+    # DRF router patterns are regexes; the label is the matched pattern, not the path
+    ITEM_ROUTE = 'placement/items/(?P<pk>[^/.]+)/$'
+
+    def test_route_latency_is_exposed(self):
+        client = APIClient()
+        item = Item.objects.create(name="Probe", width_cm=1, height_cm=1, depth_cm=1, weight_kg=1)
+        before = metrics.REQUEST_LATENCY.count(method='GET', route=self.ITEM_ROUTE, status=200)
+        client.get(f'/placement/items/{item.pk}/')
+
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertEqual(metrics.REQUEST_LATENCY.count(method='GET', route=self.ITEM_ROUTE, status=200),
+                         before + 1)
+        body = response.content.decode()
+        self.assertIn(f'placement_http_request_duration_seconds_bucket{{method="GET",route="{self.ITEM_ROUTE}"', body)
+        self.assertIn('# TYPE placement_stage_duration_seconds histogram', body)
+
+
+class ProfilingTests(DataDirTestCase):
+    """A request carrying the profiling token is captured and can be fetched by id."""
+
+    def setUp(self):
+        super().setUp()
+        self.profile_dir = self.temporary_dir()
+        self.override_settings(PROFILE_TOKEN='secret', PROFILE_DIR=self.profile_dir, PROFILE_MAX_FILES=2)
+
+    def test_unprofiled_by_default(self):
+        response = self.client.get('/placement/items/')
+        self.assertNotIn('X-Profile-Id', response)
+        response = self.client.get('/placement/items/', HTTP_X_PROFILE='wrong')
+        self.assertNotIn('X-Profile-Id', response)
+        response = self.client.get('/placement/items/?profile=sécret')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_no_token_disables_profiling_even_in_debug(self):
+        self.override_settings(PROFILE_TOKEN=None, DEBUG=True)
+        response = self.client.get('/placement/items/?profile=anything')
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_capture_and_fetch(self):
+        response = self.client.get('/placement/items/', HTTP_X_PROFILE='secret')
+        profile_id = response['X-Profile-Id']
+
+        summary = self.client.get(f'/profiles/{profile_id}/?profile=secret')
+        self.assertEqual(summary.status_code, 200)
+        self.assertIn(b'cumulative', summary.content)
+        raw = self.client.get(f'/profiles/{profile_id}/?profile=secret&format=pstats')
+        self.assertEqual(raw.status_code, 200)
+        self.assertEqual(self.client.get(f'/profiles/{profile_id}/').status_code, 403)
+
+    def test_profile_directory_is_bounded(self):
+        for _ in range(3):
+            self.client.get('/placement/items/?profile=secret')
+        self.assertEqual(len(list(self.profile_dir.glob('*.pstats'))), 2)
+
+
+class TraceTests(TestCase):
+    """Trace messages are built only when their subsystem is enabled, and are rate limited."""
+
+    def setUp(self):
+        self.addCleanup(trace.configure, None)
+        self.addCleanup(logging.getLogger(f'{trace.TRACE_ROOT}.unit').setLevel, logging.NOTSET)
+        self.tracer = trace.Tracer('unit', rate=0, burst=2)
+
+    def test_disabled_messages_are_not_built(self):
+        trace.configure(None)
+        built = []
+        self.tracer.debug(lambda: built.append(1) or 'expensive')
+        self.assertEqual(built, [])
+
+    def test_enabled_subsystem_and_rate_limit(self):
+        trace.configure('unit=DEBUG')
+        with self.assertLogs(f'{trace.TRACE_ROOT}.unit', level='DEBUG') as logs:
+            for i in range(5):
+                self.tracer.debug(lambda i=i: f'message {i}')
+        self.assertEqual(len(logs.records), 2)
+        self.assertFalse(trace.get_tracer('other').enabled())
+
+
+class SimulationTests(DataDirTestCase):
+    """The usage schedule is validated before any day is simulated."""
+
+    def setUp(self):
+        super().setUp()
+        pd.DataFrame({
+            'item_id': [1, 2], 'name': ['a', 'b'], 'usage_limit': [10, 10], 'expiry_date': ['2099-01-01', '2099-01-01'],
+        }).to_csv(self.data_dir / 'input_items.csv', index=False)
+
+    def test_invalid_schedule_is_rejected(self):
+        before = (self.data_dir / 'input_items.csv').read_bytes()
+        for entry in ({'item_id': 1, 'day': 'soon'}, {'item_id': 1, 'uses': 'x'}, {'uses': 1},
+                      {'item_id': 1, 'day': 0}, {'item_id': 1, 'uses': -1}):
+            response = self.client.post('/placement/simulate/', {
+                'numOfDays': 3, 'itemsToBeUsedPerDay': [entry],
+            }, format='json')
+            self.assertEqual(response.status_code, 400, entry)
+            self.assertIn('items_to_be_used_per_day', response.json()['errors'])
+        self.assertEqual((self.data_dir / 'input_items.csv').read_bytes(), before)
+
+    def test_entries_without_day_apply_every_day(self):
+        response = self.client.post('/placement/simulate/', {
+            'numOfDays': 3, 'itemsToBeUsedPerDay': [{'itemId': 1}, {'name': 'b', 'day': 2, 'uses': 4}],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        used = {entry['item_id']: entry['uses'] for entry in response.json()['changes']['itemsUsed']}
+        self.assertEqual(used, {1: 3, 2: 4})
+        self.assertEqual(pd.read_csv(self.data_dir / 'input_items.csv')['usage_limit'].tolist(), [7, 6])
+
+
+class ExpiryIndexTests(DataDirTestCase):
+    """The expiry index answers waste queries, copies on removal and follows file changes."""
+
+    def setUp(self):
+        super().setUp()
+        self.items_path = self.data_dir / 'input_items.csv'
+        self.placements_path = self.data_dir / 'placement_results.csv'
+        pd.DataFrame({
+            'item_id': [1, 2, 3, 4, 5], 'name': ['old', 'soon', 'late', 'empty', 'loose'],
+            'width_cm': [1, 1, 1, 2, 1], 'depth_cm': [1, 1, 1, 3, 1], 'height_cm': [1, 1, 1, 4, 1],
+            'expiry_date': ['2020-01-01', '2025-01-10', '2025-03-01', 'N/A', '2020-01-01'],
+            'usage_limit': [5, 5, 5, 0, 5],
+        }).to_csv(self.items_path, index=False)
+        # Item 5 is not placed, so it is never waste
+        pd.DataFrame({
+            'item_id': [1, 2, 3, 4], 'container_id': ['A', 'A', 'B', 'B'],
+            'x_cm': [0, 1, 2, 10], 'y_cm': [0, 0, 0, 20], 'z_cm': [0, 0, 0, 30],
+        }).to_csv(self.placements_path, index=False)
+
+    def index(self):
+        return ExpiryIndex.from_csv(self.items_path, self.placements_path)
+
+    def test_waste_as_of(self):
+        waste = self.index().waste_as_of('2025-01-10')
+        self.assertEqual([(entry['item_id'], entry['reason']) for entry in waste],
+                         [(1, 'Expired'), (2, 'Expired'), (4, 'Out of Uses')])
+        self.assertEqual(waste[2]['containerId'], 'B')
+        self.assertEqual(waste[2]['position']['endCoordinates'], {'width': 12, 'depth': 23, 'height': 34})
+        self.assertEqual([entry['item_id'] for entry in self.index().waste_as_of('2025-01-09')], [1, 4])
+
+    def test_expiring_between(self):
+        index = self.index()
+        self.assertEqual(index.expiring_between('2025-01-01', '2025-03-01'), [2, 3])
+        self.assertEqual(index.expiring_between('2025-01-10', '2025-02-28'), [])
+        self.assertEqual(len(index), 4)
+
+    def test_without_leaves_the_shared_index_alone(self):
+        index = self.index()
+        smaller = index.without([2, '4'])
+        self.assertEqual([entry['item_id'] for entry in smaller.waste_as_of('2025-12-31')], [1, 3])
+        self.assertEqual([entry['item_id'] for entry in index.waste_as_of('2025-12-31')], [1, 2, 3, 4])
+        self.assertEqual(len(smaller), 2)
+
+    def test_cache_follows_file_changes(self):
+        index = self.index()
+        self.assertIs(self.index(), index)
+
+        stat = self.items_path.stat()
+        frame = pd.read_csv(self.items_path)
+        frame.loc[frame['item_id'] == 3, 'usage_limit'] = 0
+        frame.to_csv(self.items_path, index=False)
+        os.utime(self.items_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        rebuilt = self.index()
+        self.assertIsNot(rebuilt, index)
+        self.assertEqual([entry['item_id'] for entry in rebuilt.waste_as_of('2024-01-01')], [1, 3, 4])
+
+
+class ExportArrangementTests(DataDirTestCase):
+    """The stored arrangement streams in every format, chunk by chunk."""
+
+    def setUp(self):
+        super().setUp()
+        pd.DataFrame({
+            'item_id': [1, 2, 3], 'name': ['a', 'b', 'c'],
+            'width_cm': [1, 2, 3], 'depth_cm': [4, 5, 6], 'height_cm': [7, 8, 9],
+        }).to_csv(self.data_dir / 'input_items.csv', index=False)
+        # Coordinates only: extents come from the items file
+        pd.DataFrame({
+            'item_id': [1, 2, 3], 'container_id': ['A', 'A', 'B'],
+            'x_cm': [0, 1, 0], 'y_cm': [0, 0, 0], 'z_cm': [0, 0, 2.5],
+        }).to_csv(self.data_dir / 'placement_results.csv', index=False)
+
+    def export(self, export_format):
+        response = self.client.get(f'/placement/export/arrangement/?format={export_format}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_csv(self):
+        frame = pd.read_csv(io.BytesIO(self.export('csv')))
+        self.assertEqual(list(frame.columns), export.ARRANGEMENT_COLUMNS)
+        self.assertEqual(frame['depth_cm'].tolist(), [4, 5, 6])
+
+    def test_ndjson(self):
+        rows = [json.loads(line) for line in self.export('ndjson').decode().splitlines()]
+        self.assertEqual(rows[2]['container_id'], 'B')
+        self.assertEqual(rows[2]['z_cm'], 2.5)
+
+    def test_binary_round_trip_across_chunks(self):
+        chunks = export.iter_arrangement(self.data_dir / 'placement_results.csv',
+                                         self.data_dir / 'input_items.csv', chunk_rows=2)
+        frame = export.read_binary(b''.join(export.binary_stream(chunks)))
+        self.assertEqual(frame['item_id'].tolist(), ['1', '2', '3'])
+        self.assertEqual(frame['height_cm'].tolist(), [7.0, 8.0, 9.0])
+        self.assertEqual(export.read_binary(self.export('binary'))['x_cm'].tolist(), [0.0, 1.0, 0.0])
+
+    def test_unknown_format_and_missing_results(self):
+        self.assertEqual(self.client.get('/placement/export/arrangement/?format=xml').status_code, 400)
+        (self.data_dir / 'placement_results.csv').unlink()
+        self.assertEqual(self.client.get('/placement/export/arrangement/').status_code, 404)
+
+
+class ImportTests(DataDirTestCase):
+    """Imports validate the whole batch, store the good rows and report the rest."""
+
+    def setUp(self):
+        super().setUp()
+        (self.data_dir / 'containers.csv').write_text(
+            'zone,container_id,width_cm,depth_cm,height_cm\nLab,C1,10,10,10\n')
+        (self.data_dir / 'input_items.csv').write_text(
+            'item_id,name,width_cm,depth_cm,height_cm,mass_kg,priority,expiry_date,preferred_zone\n'
+            '1,Kit,1,2,3,4.50,10,N/A,Lab\n'
+            '2,Tool,1,2,3,4,20,N/A,Lab\n')
+
+    def upload(self, path, text):
+        return self.client.post(path, {'file': io.BytesIO(text.encode())}, format='multipart')
+
+    def test_csv_upsert_keeps_good_rows_and_reports_bad_ones(self):
+        response = self.upload('/placement/import/items/',
+                               'item_id,name,width_cm,depth_cm,height_cm,mass_kg,priority,preferred_zone\n'
+                               '2,Tool v2,5,5,5,1,30,Lab\n'
+                               '3,Box,1,1,1,1,1,\n'
+                               '4,Bad,-1,x,1,,500,Nowhere\n'
+                               '5,Twin,1,1,1,1,1,Lab\n'
+                               '5,Twin,1,1,1,1,1,Lab\n')
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report['imported'], report['inserted'], report['updated'], report['rejected']), (2, 1, 1, 3))
+        self.assertEqual(report['errors'][0], {'row': 3, 'id': '4', 'errors': [
+            'weight_kg is required', 'width_cm must be > 0', 'depth_cm must be a number',
+            'priority must be >= 1 and <= 100', 'preferred_zone is not a known zone']})
+        self.assertEqual([error['errors'] for error in report['errors'][1:]], [['duplicate item_id in batch']] * 2)
+
+        lines = (self.data_dir / 'input_items.csv').read_text().splitlines()
+        # Stored column names and untouched rows are preserved byte for byte
+        self.assertEqual(lines[0], 'item_id,name,width_cm,depth_cm,height_cm,mass_kg,priority,expiry_date,preferred_zone')
+        self.assertEqual(lines[1], '1,Kit,1,2,3,4.50,10,N/A,Lab')
+        # Updated in place, keeping stored values for columns the batch lacks
+        self.assertEqual(lines[2], '2,Tool v2,5,5,5,1,30,N/A,Lab')
+        self.assertEqual(lines[3], '3,Box,1,1,1,1,1,,')
+        self.assertEqual(len(lines), 4)
+
+    def test_rows_with_wrong_field_count_are_rejected(self):
+        response = self.upload('/placement/import/items/',
+                               'item_id,name,width_cm,depth_cm,height_cm,weight_kg\n'
+                               '004,D,1,2,3,4,5\n'
+                               '005,E,1,2\n'
+                               '006,F,1,2,3,4\n')
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report['success'], report['imported'], report['rejected']), (False, 1, 2))
+        self.assertEqual([(error['row'], error['id']) for error in report['errors']], [(1, '004'), (2, '005')])
+        self.assertEqual(report['errors'][0]['errors'], ['number of fields does not match the header'])
+
+        rows = pd.read_csv(self.data_dir / 'input_items.csv', dtype=str, keep_default_na=False)
+        self.assertEqual(rows['item_id'].tolist(), ['1', '2', '006'])
+        self.assertEqual(rows.loc[2, 'name'], 'F')
+
+    def test_json_batch_mixing_alias_and_canonical_keys(self):
+        response = self.client.post('/placement/import/items/', [
+            {'item_id': 7, 'name': 'Pen', 'width_cm': 1, 'depth_cm': 1, 'height_cm': 1, 'weight_kg': 1},
+            {'itemId': 8, 'name': 'Cup', 'width': 2, 'depth': 2, 'height': 2, 'mass': 2},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report['imported'], report['rejected']), (2, 0))
+        rows = pd.read_csv(self.data_dir / 'input_items.csv', dtype=str, keep_default_na=False)
+        self.assertEqual(rows[['item_id', 'width_cm', 'mass_kg']].values.tolist()[-2:],
+                         [['7', '1', '1'], ['8', '2', '2']])
+        self.assertNotIn('itemId', rows.columns)
+
+    def test_json_containers(self):
+        response = self.client.post('/placement/import/containers/', [
+            {'containerId': 'C2', 'width': 20, 'depth': 20, 'height': 20, 'zone': 'Dock'},
+            {'containerId': 'C3', 'width': 0, 'depth': 20, 'height': 20, 'zone': ''},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['errors'], [
+            {'row': 2, 'id': 'C3', 'errors': ['zone is required', 'width_cm must be > 0']}])
+        frame = pd.read_csv(self.data_dir / 'containers.csv')
+        self.assertEqual(frame['container_id'].tolist(), ['C1', 'C2'])
+        self.assertEqual(frame.loc[1, 'zone'], 'Dock')
+
+    def test_json_integers_with_gaps_keep_their_text(self):
+        response = self.client.post('/placement/import/items/', [
+            {'itemId': 3, 'name': 'Pen', 'width': 1, 'depth': 1, 'height': 1, 'mass': 1, 'priority': 5},
+            {'itemId': 4, 'name': 'Cup', 'width': 1.5, 'depth': 1, 'height': 1, 'mass': 1},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        rows = pd.read_csv(self.data_dir / 'input_items.csv', dtype=str, keep_default_na=False)
+        self.assertEqual(rows[['item_id', 'priority', 'width_cm']].values.tolist()[-2:],
+                         [['3', '5', '1'], ['4', '', '1.5']])
+
+    def test_missing_columns_rejects_batch(self):
+        response = self.upload('/placement/import/containers/', 'container_id,width_cm\nC9,1\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('height_cm', response.json()['message'])
+        self.assertNotIn('C9', (self.data_dir / 'containers.csv').read_text())
+
+
+class UndockingTests(DataDirTestCase):
+    """Return plans fill the weight limit optimally and completing them removes the items."""
+
+    def setUp(self):
+        super().setUp()
+        pd.DataFrame({
+            'item_id': [1, 2, 3, 4, 5], 'name': ['front', 'back', 'heavy', 'light', 'fresh'],
+            'width_cm': [10, 10, 10, 5, 10], 'depth_cm': [10, 10, 10, 5, 10], 'height_cm': [10, 10, 30, 5, 10],
+            'mass_kg': [4, 5, 9, 1, 1], 'expiry_date': ['2020-01-01'] * 4 + ['2099-01-01'],
+            'usage_limit': [5] * 5,
+        }).to_csv(self.data_dir / 'input_items.csv', index=False)
+        # Item 1 stands in front of item 2 in container A
+        pd.DataFrame({
+            'item_id': [1, 2, 3, 4, 5], 'container_id': ['A', 'A', 'B', 'B', 'B'],
+            'x_cm': [0, 0, 0, 20, 40], 'y_cm': [0, 10, 0, 0, 0], 'z_cm': [0, 0, 0, 0, 0],
+        }).to_csv(self.data_dir / 'placement_results.csv', index=False)
+
+    def test_solver_matches_brute_force(self):
+        weights = [12, 7, 11, 8, 9, 6.5]
+        values = [24, 13, 23, 15, 16, 11]
+        chosen, method = solve_knapsack(weights, values, 26)
+        self.assertEqual(method, 'dp')
+        self.assertEqual(sum(values[i] for i in chosen), 51)
+        self.assertLessEqual(sum(weights[i] for i in chosen), 26)
+        self.assertEqual(solve_knapsack([1, 2, 30], [1, 1, 1], 5)[1], 'all')
+        for capacity in (0, -5):
+            chosen, method = solve_knapsack([0, 1, 2], [1, 1, 1], capacity)
+            self.assertEqual((chosen.tolist(), method), ([], 'none'))
+
+    def test_negative_max_weight_is_rejected(self):
+        response = self.client.post('/placement/waste/return-plan/', {
+            'undockingContainerId': 'UD', 'undockingDate': '2025-01-01', 'maxWeight': -5,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('max_weight', response.json()['errors'])
+
+    def test_plan_and_complete(self):
+        response = self.client.post('/placement/waste/return-plan/', {
+            'undockingContainerId': 'UD', 'undockingDate': '2025-01-01', 'maxWeight': 10,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        plan = response.json()
+        # The 9 kg item and the 1 kg one (3125 cm3) beat the front/back pair plus the light item (2125 cm3)
+        self.assertEqual([step['itemId'] for step in plan['returnPlan']], ['3', '4'])
+        self.assertEqual(plan['returnManifest']['totalWeight'], 10)
+        self.assertEqual(plan['returnManifest']['totalVolume'], 3125)
+        self.assertEqual([(step['action'], step['itemId']) for step in plan['retrievalSteps']],
+                         [('retrieve', '3'), ('retrieve', '4')])
+
+        # The stored plan is replaced by the latest one
+        plan = self.client.post('/placement/waste/return-plan/', {
+            'undockingContainerId': 'UD', 'undockingDate': '2025-01-01', 'maxWeight': 6, 'objective': 'mass',
+        }, format='json').json()
+        self.assertEqual([step['itemId'] for step in plan['returnPlan']], ['2', '4'])
+        self.assertEqual(plan['returnManifest']['totalWeight'], 6)
+
+        response = self.client.post('/placement/waste/complete-undocking/', {'undockingContainerId': 'UD'},
+                                    format='json')
+        self.assertEqual(response.json()['itemsRemoved'], 2)
+        self.assertEqual(pd.read_csv(self.data_dir / 'placement_results.csv')['item_id'].tolist(), [1, 3, 5])
+        self.assertEqual(pd.read_csv(self.data_dir / 'input_items.csv')['item_id'].tolist(), [1, 3, 5])
+        waste = PlacementManager().identify_waste('2025-01-01')
+        self.assertEqual(sorted(item['item_id'] for item in waste), [1, 3])
+
+    def test_failed_plan_write_keeps_previous_plan(self):
+        request = {'undockingContainerId': 'UD', 'undockingDate': '2025-01-01', 'maxWeight': 10}
+        self.client.post('/placement/waste/return-plan/', request, format='json')
+        before = sorted(os.listdir(self.data_dir))
+        stored = (self.data_dir / 'return_plan.json').read_text()
+
+        def partial_dump(data, handle):
+            handle.write('{"undockingContainerId": ')
+            raise OSError('disk full')
+
+        with mock.patch('placement.importer.json.dump', side_effect=partial_dump), \
+                self.assertRaises(OSError):
+            PlacementManager().plan_return('UD', '2025-01-01', 6)
+        self.assertEqual((self.data_dir / 'return_plan.json').read_text(), stored)
+        self.assertEqual(sorted(os.listdir(self.data_dir)), before)
+
+    def test_blockers_are_set_aside(self):
+        pd.DataFrame({
+            'item_id': [1, 2, 3, 4, 5], 'name': list('abcde'),
+            'width_cm': [10] * 5, 'depth_cm': [10] * 5, 'height_cm': [10] * 5,
+            'mass_kg': [1] * 5, 'expiry_date': ['2099-01-01', '2020-01-01', '2099-01-01', '2099-01-01', '2099-01-01'],
+        }).to_csv(self.data_dir / 'input_items.csv', index=False)
+        plan = self.client.post('/placement/waste/return-plan/', {
+            'undockingContainerId': 'UD', 'undockingDate': '2025-01-01', 'maxWeight': 10,
+        }, format='json').json()
+        self.assertEqual([(step['action'], step['itemId']) for step in plan['retrievalSteps']],
+                         [('remove', '1'), ('setAside', '1'), ('retrieve', '2'), ('placeBack', '1')])
+
+    def test_complete_without_plan(self):
+        response = self.client.post('/placement/waste/complete-undocking/', {'undockingContainerId': 'UD'},
+                                    format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['itemsRemoved'], 0)
+
+
+class GeometryTests(DataDirTestCase):
+    """The geometry endpoint packs boxes into typed arrays and honours If-None-Match."""
+
+    def setUp(self):
+        super().setUp()
+        pd.DataFrame({
+            'container_id': ['B', 'A'], 'zone': ['Lab', 'Lab'],
+            'width_cm': [50, 100], 'depth_cm': [50, 100], 'height_cm': [50, 100],
+        }).to_csv(self.data_dir / 'containers.csv', index=False)
+        pd.DataFrame({
+            'item_id': [1, 2, 3, 4], 'name': list('abcd'),
+            'width_cm': [40, 2, 3, 10], 'depth_cm': [40, 2, 3, 10], 'height_cm': [40, 2, 3, 10],
+            'priority': [90, 10, 60, 5], 'expiry_date': ['N/A', '2000-01-01', 'N/A', 'N/A'],
+        }).to_csv(self.data_dir / 'input_items.csv', index=False)
+        pd.DataFrame({
+            'item_id': [1, 2, 3, 4], 'container_id': ['A', 'A', 'A', 'B'],
+            'x_cm': [0, 50, 52, 0], 'y_cm': [0, 0, 1, 0], 'z_cm': [0, 0, 0, 5.5],
+        }).to_csv(self.data_dir / 'placement_results.csv', index=False)
+
+    def test_layout(self):
+        response = self.client.get('/placement/geometry/')
+        self.assertEqual(response.status_code, 200)
+        header, positions, sizes, codes = geometry.decode(response.content)
+        # Containers follow containers.csv order, each a contiguous slice
+        self.assertEqual([(c['id'], c['first'], c['count']) for c in header['containers']], [('B', 0, 1), ('A', 1, 3)])
+        self.assertEqual(header['containers'][1]['size'], [100.0, 100.0, 100.0])
+        self.assertEqual(positions[0].tolist(), [0, 0, 5.5])
+        self.assertEqual(sizes[1].tolist(), [40, 40, 40])
+        self.assertEqual((codes & geometry.PRIORITY_MASK).tolist(), [5, 90, 10, 60])
+        self.assertEqual([bool(code & geometry.WASTE) for code in codes], [False, False, True, False])
+        # The data section (28 bytes per box) starts 4-byte aligned
+        self.assertEqual((len(response.content) - 28 * header['boxCount']) % 4, 0)
+
+    def test_level_of_detail_merges_small_boxes(self):
+        header, positions, sizes, codes = geometry.decode(self.client.get('/placement/geometry/?min_size=5').content)
+        self.assertEqual(header['boxCount'], 3)
+        merged = codes & geometry.MERGED
+        self.assertEqual(int(merged.sum() // geometry.MERGED), 1)
+        row = int(merged.nonzero()[0][0])
+        self.assertEqual(positions[row].tolist(), [50, 0, 0])
+        self.assertEqual(sizes[row].tolist(), [5, 4, 3])
+        self.assertEqual(int(codes[row] & geometry.PRIORITY_MASK), 60)
+        self.assertTrue(codes[row] & geometry.WASTE)
+
+    def test_container_filter_and_etag(self):
+        response = self.client.get('/placement/geometry/?container_id=B')
+        header = geometry.decode(response.content)[0]
+        self.assertEqual(header['boxCount'], 1)
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/placement/geometry/?container_id=B', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertNotEqual(self.client.get('/placement/geometry/')['ETag'], etag)
+
+        (self.data_dir / 'placement_results.csv').write_text('item_id,container_id,x_cm,y_cm,z_cm\n4,B,1,0,0\n')
+        self.assertEqual(self.client.get('/placement/geometry/?container_id=B', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get('/placement/geometry/?min_size=0').status_code, 400)
+
+
+class ContainerUsageTests(TestCase):
+    """Container usage counters follow item saves, deletes and reconciliation."""
+
+    def setUp(self):
+        self.container = Container.objects.create(name='C1', width_cm=10, height_cm=10, depth_cm=10,
+                                                  max_weight_kg=50, zone='Lab')
+        self.other = Container.objects.create(name='C2', width_cm=10, height_cm=10, depth_cm=10,
+                                              max_weight_kg=50, zone='Lab')
+
+    def usage(self, container):
+        container.refresh_from_db()
+        return container.used_volume, container.used_weight, container.is_full
+
+    def test_adjust_usage_sets_is_full_at_threshold(self):
+        Container.objects.filter(pk=self.container.pk).adjust_usage(949, 2)
+        self.assertEqual(self.usage(self.container), (949, 2, False))
+        Container.objects.filter(pk=self.container.pk).adjust_usage(1, 1)
+        self.assertEqual(self.usage(self.container), (950, 3, True))
+        Container.objects.filter(pk=self.container.pk).adjust_usage(-50, -3)
+        self.assertEqual(self.usage(self.container), (900, 0, False))
+        self.assertEqual(self.usage(self.other), (0, 0, False))
+
+    def test_item_save_and_delete_move_usage(self):
+        item = Item.objects.create(name='I1', width_cm=2, height_cm=5, depth_cm=10, weight_kg=4,
+                                   container=self.container)
+        self.assertEqual(self.usage(self.container), (100, 4, False))
+
+        item.container = self.other
+        item.weight_kg = 6
+        item.save()
+        self.assertEqual(self.usage(self.container), (0, 0, False))
+        self.assertEqual(self.usage(self.other), (100, 6, False))
+
+        item.delete()
+        self.assertEqual(self.usage(self.other), (0, 0, False))
+
+    def test_reconcile_usage_rebuilds_counters(self):
+        Item.objects.create(name='I1', width_cm=10, height_cm=10, depth_cm=9.5, weight_kg=4, container=self.container)
+        Item.objects.create(name='I2', width_cm=1, height_cm=1, depth_cm=1, weight_kg=1, container=self.other)
+        # Bulk updates bypass Item.save(), so the counters drift
+        Item.objects.filter(name='I2').update(container=self.container)
+        Container.objects.update(used_volume=0, used_weight=0, is_full=False)
+
+        self.assertEqual(Container.objects.filter(pk=self.container.pk).reconcile_usage(), 1)
+        self.assertEqual(self.usage(self.container), (951, 5, True))
+        self.assertEqual(self.usage(self.other), (0, 0, False))
+
+        Container.objects.reconcile_usage()
+        self.assertEqual(self.usage(self.other), (0, 0, False))
+
+    def test_reconcile_container_usage_command(self):
+        Item.objects.create(name='I1', width_cm=2, height_cm=5, depth_cm=10, weight_kg=4, container=self.container)
+        Item.objects.create(name='I2', width_cm=1, height_cm=1, depth_cm=1, weight_kg=1, container=self.other)
+        Container.objects.update(used_volume=123, used_weight=45, is_full=True)
+
+        out = io.StringIO()
+        call_command('reconcile_container_usage', '--container', 'C1', stdout=out)
+        self.assertIn('1 containers', out.getvalue())
+        self.assertEqual(self.usage(self.container), (100, 4, False))
+        self.assertEqual(self.usage(self.other), (123, 45, True))
+
+        call_command('reconcile_container_usage', stdout=io.StringIO())
+        self.assertEqual(self.usage(self.other), (1, 1, False))
+
+
+class DataLoaderUpsertTests(TestCase):
+    """Upserting from the CSVs updates CSV columns and keeps runtime state."""
+
+    def test_runtime_state_survives_upsert(self):
+        import data_loader
+
+        container = Container.objects.create(name='C1', width_cm=10, height_cm=10, depth_cm=10, max_weight_kg=50,
+                                             zone='Lab', used_volume=1000, used_weight=5, is_full=True)
+        item = Item.objects.create(name='I1', width_cm=1, height_cm=1, depth_cm=1, weight_kg=1,
+                                   is_placed=True, container=container)
+        container.refresh_from_db()
+        usage = (container.used_volume, container.used_weight)
+
+        containers = {'C1': data_loader.container_from_row(
+            {'container_id': 'C1', 'width_cm': '20', 'height_cm': '20', 'depth_cm': '20'})}
+        items = {'I1': data_loader.item_from_row(
+            {'item_id': 'I1', 'width_cm': '2', 'height_cm': '2', 'depth_cm': '2', 'mass_kg': '3', 'priority': '7'})}
+        data_loader.save_objects(Container, containers, data_loader.CONTAINER_FIELDS, 100, upsert=True)
+        data_loader.save_objects(Item, items, data_loader.ITEM_FIELDS, 100, upsert=True)
+
+        container.refresh_from_db()
+        item.refresh_from_db()
+        self.assertEqual(container.width_cm, 20)
+        self.assertEqual((container.used_volume, container.used_weight, container.is_full), usage + (True,))
+        self.assertEqual((container.zone, container.max_weight_kg), ('Lab', 50))
+        self.assertEqual((item.weight_kg, item.priority, item.is_placed, item.container_id), (3, 7, True, container.pk))
+
+    def test_load_data_upsert_reconciles_usage(self):
+        import data_loader
+
+        container = Container.objects.create(name='C1', width_cm=10, height_cm=10, depth_cm=10, max_weight_kg=50,
+                                             zone='Lab')
+        Item.objects.create(name='I1', width_cm=1, height_cm=1, depth_cm=1, weight_kg=1, container=container)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = Path(tmp)
+            (data_dir / 'containers.csv').write_text('container_id,width_cm,height_cm,depth_cm\nC1,10,10,10\n')
+            (data_dir / 'input_items.csv').write_text(
+                'item_id,width_cm,height_cm,depth_cm,mass_kg,priority\nI1,10,10,9.5,3,5\n')
+            with mock.patch.object(data_loader, 'DATA_DIR', data_dir):
+                data_loader.load_data(upsert=True)
+
+        container.refresh_from_db()
+        self.assertEqual((container.used_volume, container.used_weight, container.is_full), (950, 3, True))
@@ -0,0 +1,127 @@
+"""
+Level-gated trace channel for the placement app.
+
+Each subsystem (``load``, ``results``, ``stats`` ...) traces through its own
+``placement.trace.<subsystem>`` logger, so it can be switched on alone.
+Messages passed as callables are only built when the level is enabled,
+which keeps things like ``df.head().to_dict()`` off the hot path. Every
+tracer is rate limited so an enabled trace inside a per-item loop cannot
+flood the log.
+
+Tracing is off by default; warnings still pass. Enable subsystems with the
+``PLACEMENT_TRACE`` setting or environment variable, e.g.
+``PLACEMENT_TRACE="load=DEBUG,results=DEBUG"`` or ``"*=DEBUG"``.
+"""
+
+import logging
+import threading
+import time
+
+TRACE_ROOT = 'placement.trace'
+
+# Token bucket per tracer: sustained messages per second and burst size
+RATE_PER_SECOND = 20
+BURST = 100
+
+_tracers = {}
+_tracers_lock = threading.Lock()
+
+
+class Tracer:
+    def __init__(self, subsystem, rate=RATE_PER_SECOND, burst=BURST):
+        self.subsystem = subsystem
+        self.logger = logging.getLogger(f'{TRACE_ROOT}.{subsystem}')
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def enabled(self, level=logging.DEBUG):
+        return self.logger.isEnabledFor(level)
+
+    def _allow(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                self._suppressed += 1
+                return 0, False
+            self._tokens -= 1
+            suppressed, self._suppressed = self._suppressed, 0
+            return suppressed, True
+
+    def log(self, level, message, *args):
+        """
+        Emit ``message`` at ``level`` if enabled and within the rate limit.
+
+        ``message`` may be a zero-argument callable returning the text; it is
+        only called when the message is actually emitted.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        suppressed, allowed = self._allow()
+        if not allowed:
+            return
+        if callable(message):
+            message, args = message(), ()
+        if suppressed:
+            message = f"{message} [{suppressed} earlier trace messages suppressed]"
+        self.logger.log(level, message, *args, stacklevel=3)
+
+    def debug(self, message, *args):
+        self.log(logging.DEBUG, message, *args)
+
+    def info(self, message, *args):
+        self.log(logging.INFO, message, *args)
+
+    def warning(self, message, *args):
+        self.log(logging.WARNING, message, *args)
+
+
+def get_tracer(subsystem):
+    """Return the shared tracer for ``subsystem``."""
+    with _tracers_lock:
+        tracer = _tracers.get(subsystem)
+        if tracer is None:
+            tracer = _tracers[subsystem] = Tracer(subsystem)
+        return tracer
+
+
+def parse_spec(spec):
+    """Parse ``"load=DEBUG,results"`` into ``{'load': DEBUG, 'results': DEBUG}``."""
+    if not spec:
+        return {}
+    if isinstance(spec, dict):
+        items = spec.items()
+    else:
+        items = [(part.partition('=')[0], part.partition('=')[2] or 'DEBUG')
+                 for part in str(spec).split(',') if part.strip()]
+    levels = {}
+    for subsystem, level in items:
+        value = logging.getLevelName(str(level).strip().upper()) if not isinstance(level, int) else level
+        if isinstance(value, int):
+            levels[subsystem.strip()] = value
+    return levels
+
+
+def configure(spec):
+    """
+    Set trace levels from a spec; ``*`` applies to every subsystem.
+
+    A stream handler is attached to the trace root when anything is enabled
+    and no handler is configured, so traces are visible without a LOGGING
+    entry.
+    """
+    levels = parse_spec(spec)
+    root = logging.getLogger(TRACE_ROOT)
+    root.setLevel(levels.pop('*', logging.WARNING))
+    for subsystem, level in levels.items():
+        logging.getLogger(f'{TRACE_ROOT}.{subsystem}').setLevel(level)
+    if root.level < logging.WARNING or levels:
+        if not root.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(levelname)s: %(message)s'))
+            root.addHandler(handler)
@@ -0,0 +1,229 @@
+"""
+Return planning for the undocking container.
+
+Choosing which waste items to send back is a 0/1 knapsack: each item has a
+mass (its cost against the container's weight limit) and a value, the
+volume or mass it removes from the station. Masses are put on a grid of at
+most ``MAX_CAPACITY_STEPS`` decimal steps (rounded up, so a chosen set
+never exceeds the limit) and the DP runs one vectorized row update per item.
+When ``MAX_DP_CELLS`` leaves fewer than ``MIN_DP_STEPS`` steps (large
+inputs) only the greedy density bound is used; otherwise the better of the
+DP and greedy answers wins, which also covers what the grid rounding gives
+away.
+
+The chosen items are then ordered front to back within each container
+(the open face is at depth 0), and every item standing in front of one
+is set aside and put back around its retrieval.
+"""
+
+import numpy as np
+import pandas as pd
+
+OBJECTIVES = ('volume', 'mass')
+DEFAULT_OBJECTIVE = 'volume'
+
+# Weight grid resolution of the DP, and the largest take matrix it may use;
+# below MIN_DP_STEPS the grid is too coarse to beat the greedy bound
+MAX_CAPACITY_STEPS = 10000
+MIN_DP_STEPS = 1000
+MAX_DP_CELLS = 50_000_000
+
+
+def _greedy(weights, values, capacity):
+    """Best of value-density greedy and the single most valuable item that fits."""
+    density = np.divide(values, weights, out=np.full(len(values), np.inf), where=weights > 0)
+    order = np.argsort(-density, kind='stable')
+    # The densest prefix that fits is taken at once; after it, an item is
+    # taken when it still fits after everything taken before it
+    prefix = int(np.searchsorted(np.cumsum(weights[order]), capacity, side='right'))
+    chosen = list(order[:prefix])
+    remaining = capacity - weights[order[:prefix]].sum()
+    for i in order[prefix:][weights[order[prefix:]] <= remaining]:
+        if weights[i] <= remaining:
+            chosen.append(i)
+            remaining -= weights[i]
+    chosen = np.array(chosen, dtype=int)
+
+    fits = np.flatnonzero(weights <= capacity)
+    if len(fits):
+        best = fits[np.argmax(values[fits])]
+        if values[best] > values[chosen].sum():
+            chosen = np.array([best])
+    return chosen
+
+
+def _dp(weights, values, capacity, max_steps):
+    # Decimal grid (0.01 kg, 0.1 kg, ...) so masses given to that precision are exact
+    unit = 10.0 ** np.ceil(np.log10(capacity / max_steps))
+    steps = int(np.floor(round(capacity / unit, 6)))
+    cost = np.ceil(np.round(weights / unit, 6)).astype(int)
+    best = np.zeros(steps + 1)
+    take = np.zeros((len(weights), steps + 1), dtype=bool)
+    for i in range(len(weights)):
+        w = cost[i]
+        if w > steps:
+            continue
+        candidate = best[:steps + 1 - w] + values[i]
+        better = candidate > best[w:]
+        take[i, w:] = better
+        best[w:] = np.where(better, candidate, best[w:])
+
+    chosen = []
+    c = steps
+    for i in range(len(weights) - 1, -1, -1):
+        if take[i, c]:
+            chosen.append(i)
+            c -= cost[i]
+    return np.array(chosen[::-1], dtype=int)
+
+
+def solve_knapsack(weights, values, capacity, max_steps=MAX_CAPACITY_STEPS, max_cells=MAX_DP_CELLS):
+    """
+    Choose items maximizing total value with total weight <= ``capacity``.
+
+    Returns ``(indices, method)`` with the chosen indices in ascending order
+    and ``method`` one of ``'none'`` (no capacity), ``'all'`` (everything
+    fits), ``'dp'`` or ``'greedy'``.
+    """
+    weights = np.asarray(weights, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if capacity <= 0:
+        return np.array([], dtype=int), 'none'
+    fits = np.flatnonzero(weights <= capacity)
+    if weights[fits].sum() <= capacity:
+        return fits, 'all'
+
+    greedy = _greedy(weights, values, capacity)
+    steps = int(min(max_steps, max_cells // max(len(weights), 1) - 1))
+    if steps < MIN_DP_STEPS:
+        return np.sort(greedy), 'greedy'
+    exact = _dp(weights, values, capacity, steps)
+    greedy_value, exact_value = values[greedy].sum(), values[exact].sum()
+    if greedy_value > exact_value and not np.isclose(greedy_value, exact_value):
+        return np.sort(greedy), 'greedy'
+    return exact, 'dp'
+
+
+def _numeric(df, column, default=0.0):
+    if column not in df.columns:
+        return np.full(len(df), default, dtype=float)
+    return pd.to_numeric(df[column], errors='coerce').fillna(default).to_numpy(dtype=float)
+
+
+class ReturnPlanner:
+    """
+    Plan which waste items leave with the undocking container.
+
+    Args:
+        items_df: Items with ``item_id``, dimensions and ``mass_kg`` or ``weight_kg``
+        arrangement_df: Placements with ``ARRANGEMENT_COLUMNS`` (see ``export``)
+    """
+
+    def __init__(self, items_df, arrangement_df):
+        items = items_df.assign(item_id=items_df['item_id'].astype(str)).drop_duplicates('item_id')
+        mass_column = 'mass_kg' if 'mass_kg' in items.columns else 'weight_kg'
+        self._mass = pd.Series(_numeric(items, mass_column), index=items['item_id'])
+        self._volume = pd.Series(
+            _numeric(items, 'width_cm') * _numeric(items, 'depth_cm') * _numeric(items, 'height_cm'),
+            index=items['item_id'])
+        self._names = pd.Series(items['name'].to_numpy(), index=items['item_id']) if 'name' in items.columns else None
+
+        arrangement = arrangement_df.assign(item_id=arrangement_df['item_id'].astype(str),
+                                            container_id=arrangement_df['container_id'].astype(str))
+        self._arrangement = arrangement.drop_duplicates('item_id').reset_index(drop=True)
+
+    def plan(self, waste_items, undocking_container_id, undocking_date, max_weight, objective=DEFAULT_OBJECTIVE):
+        """
+        Return the plan response: ``returnPlan`` moves, ``retrievalSteps`` and
+        the ``returnManifest``, plus the ids of the chosen items.
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective must be one of {', '.join(OBJECTIVES)}")
+
+        waste = pd.DataFrame(waste_items, columns=['item_id', 'name', 'reason', 'containerId'])
+        waste['item_id'] = waste['item_id'].astype(str)
+        waste = waste.drop_duplicates('item_id').reset_index(drop=True)
+        mass = self._mass.reindex(waste['item_id']).fillna(0.0).to_numpy()
+        volume = self._volume.reindex(waste['item_id']).fillna(0.0).to_numpy()
+
+        chosen, method = solve_knapsack(mass, volume if objective == 'volume' else mass, float(max_weight))
+        returned = waste.iloc[chosen].assign(mass=mass[chosen], volume=volume[chosen])
+
+        order, steps = self._retrieval_steps(returned['item_id'])
+        returned = returned.set_index('item_id').loc[order].reset_index()
+
+        return_plan = [
+            {
+                'step': step,
+                'itemId': row.item_id,
+                'itemName': row.name,
+                'fromContainer': row.containerId,
+                'toContainer': undocking_container_id,
+            }
+            for step, row in enumerate(returned.itertuples(index=False), start=1)
+        ]
+        return {
+            'success': True,
+            'returnPlan': return_plan,
+            'retrievalSteps': steps,
+            'returnManifest': {
+                'undockingContainerId': undocking_container_id,
+                'undockingDate': str(undocking_date),
+                'returnItems': [
+                    {'itemId': row.item_id, 'name': row.name, 'reason': row.reason}
+                    for row in returned.itertuples(index=False)
+                ],
+                'totalVolume': float(returned['volume'].sum()),
+                'totalWeight': float(returned['mass'].sum()),
+            },
+            'solver': method,
+            'itemIds': returned['item_id'].tolist(),
+        }
+
+    def _name(self, item_id):
+        if self._names is None or item_id not in self._names.index:
+            return item_id
+        return self._names[item_id]
+
+    def _retrieval_steps(self, item_ids):
+        """
+        Order ``item_ids`` front to back per container and list the moves to
+        reach each: blockers are items in the same container entirely in
+        front of it (smaller depth) whose width/height extents overlap it,
+        removed front first and put back in reverse.
+        """
+        arrangement = self._arrangement
+        placed = arrangement[arrangement['item_id'].isin(set(item_ids))]
+        placed = placed.sort_values(['container_id', 'y_cm', 'z_cm', 'x_cm'], kind='stable')
+        order = placed['item_id'].tolist() + [i for i in item_ids if i not in set(placed['item_id'])]
+
+        steps = []
+        retrieved = set()
+
+        def add(action, item_id):
+            steps.append({'step': len(steps) + 1, 'action': action, 'itemId': item_id, 'itemName': self._name(item_id)})
+
+        for container_id, targets in placed.groupby('container_id', sort=False):
+            others = arrangement[arrangement['container_id'] == container_id].sort_values('y_cm', kind='stable')
+            lo = others[['x_cm', 'y_cm', 'z_cm']].to_numpy(dtype=float)
+            hi = lo + others[['width_cm', 'depth_cm', 'height_cm']].to_numpy(dtype=float)
+            t_lo = targets[['x_cm', 'y_cm', 'z_cm']].to_numpy(dtype=float)
+            t_hi = t_lo + targets[['width_cm', 'depth_cm', 'height_cm']].to_numpy(dtype=float)
+            # targets x others
+            blocks = ((hi[None, :, 1] <= t_lo[:, None, 1])
+                      & (lo[None, :, 0] < t_hi[:, None, 0]) & (hi[None, :, 0] > t_lo[:, None, 0])
+                      & (lo[None, :, 2] < t_hi[:, None, 2]) & (hi[None, :, 2] > t_lo[:, None, 2]))
+            other_ids = others['item_id'].to_numpy()
+            for target_id, row in zip(targets['item_id'], blocks):
+                blockers = [b for b in other_ids[row] if b not in retrieved]
+                for blocker in blockers:
+                    add('remove', blocker)
+                    add('setAside', blocker)
+                add('retrieve', target_id)
+                retrieved.add(target_id)
+                for blocker in reversed(blockers):
+                    add('placeBack', blocker)
+
+        for item_id in order[len(placed):]:
+            add('retrieve', item_id)
+        return order, steps
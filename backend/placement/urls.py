@@ -8,6 +8,7 @@ from .views import placement_view
 router = DefaultRouter()
 router.register('containers', views.ContainerViewSet)
 router.register('items', views.ItemViewSet)
+router.register('history', views.PlacementHistoryViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -36,6 +37,9 @@ urlpatterns = [
     path('import/containers/', views.import_containers, name='import_containers'),
     path('export/arrangement/', views.export_arrangement, name='export_arrangement'),
     
+    # 3D view geometry
+    path('geometry/', views.container_geometry, name='container_geometry'),
+    
     # Logging API
     path('logs/', views.get_logs, name='get_logs'),
 ]
@@ -1,43 +1,121 @@
 from rest_framework import viewsets
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from .models import Container, Item
+from django.db.models import Count
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_GET
+from datetime import date
+from .models import Container, Item, PlacementHistory
 from .serializers import (
     ContainerSerializer, 
     ItemSerializer, 
+    PlacementHistorySerializer,
     PlacementResponseSerializer,
     PlacementStatisticsSerializer,
-    PlacementRecommendationSerializer
+    PlacementRecommendationSerializer,
+    SimulationRequestSerializer,
+    UndockingPlanSerializer
 )
+from . import export, geometry, importer
 from .algorithms import PlacementManager
+from .recommendations import DEFAULT_TOP_K, RecommendationEngine
+from .statistics import PlacementStatistics
+from .trace import get_tracer
+from .undocking import DEFAULT_OBJECTIVE, OBJECTIVES
+from .pagination import OptionalCursorPagination, frame_columns, paginate_frame, pagination_requested, requested_fields
 import pandas as pd
 
+stats_trace = get_tracer('stats')
+recommend_trace = get_tracer('recommend')
+results_trace = get_tracer('results')
+search_trace = get_tracer('search')
+retrieve_trace = get_tracer('retrieve')
+waste_trace = get_tracer('waste')
+
 # Model ViewSets for basic CRUD operations
-class ContainerViewSet(viewsets.ModelViewSet):
-    queryset = Container.objects.all()
+# Related rows are joined or counted in the list query so serializing a page
+# costs a fixed number of queries instead of one or more per row.
+# Lists accept ?cursor=/?page_size= for keyset pages and ?fields= to load
+# and return only some columns.
+class SparseFieldsViewSetMixin:
+    """Restrict the queried columns to what ``?fields=`` asks for."""
+    pagination_class = OptionalCursorPagination
+    # List order, shared by the queryset and the cursor pages
+    ordering = ('id',)
+    # Serializer fields computed from other model columns
+    field_dependencies = {}
+
+    def sparse_fields(self):
+        if self.request.method != 'GET':
+            return None
+        return requested_fields(self.request)
+
+    def restrict_columns(self, queryset, fields):
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        columns = {'id'} | {field.lstrip('-') for field in self.ordering}
+        for field in fields:
+            if field in model_fields:
+                columns.add(field)
+            columns.update(self.field_dependencies.get(field, ()))
+        return queryset.only(*columns)
+
+class ContainerViewSet(SparseFieldsViewSetMixin, viewsets.ModelViewSet):
+    queryset = Container.objects.annotate(item_count=Count('items')).order_by('id')
     serializer_class = ContainerSerializer
+    field_dependencies = {
+        'utilization_percentage': ('width_cm', 'height_cm', 'depth_cm', 'used_volume'),
+        'total_volume': ('width_cm', 'height_cm', 'depth_cm'),
+    }
 
-class ItemViewSet(viewsets.ModelViewSet):
-    queryset = Item.objects.all()
+    def get_queryset(self):
+        fields = self.sparse_fields()
+        if fields is None:
+            return super().get_queryset()
+        queryset = Container.objects.order_by('id')
+        if 'item_count' in fields:
+            queryset = queryset.annotate(item_count=Count('items'))
+        return self.restrict_columns(queryset, fields)
+
+class ItemViewSet(SparseFieldsViewSetMixin, viewsets.ModelViewSet):
+    queryset = Item.objects.select_related('container').order_by('id')
     serializer_class = ItemSerializer
+    field_dependencies = {
+        'volume': ('width_cm', 'height_cm', 'depth_cm'),
+        'container_name': ('container', 'container__name'),
+        'container_zone': ('container', 'container__zone'),
+    }
+
+    def get_queryset(self):
+        fields = self.sparse_fields()
+        if fields is None:
+            return super().get_queryset()
+        queryset = Item.objects.order_by('id')
+        if {'container_name', 'container_zone'} & set(fields):
+            queryset = queryset.select_related('container')
+        return self.restrict_columns(queryset, fields)
+
+class PlacementHistoryViewSet(SparseFieldsViewSetMixin, viewsets.ReadOnlyModelViewSet):
+    ordering = ('-placement_date', '-id')
+    queryset = PlacementHistory.objects.select_related('item', 'container').order_by(*ordering)
+    serializer_class = PlacementHistorySerializer
 
 # API view for getting placement statistics
 @api_view(['GET'])
 def get_placement_stats(request):
-    print("DEBUG: get_placement_stats called")
+    stats_trace.debug("get_placement_stats called")
     manager = PlacementManager()
     stats = manager.get_placement_efficiency()
-    print(f"DEBUG: Stats: {stats}")
+    stats_trace.debug(lambda: f"Stats: {stats}")
     
     # If no stats found, try to load from CSV and recalculate
     if stats is None or not stats.get('success', False):
-        print("DEBUG: No stats found, trying to load from CSV")
+        stats_trace.debug("No stats found, trying to load from CSV")
         _, placement_df = manager.load_from_csv()
         if placement_df is not None:
-            print("DEBUG: Loaded placement data, recalculating stats")
+            stats_trace.debug("Loaded placement data, recalculating stats")
             stats = manager.get_placement_efficiency()
     
-    print(f"DEBUG: Final stats: {stats}")
+    stats_trace.debug(lambda: f"Final stats: {stats}")
     return Response({
         'success': True,
         'stats': stats.get('statistics', {}) if stats else {}
@@ -63,14 +141,14 @@ def process_data(request):
 # API view for getting placement recommendations for unplaced items
 @api_view(['GET'])
 def get_recommendations(request):
-    print("DEBUG: get_recommendations called")
+    recommend_trace.debug("get_recommendations called")
     manager = PlacementManager()
     
     # First try to load data from CSV files
     items_df, containers_df = manager.load_from_csv()
     
     if items_df is None or containers_df is None:
-        print("DEBUG: No data found")
+        recommend_trace.debug("No data found")
         return Response({
             'success': False,
             'message': 'No data found'
@@ -81,7 +159,7 @@ def get_recommendations(request):
         placed_path = manager.data_dir / 'placed_items.csv'
         unplaced_path = manager.data_dir / 'unplaced_items.csv'
         
-        print(f"DEBUG: Looking for placement files at {placed_path} and {unplaced_path}")
+        recommend_trace.debug(lambda: f"Looking for placement files at {placed_path} and {unplaced_path}")
         
         placements_df = None
         unplaced_df = None
@@ -89,22 +167,22 @@ def get_recommendations(request):
         if placed_path.exists():
             try:
                 placements_df = pd.read_csv(placed_path)
-                print(f"DEBUG: Loaded placed items: {len(placements_df)} items")
+                recommend_trace.debug(lambda: f"Loaded placed items: {len(placements_df)} items")
             except Exception as e:
-                print(f"DEBUG: Error loading placed items: {str(e)}")
+                recommend_trace.warning(lambda: f"Error loading placed items: {str(e)}")
         else:
-            print(f"DEBUG: Placed items file not found at {placed_path}")
+            recommend_trace.debug(lambda: f"Placed items file not found at {placed_path}")
             
         if unplaced_path.exists():
             try:
                 unplaced_df = pd.read_csv(unplaced_path)
-                print(f"DEBUG: Loaded unplaced items: {len(unplaced_df)} items")
+                recommend_trace.debug(lambda: f"Loaded unplaced items: {len(unplaced_df)} items")
             except Exception as e:
-                print(f"DEBUG: Error loading unplaced items: {str(e)}")
+                recommend_trace.warning(lambda: f"Error loading unplaced items: {str(e)}")
         else:
-            print(f"DEBUG: Unplaced items file not found at {unplaced_path}")
+            recommend_trace.debug(lambda: f"Unplaced items file not found at {unplaced_path}")
     except Exception as e:
-        print(f"DEBUG: Error loading placement data: {str(e)}")
+        recommend_trace.warning(lambda: f"Error loading placement data: {str(e)}")
         return Response({
             'success': False,
             'message': f'Error loading placement data: {str(e)}'
@@ -112,94 +190,28 @@ def get_recommendations(request):
     
     # If no unplaced items found, return empty list
     if unplaced_df is None or unplaced_df.empty:
-        print("DEBUG: No unplaced items found")
+        recommend_trace.debug("No unplaced items found")
         return Response([])
     
     # Calculate recommendations
-    recommendations = []
-    print(f"DEBUG: Calculating recommendations for {len(unplaced_df)} unplaced items")
-    
-    for _, item in unplaced_df.iterrows():
-        item_id = item['item_id']
-        item_volume = item['width_cm'] * item['depth_cm'] * item['height_cm']
-        preferred_zone = item.get('preferred_zone')
-        
-        # First try preferred zone
-        best_container_id = None
-        best_utilization = float('inf')
-        best_reasoning = ""
-        zone_match = False
-        
-        # Filter containers that can fit the item
-        valid_containers = []
-        
-        for _, container in containers_df.iterrows():
-            container_id = container['container_id']
-            container_volume = container['volume']
-            container_zone = container['zone']
-            
-            # Calculate current utilization
-            current_utilization = 0
-            if placements_df is not None:
-                container_placements = placements_df[placements_df['container_id'] == container_id]
-                for _, placement in container_placements.iterrows():
-                    current_utilization += placement['width_cm'] * placement['depth_cm'] * placement['height_cm']
-            
-            remaining_volume = container_volume - current_utilization
-            
-            if remaining_volume >= item_volume:
-                valid_containers.append({
-                    'container_id': container_id,
-                    'container_name': container.get('name', f"Container {container_id}"),
-                    'zone': container_zone,
-                    'remaining_volume': remaining_volume,
-                    'utilization': current_utilization / container_volume if container_volume > 0 else 0
-                })
-        
-        # Find best container
-        if valid_containers:
-            # First try preferred zone
-            preferred_containers = [c for c in valid_containers if c['zone'] == preferred_zone]
-            
-            if preferred_containers:
-                # Sort by utilization (choose one with highest utilization to maximize space efficiency)
-                preferred_containers.sort(key=lambda x: x['utilization'], reverse=True)
-                best_container = preferred_containers[0]
-                best_container_id = best_container['container_id']
-                best_reasoning = f"Container is in the preferred zone ({preferred_zone})"
-                zone_match = True
-            else:
-                # Sort all containers by remaining volume (choose smallest that can fit)
-                valid_containers.sort(key=lambda x: x['remaining_volume'])
-                best_container = valid_containers[0]
-                best_container_id = best_container['container_id']
-                best_reasoning = f"No containers available in preferred zone ({preferred_zone}). Selected container in zone {best_container['zone']} with sufficient space."
-        
-        if best_container_id:
-            score = 100 if zone_match else 70
-            recommendations.append({
-                "item_id": item_id,
-                "item_name": item['name'],
-                "container_id": best_container_id,
-                "container_name": next((c['container_name'] for c in valid_containers if c['container_id'] == best_container_id), ""),
-                "reasoning": best_reasoning,
-                "score": score
-            })
-    
-    # Sort recommendations by score
-    recommendations.sort(key=lambda x: x["score"], reverse=True)
-    print(f"DEBUG: Generated {len(recommendations)} recommendations")
+    try:
+        top_k = int(request.query_params.get('top_k', DEFAULT_TOP_K))
+    except (TypeError, ValueError):
+        top_k = DEFAULT_TOP_K
+    recommend_trace.debug(lambda: f"Calculating recommendations for {len(unplaced_df)} unplaced items")
+    recommendations = RecommendationEngine(containers_df, placements_df, items_df).recommend(unplaced_df, top_k=top_k)
+    recommend_trace.debug(lambda: f"Generated {len(recommendations)} recommendations")
     
     return Response(recommendations)
 
 # API view to retrieve placement results from CSV files
 @api_view(['GET'])
 def get_results(request):
-    print("DEBUG: get_results called")
+    results_trace.debug("get_results called")
     manager = PlacementManager()
     
     # The error is here - load_results is in the class but views.py is trying to use it incorrectly
-    print("DEBUG: Loading placement results")
+    results_trace.debug("Loading placement results")
     items_df, containers_df = manager.load_from_csv()
     
     try:
@@ -207,7 +219,7 @@ def get_results(request):
         placed_path = manager.data_dir / 'placed_items.csv'
         unplaced_path = manager.data_dir / 'unplaced_items.csv'
         
-        print(f"DEBUG: Looking for placement files at {placed_path} and {unplaced_path}")
+        results_trace.debug(lambda: f"Looking for placement files at {placed_path} and {unplaced_path}")
         
         placements_df = None
         unplaced_df = None
@@ -215,23 +227,23 @@ def get_results(request):
         if placed_path.exists():
             try:
                 placements_df = pd.read_csv(placed_path)
-                print(f"DEBUG: Loaded placed items: {len(placements_df)} items")
+                results_trace.debug(lambda: f"Loaded placed items: {len(placements_df)} items")
             except Exception as e:
-                print(f"DEBUG: Error loading placed items: {str(e)}")
+                results_trace.warning(lambda: f"Error loading placed items: {str(e)}")
         else:
-            print(f"DEBUG: Placed items file not found at {placed_path}")
+            results_trace.debug(lambda: f"Placed items file not found at {placed_path}")
             
         if unplaced_path.exists():
             try:
                 unplaced_df = pd.read_csv(unplaced_path)
-                print(f"DEBUG: Loaded unplaced items: {len(unplaced_df)} items")
+                results_trace.debug(lambda: f"Loaded unplaced items: {len(unplaced_df)} items")
             except Exception as e:
-                print(f"DEBUG: Error loading unplaced items: {str(e)}")
+                results_trace.warning(lambda: f"Error loading unplaced items: {str(e)}")
         else:
-            print(f"DEBUG: Unplaced items file not found at {unplaced_path}")
+            results_trace.debug(lambda: f"Unplaced items file not found at {unplaced_path}")
     
     except Exception as e:
-        print(f"DEBUG: Error in get_results: {str(e)}")
+        results_trace.warning(lambda: f"Error in get_results: {str(e)}")
         return Response({
             'success': False,
             'message': f'Error loading results: {str(e)}'
@@ -239,7 +251,7 @@ def get_results(request):
     
     # If no results found or loading failed, try to process the data
     if placements_df is None or unplaced_df is None:
-        print("DEBUG: No placement results found, trying to process data")
+        results_trace.debug("No placement results found, trying to process data")
         items_df, containers_df = manager.load_from_csv()
         if items_df is not None and containers_df is not None:
             placements_df, unplaced_df = manager.place_items(items_df, containers_df)
@@ -255,29 +267,23 @@ def get_results(request):
     # Calculate container utilization
     container_utilization = {}
     try:
-        for container in containers:
-            container_id = container['container_id']
-            container_items = [p for p in placements if p['container_id'] == container_id]
-            used_volume = sum(item['width_cm'] * item['height_cm'] * item['depth_cm'] for item in container_items)
-            total_volume = container['width_cm'] * container['height_cm'] * container['depth_cm']
-            utilization = (used_volume / total_volume * 100) if total_volume > 0 else 0
-            
-            container_utilization[container_id] = {
-                'utilization': round(utilization, 2),
-                'used_volume': round(used_volume, 2),
-                'total_volume': round(total_volume, 2)
-            }
+        if containers_df is not None:
+            container_utilization = PlacementStatistics(containers_df, placements_df).utilization_by_container()
     except Exception as e:
-        print(f"DEBUG: Error calculating utilization: {str(e)}")
+        results_trace.warning(lambda: f"Error calculating utilization: {str(e)}")
     
-    print("DEBUG: Successfully processed results")
+    # Utilization above uses every placement; only the returned list is paged
+    placements, paging = _sparse_page(request, placements_df, 'item_id')
+    
+    results_trace.debug("Successfully processed results")
     return Response({
         'success': True,
         'placed_items': placements,
         'unplaced_items': unplaced,
         'items': items,
         'containers': containers,
-        'container_utilization': container_utilization
+        'container_utilization': container_utilization,
+        **paging
     })
 
 # Dummy view for placing an individual item (extend as needed)
@@ -294,16 +300,16 @@ def place_item(request):
 @api_view(['GET'])
 def search_item(request):
     """Search for items by ID or name."""
-    print("DEBUG: search_item called")
+    search_trace.debug("search_item called")
     item_id = request.query_params.get('item_id')
     item_name = request.query_params.get('item_name')
-    print(f"DEBUG: Search params - item_id: {item_id}, item_name: {item_name}")
+    search_trace.debug(lambda: f"Search params - item_id: {item_id}, item_name: {item_name}")
     
     manager = PlacementManager()
     items_df, _ = manager.load_from_csv()
     
     if items_df is None:
-        print("DEBUG: No items data found")
+        search_trace.debug("No items data found")
         return Response({
             'success': False,
             'message': 'No items data found'
@@ -311,54 +317,54 @@ def search_item(request):
     
     # Search by ID or name
     if item_id:
-        print(f"DEBUG: Searching by item_id: {item_id}")
+        search_trace.debug(lambda: f"Searching by item_id: {item_id}")
         item = items_df[items_df['item_id'] == item_id]
     elif item_name:
-        print(f"DEBUG: Searching by item_name: {item_name}")
+        search_trace.debug(lambda: f"Searching by item_name: {item_name}")
         item = items_df[items_df['name'].str.contains(item_name, case=False, na=False)]
     else:
-        print("DEBUG: No search parameters provided")
+        search_trace.debug("No search parameters provided")
         return Response({
             'success': False,
             'message': 'Please provide either item_id or item_name'
         })
     
     if item.empty:
-        print("DEBUG: Item not found")
+        search_trace.debug("Item not found")
         return Response({
             'success': False,
             'message': 'Item not found'
         })
     
     # Get placement information
-    print("DEBUG: Loading placement results")
+    search_trace.debug("Loading placement results")
     try:
         # Try to load results directly from CSV files
         placed_path = manager.data_dir / 'placed_items.csv'
-        print(f"DEBUG: Looking for placement file at {placed_path}")
+        search_trace.debug(lambda: f"Looking for placement file at {placed_path}")
         
         placements_df = None
         
         if placed_path.exists():
             try:
                 placements_df = pd.read_csv(placed_path)
-                print(f"DEBUG: Loaded placed items: {len(placements_df)} items")
+                search_trace.debug(lambda: f"Loaded placed items: {len(placements_df)} items")
             except Exception as e:
-                print(f"DEBUG: Error loading placed items: {str(e)}")
+                search_trace.warning(lambda: f"Error loading placed items: {str(e)}")
         else:
-            print(f"DEBUG: Placed items file not found at {placed_path}")
+            search_trace.debug(lambda: f"Placed items file not found at {placed_path}")
             
         placement = None
         if placements_df is not None:
             placement = placements_df[placements_df['item_id'] == item.iloc[0]['item_id']]
-            print(f"DEBUG: Placement found: {not placement.empty if not placement.empty else False}")
+            search_trace.debug(lambda: f"Placement found: {not placement.empty if not placement.empty else False}")
     except Exception as e:
-        print(f"DEBUG: Error loading placement data: {str(e)}")
+        search_trace.warning(lambda: f"Error loading placement data: {str(e)}")
         placement = None
     
     # Format response
     item_data = item.iloc[0].to_dict()
-    print(f"DEBUG: Item data: {item_data}")
+    search_trace.debug(lambda: f"Item data: {item_data}")
     
     response_data = {
         'success': True,
@@ -377,72 +383,72 @@ def search_item(request):
         }
     }
     
-    print(f"DEBUG: Response data: {response_data}")
+    search_trace.debug(lambda: f"Response data: {response_data}")
     return Response(response_data)
 
 # API view for retrieving an item from its container
 @api_view(['POST'])
 def retrieve_item(request):
     """Retrieve an item from its container."""
-    print("DEBUG: retrieve_item called")
+    retrieve_trace.debug("retrieve_item called")
     item_id = request.data.get('item_id')
     user_id = request.data.get('user_id', 'system')
-    print(f"DEBUG: Retrieve params - item_id: {item_id}, user_id: {user_id}")
+    retrieve_trace.debug(lambda: f"Retrieve params - item_id: {item_id}, user_id: {user_id}")
     
     if not item_id:
-        print("DEBUG: Item ID is required")
+        retrieve_trace.debug("Item ID is required")
         return Response({
             'success': False,
             'message': 'Item ID is required'
         })
     
     manager = PlacementManager()
-    print("DEBUG: Loading items and placements")
+    retrieve_trace.debug("Loading items and placements")
     items_df, _ = manager.load_from_csv()
     
     try:
         # Try to load results directly from CSV files
         placed_path = manager.data_dir / 'placed_items.csv'
-        print(f"DEBUG: Looking for placement file at {placed_path}")
+        retrieve_trace.debug(lambda: f"Looking for placement file at {placed_path}")
         
         placements_df = None
         
         if placed_path.exists():
             try:
                 placements_df = pd.read_csv(placed_path)
-                print(f"DEBUG: Loaded placed items: {len(placements_df)} items")
+                retrieve_trace.debug(lambda: f"Loaded placed items: {len(placements_df)} items")
             except Exception as e:
-                print(f"DEBUG: Error loading placed items: {str(e)}")
+                retrieve_trace.warning(lambda: f"Error loading placed items: {str(e)}")
         else:
-            print(f"DEBUG: Placed items file not found at {placed_path}")
+            retrieve_trace.debug(lambda: f"Placed items file not found at {placed_path}")
     except Exception as e:
-        print(f"DEBUG: Error loading placement data: {str(e)}")
+        retrieve_trace.warning(lambda: f"Error loading placement data: {str(e)}")
         return Response({
             'success': False,
             'message': f'Error loading placement data: {str(e)}'
         })
     
     if items_df is None or placements_df is None:
-        print("DEBUG: No data found")
+        retrieve_trace.debug("No data found")
         return Response({
             'success': False,
             'message': 'No data found'
         })
     
     # Find item and its placement
-    print(f"DEBUG: Finding item {item_id}")
+    retrieve_trace.debug(lambda: f"Finding item {item_id}")
     item = items_df[items_df['item_id'] == item_id]
     placement = placements_df[placements_df['item_id'] == item_id]
     
     if item.empty or placement.empty:
-        print("DEBUG: Item not found or not placed")
+        retrieve_trace.debug("Item not found or not placed")
         return Response({
             'success': False,
             'message': 'Item not found or not placed'
         })
     
     # Generate log entry
-    print("DEBUG: Generating log entry")
+    retrieve_trace.debug("Generating log entry")
     log_entry = manager.generate_log(
         action_type='retrieve',
         user_id=user_id,
@@ -450,7 +456,7 @@ def retrieve_item(request):
         details=f"Item retrieved from container {placement.iloc[0]['container_id']}"
     )
     
-    print(f"DEBUG: Log entry: {log_entry}")
+    retrieve_trace.debug(lambda: f"Log entry: {log_entry}")
     return Response({
         'success': True,
         'message': f"Item {item_id} has been retrieved successfully",
@@ -461,21 +467,22 @@ def retrieve_item(request):
 @api_view(['GET'])
 def identify_waste(request):
     """Identify expired items or items with zero uses left."""
-    print("DEBUG: identify_waste view called")
+    waste_trace.debug("identify_waste view called")
     manager = PlacementManager()
+    as_of = request.query_params.get('date')
     
     try:
-        waste_items = manager.identify_waste()
-        print(f"DEBUG: Retrieved {len(waste_items)} waste items")
+        waste_items = manager.identify_waste(as_of)
+        waste_trace.debug(lambda: f"Retrieved {len(waste_items)} waste items")
         return Response({
             'success': True,
             'waste_items': waste_items,
             'wasteItems': waste_items  # Add camelCase version for compatibility
         })
     except Exception as e:
-        print(f"DEBUG: Error in identify_waste view: {str(e)}")
+        waste_trace.warning(lambda: f"Error in identify_waste view: {str(e)}")
         import traceback
-        print(f"DEBUG: Traceback: {traceback.format_exc()}")
+        waste_trace.debug(lambda: f"Traceback: {traceback.format_exc()}")
         return Response({
             'success': False,
             'message': f"Error identifying waste items: {str(e)}",
@@ -483,60 +490,155 @@ def identify_waste(request):
             'wasteItems': []  # Add camelCase version for compatibility
         })
 
-# Dummy view for returning undocking plan (to be implemented)
 @api_view(['POST'])
 def return_plan(request):
-    # Implement your undocking plan logic here
-    return Response({
-        'success': True,
-        'plan': {}
-    })
+    """Plan which waste items go back in the undocking container, within its weight limit."""
+    # Accept the camelCase keys sent by the frontend as well as snake_case
+    data = {
+        'undocking_container_id': request.data.get('undocking_container_id', request.data.get('undockingContainerId')),
+        'undocking_date': request.data.get('undocking_date', request.data.get('undockingDate')),
+        'max_weight': request.data.get('max_weight', request.data.get('maxWeight')),
+    }
+    serializer = UndockingPlanSerializer(data={k: v for k, v in data.items() if v is not None})
+    if not serializer.is_valid():
+        return Response({'success': False, 'errors': serializer.errors}, status=400)
+    objective = request.data.get('objective', DEFAULT_OBJECTIVE)
+    if objective not in OBJECTIVES:
+        return Response({'success': False, 'message': f"objective must be one of {', '.join(OBJECTIVES)}"}, status=400)
+
+    params = serializer.validated_data
+    manager = PlacementManager()
+    plan = manager.plan_return(
+        params['undocking_container_id'],
+        params['undocking_date'].date(),
+        params['max_weight'],
+        objective=objective
+    )
+    return Response(plan)
 
-# Dummy view for completing undocking (to be implemented)
 @api_view(['POST'])
 def complete_undocking(request):
-    # Implement your undocking completion logic here
-    return Response({
-        'success': True,
-        'message': 'Undocking completed.'
-    })
-
-# Dummy view for simulation of day (to be implemented)
+    """Remove the planned items from the station once the undocking container has left."""
+    container_id = request.data.get('undocking_container_id', request.data.get('undockingContainerId'))
+    if not container_id:
+        return Response({'success': False, 'message': 'undockingContainerId is required', 'itemsRemoved': 0}, status=400)
+    result = PlacementManager().complete_undocking(container_id)
+    return Response(result, status=200 if result['success'] else 404)
+
+# API view for simulating the passage of time with a usage schedule
 @api_view(['POST'])
 def simulate_day(request):
-    # Extract parameters from request.data
-    num_days = request.data.get('num_of_days', 1)
-    items_to_use = request.data.get('items_to_use', [])
+    # Accept the camelCase keys sent by the frontend as well as snake_case
+    data = {
+        'num_of_days': request.data.get('num_of_days', request.data.get('numOfDays')),
+        'to_timestamp': request.data.get('to_timestamp', request.data.get('toTimestamp')),
+        'items_to_be_used_per_day': request.data.get(
+            'items_to_be_used_per_day',
+            request.data.get('itemsToBeUsedPerDay', request.data.get('items_to_use', []))
+        ),
+    }
+    serializer = SimulationRequestSerializer(data={k: v for k, v in data.items() if v is not None})
+    if not serializer.is_valid():
+        return Response({'success': False, 'errors': serializer.errors}, status=400)
+    
+    params = serializer.validated_data
     manager = PlacementManager()
-    result = manager.simulate_days(num_days, items_to_use)
+    result = manager.simulate_days(
+        params.get('num_of_days', 1),
+        params.get('items_to_be_used_per_day', []),
+        to_timestamp=params.get('to_timestamp')
+    )
     return Response(result)
 
-# Dummy view for import_items (to be implemented)
+# Imports accept a CSV upload in ``file`` or a JSON list of records; good
+# rows are stored even when others are rejected (see importer.import_batch)
+def _import(request, dataset):
+    try:
+        report = importer.import_batch(dataset, upload=request.FILES.get('file'),
+                                       records=None if request.FILES else request.data)
+    except importer.BatchError as e:
+        return Response({'success': False, 'message': str(e)}, status=400)
+    status = 400 if report['rejected'] and not report['imported'] else 200
+    return Response(report, status=status)
+
+
 @api_view(['POST'])
 def import_items(request):
-    # Implement your import logic here
-    return Response({
-        'success': True,
-        'message': 'Items imported successfully.'
-    })
+    return _import(request, importer.ITEMS)
+
 
-# Dummy view for import_containers (to be implemented)
 @api_view(['POST'])
 def import_containers(request):
-    # Implement your import logic here
-    return Response({
-        'success': True,
-        'message': 'Containers imported successfully.'
-    })
+    return _import(request, importer.CONTAINERS)
 
-# Dummy view for export_arrangement (to be implemented)
-@api_view(['GET'])
+
+# Plain Django view: DRF reserves ?format= for renderer negotiation
+@require_GET
 def export_arrangement(request):
-    # Implement your export logic here
-    return Response({
-        'success': True,
-        'arrangement': {}
-    })
+    """Stream the stored arrangement as ?format=csv (default), ndjson or binary."""
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in export.FORMATS:
+        return JsonResponse({
+            'success': False,
+            'message': f"Unknown format '{export_format}', expected one of: {', '.join(export.FORMATS)}"
+        }, status=400)
+
+    manager = PlacementManager()
+    placement_path = manager._placement_path()
+    if placement_path is None:
+        return JsonResponse({'success': False, 'message': 'No placement results found'}, status=404)
+
+    content_type, extension, encoder = export.FORMATS[export_format]
+    chunks = export.iter_arrangement(placement_path, manager.data_dir / 'input_items.csv')
+    response = StreamingHttpResponse(encoder(chunks), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="arrangement.{extension}"'
+    return response
+
+def _geometry_params(request):
+    """Return (container ids or None, min_size or None); raises ValueError on a bad min_size."""
+    container_ids = request.GET.getlist('container_id') or None
+    min_size = request.GET.get('min_size')
+    if min_size is not None:
+        min_size = float(min_size)
+        if not min_size > 0:
+            raise ValueError(min_size)
+    return container_ids, min_size
+
+
+def _geometry_etag(request):
+    manager = PlacementManager()
+    data_dir = manager.data_dir
+    paths = [manager._placement_path(), data_dir / 'input_items.csv', data_dir / 'containers.csv']
+    # Waste flags are evaluated as of today, so the tag changes daily too
+    return geometry.etag(paths, sorted(request.GET.getlist('container_id')), request.GET.get('min_size'),
+                         date.today().isoformat())
+
+
+# Packed geometry for the 3D views; unchanged data answers If-None-Match with 304
+@require_GET
+@condition(etag_func=_geometry_etag)
+def container_geometry(request):
+    """Box positions, sizes and priority/status codes as little-endian typed arrays."""
+    try:
+        container_ids, min_size = _geometry_params(request)
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'min_size must be a positive number of cm'}, status=400)
+
+    manager = PlacementManager()
+    placement_path = manager._placement_path()
+    if placement_path is None:
+        return JsonResponse({'success': False, 'message': 'No placement results found'}, status=404)
+
+    waste_ids = [item['item_id'] for item in manager.identify_waste()]
+    boxes = geometry.load_boxes(placement_path, manager.data_dir / 'input_items.csv', container_ids, waste_ids)
+    if min_size is not None:
+        boxes = geometry.merge_small(boxes, min_size)
+    containers_path = manager.data_dir / 'containers.csv'
+    containers_df = pd.read_csv(containers_path) if containers_path.exists() else None
+
+    response = HttpResponse(geometry.encode(boxes, containers_df), content_type=geometry.CONTENT_TYPE)
+    response['Cache-Control'] = 'no-cache'
+    return response
 
 # Dummy view for logs (to be implemented)
 @api_view(['GET'])
@@ -553,50 +655,68 @@ def get_logs(request):
         'logs': logs
     })
 
+def _sparse_page(request, df, key):
+    """
+    Apply ``?fields=`` and ``?cursor=``/``?page_size=`` to a CSV frame.
+
+    Returns:
+        Tuple of (records, paging fields to merge into the response)
+    """
+    columns = frame_columns(request, key)
+    if df is not None and columns is not None:
+        df = df[[column for column in columns if column in df.columns]]
+    df, next_cursor = paginate_frame(df, request, key)
+    records = df.to_dict(orient='records') if df is not None else []
+    paging = {'next': next_cursor} if pagination_requested(request) else {}
+    return records, paging
+
 @api_view(['GET'])
 def get_containers(request):
     manager = PlacementManager()
-    containers_df = manager.load_containers()
+    containers_df = manager.load_containers(frame_columns(request, 'container_id'))
     
     # If no containers found, try to load from CSV
     if containers_df is None:
         _, containers_df = manager.load_from_csv()
     
-    containers = containers_df.to_dict(orient='records') if containers_df is not None else []
+    containers, paging = _sparse_page(request, containers_df, 'container_id')
     return Response({
         'success': True,
         'containers': containers,
-        'containersData': containers  # Add camelCase version for compatibility
+        'containersData': containers,  # Add camelCase version for compatibility
+        **paging
     })
 
 @api_view(['GET'])
 def get_items(request):
     manager = PlacementManager()
-    items_df = manager.load_items()
+    items_df = manager.load_items(frame_columns(request, 'item_id'))
     
     # If no items found, try to load from CSV
     if items_df is None:
         items_df, _ = manager.load_from_csv()
     
-    items = items_df.to_dict(orient='records') if items_df is not None else []
+    items, paging = _sparse_page(request, items_df, 'item_id')
     return Response({
         'success': True,
-        'items': items
+        'items': items,
+        **paging
     })
 
 @api_view(['GET'])
 def get_placement(request):
     manager = PlacementManager()
-    placement_df = manager.load_placement()
+    placement_df = manager.load_placement(frame_columns(request, 'item_id'))
     
     # If no placement found, try to load from CSV
     if placement_df is None:
         _, placement_df = manager.load_from_csv()
     
-    placement = placement_df.to_dict(orient='records') if placement_df is not None else []
+    placement, paging = _sparse_page(request, placement_df, 'item_id')
     return Response({
         'success': True,
-        'placement': placement
+        'placement': placement,
+        **paging
     })
 
 
@@ -621,26 +741,19 @@ def placement_view(request):
             containers_data = data['containers']
 
             # Convert input keys to DataFrame columns
-            for item in items_data:
-                item['item_id'] = item.pop('itemId')
-                item['width_cm'] = item.pop('width')
-                item['depth_cm'] = item.pop('depth')
-                item['height_cm'] = item.pop('height')
-                item['mass_kg'] = item.pop('mass')
-                item['priority'] = item.pop('priority')
-                item['preferred_zone'] = item.get('preferredZone', '')
-
-            for container in containers_data:
-                container['container_id'] = container.pop('containerId')
-                container['width_cm'] = container.pop('width')
-                container['depth_cm'] = container.pop('depth')
-                container['height_cm'] = container.pop('height')
-                container['zone'] = container.get('zone', '')
-                container['volume'] = container['width_cm'] * container['depth_cm'] * container['height_cm']
-                container['name'] = container.get('name', f"Container {container['container_id']}")
-
-            items_df = pd.DataFrame(items_data)
-            containers_df = pd.DataFrame(containers_data)
+            items_df = importer.apply_aliases(pd.DataFrame(items_data), importer.ITEMS)
+            containers_df = importer.apply_aliases(pd.DataFrame(containers_data), importer.CONTAINERS)
+            for frame, columns in ((items_df, ['item_id', 'width_cm', 'depth_cm', 'height_cm', 'weight_kg', 'priority']),
+                                   (containers_df, ['container_id', 'width_cm', 'depth_cm', 'height_cm'])):
+                missing = [column for column in columns if column not in frame.columns]
+                if missing:
+                    raise KeyError(missing[0])
+
+            for frame, column in ((items_df, 'preferred_zone'), (containers_df, 'zone')):
+                frame[column] = frame[column].fillna('') if column in frame.columns else ''
+            containers_df['volume'] = containers_df['width_cm'] * containers_df['depth_cm'] * containers_df['height_cm']
+            default_names = 'Container ' + containers_df['container_id'].astype(str)
+            containers_df['name'] = containers_df['name'].fillna(default_names) if 'name' in containers_df.columns else default_names
 
             manager = PlacementManager()
             placements_df, unplaced_df = manager.place_items(items_df, containers_df)
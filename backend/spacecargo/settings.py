@@ -48,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'placement.middleware.RequestMetricsMiddleware',
+    'placement.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware
@@ -139,6 +141,14 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 DATA_DIR = BASE_DIR.parent / 'data'
 DATA_DIR.mkdir(exist_ok=True)
 
+# Trace channels for the placement app, e.g. "load=DEBUG,results=DEBUG" or "*=DEBUG" (see placement/trace.py)
+PLACEMENT_TRACE = os.environ.get('PLACEMENT_TRACE', '')
+
+# On-demand request profiling (see placement/profiling.py)
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')
+PROFILE_DIR = Path(os.environ.get('PROFILE_DIR', BASE_DIR / 'profiles'))
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 20))
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -1,9 +1,12 @@
 from django.contrib import admin
 from django.urls import path, include
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.conf import settings
 from django.conf.urls.static import static
 
+from placement import metrics as placement_metrics
+from placement.profiling import profile_view
+
 def api_root(request):
     return JsonResponse({
         'message': 'Welcome to Space Cargo System API',
@@ -14,9 +17,14 @@ def api_root(request):
         }
     })
 
+def metrics(request):
+    return HttpResponse(placement_metrics.render(), content_type=placement_metrics.CONTENT_TYPE)
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', api_root, name='api_root'),
+    path('metrics', metrics, name='metrics'),
+    path('profiles/<str:profile_id>/', profile_view, name='profile'),
 
     # ✅ Add this line to support /api/placement/
     path('api/placement/', include('placement.urls')),
@@ -1,3 +1,4 @@
+import logging
 import pandas as pd
 import numpy as np
 from itertools import combinations
@@ -7,6 +8,8 @@ import time
 import random
 from sqlalchemy.orm import Session
 
+logger = logging.getLogger(__name__)
+
 def efficient_placement(items_path, containers_path):
     """
     Implements the efficient placement algorithm to place items into containers.
@@ -355,8 +358,8 @@ def get_placement_efficiency(db: Session):
             1
         )
         
-        # Print debug info to help diagnose
-        print(f"DEBUG - Efficiency stats: spatial={spatial_efficiency}, satisfaction={priority_satisfaction}, zone={zone_match_rate}")
+        logger.debug("Efficiency stats: spatial=%s, satisfaction=%s, zone=%s",
+                     spatial_efficiency, priority_satisfaction, zone_match_rate)
         
         return {
             "efficiency": efficiency_score,
@@ -0,0 +1,178 @@
+"""
+Event-Driven Day Simulation for Space Cargo System
+This module fast-forwards the station clock by scheduling expiry and consumption
+events in a priority queue instead of re-scanning every item for every day.
+"""
+import heapq
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+# Expiry is checked before consumption on the same day
+EXPIRY_EVENT = 0
+CONSUMPTION_EVENT = 1
+
+
+class EventSimulator:
+    """
+    Simulates item expiry and consumption over a range of days in one pass.
+
+    Each item gets at most one expiry event and one consumption event. The
+    consumption day is drawn up front from a geometric distribution, which is
+    equivalent to rolling the daily consumption chance every day until it hits.
+    Category stock counters are updated as events fire, so low-stock alerts
+    never need a rescan.
+    """
+
+    def __init__(self, db: Session, seed: Optional[int] = None):
+        self.db = db
+        self.rng = np.random.default_rng(seed)
+        self.consumed = []
+        self.expired = []
+
+    def run(self, start_date: datetime, days: int) -> Dict[str, Any]:
+        """
+        Simulate ``days`` days starting at ``start_date``.
+
+        Args:
+            start_date: Current simulation date
+            days: Number of days to advance
+
+        Returns:
+            dict: Totals, per-day statistics and alerts
+        """
+        rows = self.db.query(
+            models.Item.id, models.Item.name, models.Item.priority,
+            models.Item.category, models.Item.status, models.Item.expiry_date
+        ).all()
+
+        ids = [row.id for row in rows]
+        names = [row.name for row in rows]
+        categories = [row.category for row in rows]
+        statuses = [row.status for row in rows]
+        expiry_dates = [row.expiry_date for row in rows]
+
+        # Category counters, maintained incrementally from here on
+        category_totals: Dict[Any, int] = {}
+        category_available: Dict[Any, int] = {}
+        for category, status in zip(categories, statuses):
+            category_totals[category] = category_totals.get(category, 0) + 1
+            category_available[category] = category_available.get(category, 0) + (status == "AVAILABLE")
+
+        events = []
+        for index, (status, expiry_date) in enumerate(zip(statuses, expiry_dates)):
+            if status in ("CONSUMED", "EXPIRED") or expiry_date is None:
+                continue
+            expiry_day = max(1, math.ceil((_as_datetime(expiry_date) - start_date) / timedelta(days=1)))
+            if expiry_day <= days:
+                events.append((expiry_day, EXPIRY_EVENT, index))
+
+        # Higher priority = less likely to be consumed (base 5% chance)
+        priorities = np.array([row.priority or 0 for row in rows], dtype=float)
+        chances = 0.05 - priorities * 0.01
+        candidates = np.flatnonzero((chances > 0) & np.array([s == "AVAILABLE" for s in statuses], dtype=bool))
+        if candidates.size:
+            consumption_days = self.rng.geometric(chances[candidates])
+            for index, day in zip(candidates[consumption_days <= days], consumption_days[consumption_days <= days]):
+                events.append((int(day), CONSUMPTION_EVENT, int(index)))
+        heapq.heapify(events)
+
+        daily_activity = []
+        alerts = []
+        for day in range(1, days + 1):
+            day_date = start_date + timedelta(days=day)
+            day_alerts = []
+            consumed_today = 0
+            expired_today = 0
+
+            while events and events[0][0] == day:
+                _, kind, index = heapq.heappop(events)
+                status = statuses[index]
+                if kind == EXPIRY_EVENT:
+                    if status in ("CONSUMED", "EXPIRED"):
+                        continue
+                    statuses[index] = "EXPIRED"
+                    self.expired.append(ids[index])
+                    expired_today += 1
+                    day_alerts.append({
+                        "severity": "warning",
+                        "message": f"Item '{names[index]}' has expired on {expiry_dates[index]}"
+                    })
+                elif status == "AVAILABLE":
+                    statuses[index] = "CONSUMED"
+                    self.consumed.append({"id": ids[index], "status": "CONSUMED", "consumed_date": day_date})
+                    consumed_today += 1
+                else:
+                    continue
+                if status == "AVAILABLE":
+                    category_available[categories[index]] -= 1
+
+            day_alerts.extend(_low_stock_alerts(category_totals, category_available))
+            alerts.extend(day_alerts)
+            daily_activity.append({
+                "date": day_date.strftime("%Y-%m-%d"),
+                "items_consumed": consumed_today,
+                "new_expired_items": expired_today
+            })
+
+        return {
+            "items_consumed": len(self.consumed),
+            "new_expired_items": len(self.expired),
+            "alerts": alerts,
+            "daily_activity": daily_activity
+        }
+
+    def persist(self) -> None:
+        """
+        Write the accumulated status changes as bulk UPDATE statements.
+
+        Does not commit; the caller commits together with the new simulation
+        date so the whole fast-forward lands in one transaction.
+        """
+        if self.expired:
+            self.db.execute(
+                update(models.Item)
+                .where(models.Item.id.in_(self.expired))
+                .values(status="EXPIRED")
+            )
+        if self.consumed:
+            # ORM bulk UPDATE by primary key: a single executemany
+            self.db.execute(update(models.Item), self.consumed)
+        logger.info(f"Persisted {len(self.expired)} expirations and {len(self.consumed)} consumptions")
+
+
+def _as_datetime(value) -> datetime:
+    """Expiry dates may come back as strings from older rows."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _low_stock_alerts(totals: Dict[Any, int], available: Dict[Any, int]) -> List[Dict[str, str]]:
+    """Build low-stock alerts from the category counters."""
+    alerts = []
+    for category, total in totals.items():
+        if total <= 0:
+            continue
+        available_percentage = available[category] / total * 100
+
+        if available_percentage <= 10:
+            alerts.append({
+                "severity": "critical",
+                "message": f"Critical shortage of {category}: only {available[category]} items left ({available_percentage:.1f}%)"
+            })
+        elif available_percentage <= 25:
+            alerts.append({
+                "severity": "warning",
+                "message": f"Low stock of {category}: only {available[category]} items left ({available_percentage:.1f}%)"
+            })
+    return alerts
@@ -0,0 +1,261 @@
+"""
+Monte Carlo Simulation Runner for Space Cargo System
+This module runs many seeded simulation trajectories in parallel against
+in-memory snapshots of the station state and aggregates their outcomes.
+
+Placement is modelled by aggregate capacity only: an item fits a container
+when the container's remaining volume and weight allowance cover it. Item
+shapes, orientation and positions are not packed, so the results are an
+upper bound on what the 3D placement algorithms would fit.
+"""
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Reported with the results so callers know how placement was modelled
+FIT_MODEL = "aggregate_volume_and_weight"
+
+
+def generate_random_item(rng=random) -> Dict[str, Any]:
+    """
+    Generate random item data for simulation.
+
+    Args:
+        rng: Random number generator (a ``random.Random`` instance or the ``random`` module)
+
+    Returns:
+        dict: Item attributes
+    """
+    categories = ["Food", "Equipment", "Medical", "Science", "Personal"]
+    zones = ["A", "B", "C", "D", "E"]
+
+    # Random dimensions between 0.1 and 1.0 meters
+    length = round(rng.uniform(0.1, 1.0), 2)
+    width = round(rng.uniform(0.1, 1.0), 2)
+    height = round(rng.uniform(0.1, 1.0), 2)
+
+    # Random weight between 0.5 and 10 kg
+    weight = round(rng.uniform(0.5, 10.0), 2)
+
+    return {
+        "name": f"Sim-Item-{rng.randint(1000, 9999)}",
+        "length": length,
+        "width": width,
+        "height": height,
+        "weight": weight,
+        "category": rng.choice(categories),
+        "priority": rng.randint(1, 5),
+        "preferred_zone": rng.choice(zones),
+        "status": "available"
+    }
+
+
+def snapshot_station(db: Session) -> Dict[str, Any]:
+    """
+    Copy the station state into plain, picklable lists.
+
+    Only reads from the database; trajectories work on copies of this snapshot.
+
+    Args:
+        db: Database session
+
+    Returns:
+        dict: Container capacities and the volume/weight/zone of waiting and placed items
+    """
+    containers = db.query(
+        models.Container.id, models.Container.zone, models.Container.width, models.Container.height, models.Container.depth,
+        models.Container.max_weight, models.Container.used_volume, models.Container.used_weight
+    ).all()
+    items = db.query(
+        models.Item.width, models.Item.height, models.Item.depth, models.Item.weight,
+        models.Item.preferred_zone, models.Item.is_placed, models.Item.container_id, models.Item.status
+    ).all()
+    container_index = {c.id: index for index, c in enumerate(containers)}
+
+    def volume(row):
+        return (row.width or 0) * (row.height or 0) * (row.depth or 0)
+
+    active = [item for item in items if (item.status or "").upper() not in ("CONSUMED", "EXPIRED")]
+    waiting = [item for item in active if not item.is_placed]
+    placed = [item for item in active if item.is_placed and item.container_id in container_index]
+
+    return {
+        "container_zone": [c.zone for c in containers],
+        "container_volume": [volume(c) for c in containers],
+        "container_max_weight": [c.max_weight or float("inf") for c in containers],
+        "container_used_volume": [c.used_volume or 0 for c in containers],
+        "container_used_weight": [c.used_weight or 0 for c in containers],
+        "waiting_items": [(volume(i), i.weight or 0, i.preferred_zone) for i in waiting],
+        "placed_items": [
+            (volume(i), i.weight or 0, container_index[i.container_id]) for i in placed
+        ],
+    }
+
+
+def run_trajectory(snapshot: Dict[str, Any], days: int, items_per_day: int, seed: int) -> Dict[str, Any]:
+    """
+    Run one seeded trajectory of the simulation against a copy of the snapshot.
+
+    Mirrors ``run_simulation``: items arrive, are placed in a random or the
+    best-fitting container, and placed items are consumed at random. Consumed
+    items free their container space. Fit is checked against remaining volume
+    and weight only (see the module docstring).
+
+    Args:
+        snapshot: Station state from ``snapshot_station``
+        days: Number of days to simulate
+        items_per_day: Average number of items processed per day
+        seed: Seed for this trajectory
+
+    Returns:
+        dict: Per-trajectory outcomes
+    """
+    rng = random.Random(seed)
+    zones = snapshot["container_zone"]
+    capacity = snapshot["container_volume"]
+    max_weight = snapshot["container_max_weight"]
+    used_volume = list(snapshot["container_used_volume"])
+    used_weight = list(snapshot["container_used_weight"])
+    waiting = list(snapshot["waiting_items"])
+    placed = list(snapshot["placed_items"])
+    total_volume = sum(capacity)
+
+    def fits(container, volume, weight):
+        return (used_volume[container] + volume <= capacity[container] and
+                used_weight[container] + weight <= max_weight[container])
+
+    placements_failed = 0
+    items_placed = 0
+    consumed_per_day = []
+    utilization_per_day = []
+
+    for _ in range(days):
+        day_items_count = max(1, int(rng.gauss(items_per_day, items_per_day / 3)))
+
+        for _ in range(day_items_count):
+            if not waiting or rng.random() > 0.7:  # 30% chance to generate new item
+                new_item = generate_random_item(rng)
+                # Generated dimensions are in meters, container dimensions in cm
+                new_volume = new_item["length"] * new_item["width"] * new_item["height"] * 1e6
+                waiting.append((new_volume, new_item["weight"], new_item["preferred_zone"]))
+
+            index = rng.randint(0, len(waiting) - 1)
+            volume, weight, zone = waiting[index]
+
+            target = None
+            if rng.random() > 0.5 and zones:
+                candidate = rng.randrange(len(zones))
+                if fits(candidate, volume, weight):
+                    target = candidate
+            else:
+                candidates = [c for c in range(len(zones)) if fits(c, volume, weight)]
+                preferred = [c for c in candidates if zones[c] == zone]
+                pool = preferred or candidates
+                if pool:
+                    target = min(pool, key=lambda c: capacity[c] - used_volume[c])
+
+            if target is None:
+                placements_failed += 1
+                continue
+
+            used_volume[target] += volume
+            used_weight[target] += weight
+            placed.append((volume, weight, target))
+            waiting[index] = waiting[-1]
+            waiting.pop()
+            items_placed += 1
+
+        consumed_count = rng.randint(0, min(3, len(placed))) if placed else 0
+        for _ in range(consumed_count):
+            index = rng.randrange(len(placed))
+            volume, weight, container = placed[index]
+            used_volume[container] -= volume
+            used_weight[container] -= weight
+            placed[index] = placed[-1]
+            placed.pop()
+        consumed_per_day.append(consumed_count)
+        utilization_per_day.append(sum(used_volume) / total_volume * 100 if total_volume > 0 else 0.0)
+
+    return {
+        "seed": seed,
+        "items_placed": items_placed,
+        "placements_failed": placements_failed,
+        "consumed_per_day": consumed_per_day,
+        "utilization_per_day": utilization_per_day
+    }
+
+
+def summarize(values) -> Dict[str, float]:
+    """Mean, standard deviation and percentiles of a sample."""
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return {"mean": 0.0, "std": 0.0, **{f"p{p}": 0.0 for p in PERCENTILES}}
+    percentiles = np.percentile(values, PERCENTILES)
+    return {
+        "mean": round(float(values.mean()), 3),
+        "std": round(float(values.std()), 3),
+        **{f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, percentiles)}
+    }
+
+
+def run_monte_carlo(db: Session, trajectories: int, days: int, items_per_day: int,
+                    random_seed: Optional[int] = None, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run ``trajectories`` seeded simulations on a process pool and aggregate them.
+
+    Args:
+        db: Database session (read once for the snapshot, never written)
+        trajectories: Number of trajectories to run
+        days: Number of days per trajectory
+        items_per_day: Average number of items processed per day
+        random_seed: Base seed; trajectory ``i`` uses ``random_seed + i``
+        max_workers: Process pool size (defaults to the CPU count)
+
+    Returns:
+        dict: Distributions of utilization, failed placements and daily
+        consumption, with ``fit_model`` naming the volume/weight-only fit check
+    """
+    if items_per_day < 1:
+        raise ValueError("items_per_day must be at least 1")
+    snapshot = snapshot_station(db)
+    if not snapshot["container_zone"]:
+        raise ValueError("No containers available for simulation")
+
+    base_seed = random_seed if random_seed is not None else random.SystemRandom().randrange(2 ** 31)
+    seeds = [base_seed + i for i in range(trajectories)]
+    workers = max(1, min(max_workers or os.cpu_count() or 1, trajectories))
+    logger.info(f"Running {trajectories} Monte Carlo trajectories on {workers} workers (base seed {base_seed})")
+
+    worker = partial(run_trajectory, snapshot, days, items_per_day)
+    if workers == 1:
+        results: List[Dict[str, Any]] = [worker(seed) for seed in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(worker, seeds, chunksize=max(1, trajectories // (workers * 4))))
+
+    utilization = np.array([r["utilization_per_day"] for r in results], dtype=float)
+    consumed = np.array([r["consumed_per_day"] for r in results], dtype=float)
+
+    return {
+        "trajectories": trajectories,
+        "days_simulated": days,
+        "base_seed": base_seed,
+        "fit_model": FIT_MODEL,
+        "final_space_utilization": summarize(utilization[:, -1] if days else []),
+        "items_placed": summarize([r["items_placed"] for r in results]),
+        "placements_failed": summarize([r["placements_failed"] for r in results]),
+        "items_consumed_per_day": summarize(consumed.ravel()),
+        "daily_utilization_mean": [round(float(v), 3) for v in utilization.mean(axis=0)] if days else []
+    }
@@ -382,6 +382,77 @@ class PlacementManager:
         """Get current placement statistics"""
         return self.stats
 
+    def _model_as_dict(self, obj, is_container):
+        """Map an Item/Container row onto the dict layout used by the scoring helpers"""
+        data = {
+            'id': obj.id,
+            'name': obj.name,
+            'width': obj.width or 0,
+            'height': obj.height or 0,
+            'depth': obj.depth or 0,
+        }
+        data['volume'] = data['width'] * data['height'] * data['depth']
+        if is_container:
+            data['zone'] = obj.zone
+        else:
+            data['priority'] = obj.priority or 0
+            data['preferredZone'] = obj.preferred_zone
+            data['expiryDate'] = getattr(obj, 'expiry_date', None)
+        return data
+
+    def calculate_compatibility_score(self, item, container):
+        """
+        Score an item against a container row using its current used volume
+
+        Args:
+            item: Item model instance
+            container: Container model instance
+
+        Returns:
+            Compatibility score
+        """
+        return self._calculate_compatibility_score(
+            self._model_as_dict(item, False),
+            self._model_as_dict(container, True),
+            {'used_volume': container.used_volume or 0}
+        )
+
+    def find_optimal_container(self, item, containers):
+        """
+        Find the best-scoring container row with room for an item
+
+        Args:
+            item: Item model instance
+            containers: Container model instances
+
+        Returns:
+            The chosen Container, or None if nothing fits
+        """
+        item_data = self._model_as_dict(item, False)
+        best, best_score = None, None
+        for container in containers:
+            container_data = self._model_as_dict(container, True)
+            used_volume = container.used_volume or 0
+            if used_volume + item_data['volume'] > container_data['volume']:
+                continue
+            if not self._item_fits_container(item_data, container_data):
+                continue
+            score = self._calculate_compatibility_score(item_data, container_data, {'used_volume': used_volume})
+            if best_score is None or score > best_score:
+                best, best_score = container, score
+        return best
+
+    def generate_reasoning(self, item, container, score):
+        """Explain a recommendation in one sentence"""
+        reasons = []
+        if item.preferred_zone and item.preferred_zone == container.zone:
+            reasons.append(f"matches preferred zone {container.zone}")
+        container_volume = (container.width or 0) * (container.height or 0) * (container.depth or 0)
+        if container_volume > 0:
+            reasons.append(f"container is {(container.used_volume or 0) / container_volume * 100:.1f}% full")
+        detail = f" ({', '.join(reasons)})" if reasons else ""
+        return f"{container.name} scores {score:.1f} for {item.name}{detail}"
+
 # Singleton instance for use in routers and other modules
 placement_manager = PlacementManager()
 
@@ -4,9 +4,17 @@ This module provides functions to generate statistics about item placements.
 """
 import logging
 import random
+from sqlalchemy import select, func, case, and_, true
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List
 
+from .. import models
+
+# Items at or above this priority count as high priority in the statistics
+HIGH_PRIORITY_THRESHOLD = 70
+
+
 def get_empty_statistics() -> Dict[str, Any]:
     """
     Return empty statistics when no data is available.
@@ -197,4 +205,107 @@ def get_container_utilization(db: Session, containers: List) -> List[Dict[str, A
             "utilizationPercentage": utilization_percentage
         })
     
-    return container_stats 
\ No newline at end of file
+    return container_stats
+
+
+def placement_summary_statement():
+    """
+    Build the single query behind GET /placement/statistics.
+
+    One row of global aggregates (item counts, placement history counts, zone
+    matches) is left-joined to every container, so the totals and the
+    per-container utilization come back in one round trip. The global row is
+    evaluated once; with no containers the join still yields one row.
+
+    Returns:
+        Select statement
+    """
+    item = models.Item
+    container = models.Container
+    history = models.PlacementHistory
+    high_priority = item.priority >= HIGH_PRIORITY_THRESHOLD
+
+    item_totals = select(
+        func.count(item.id).label("total_items"),
+        func.coalesce(func.sum(case((item.is_placed == True, 1), else_=0)), 0).label("placed_items"),
+        func.coalesce(func.sum(case((high_priority, 1), else_=0)), 0).label("high_priority_items"),
+        func.coalesce(func.sum(case((and_(high_priority, item.is_placed == True), 1), else_=0)), 0).label("placed_high_priority")
+    ).subquery("item_totals")
+
+    history_totals = select(
+        func.count(history.id).label("total_placements"),
+        func.coalesce(func.sum(case((history.success == True, 1), else_=0)), 0).label("successful_placements")
+    ).subquery("history_totals")
+
+    zone_matches = (
+        select(func.count(item.id))
+        .join(container, item.container_id == container.id)
+        .where(item.is_placed == True, item.preferred_zone == container.zone)
+        .scalar_subquery()
+    )
+
+    return (
+        select(
+            item_totals,
+            history_totals,
+            zone_matches.label("zone_matches"),
+            container.id.label("container_id"),
+            container.name.label("container_name"),
+            (container.width * container.height * container.depth).label("container_volume"),
+            container.used_volume.label("container_used_volume")
+        )
+        .select_from(item_totals)
+        .join(history_totals, true())
+        .outerjoin(container, true())
+        .order_by(container.id)
+    )
+
+def summarize_placement_rows(rows) -> Dict[str, Any]:
+    """
+    Turn the rows of placement_summary_statement into the statistics payload.
+
+    Args:
+        rows: Result rows of the summary query
+
+    Returns:
+        dict: Fields of the PlacementStatistics schema
+    """
+    first = rows[0]
+    placed_items = first.placed_items or 0
+    success_rate = (first.successful_placements / first.total_placements * 100) if first.total_placements else 0
+    priority_satisfaction = (first.placed_high_priority / first.high_priority_items * 100) if first.high_priority_items else 0
+    zone_match_rate = (first.zone_matches / placed_items * 100) if placed_items else 0
+
+    container_rows = [row for row in rows if row.container_id is not None]
+    total_volume = sum(row.container_volume or 0 for row in container_rows)
+    used_volume = sum(row.container_used_volume or 0 for row in container_rows)
+
+    return {
+        "total_items_placed": placed_items,
+        "space_utilization": (used_volume / total_volume * 100) if total_volume > 0 else 0,
+        "success_rate": success_rate,
+        "efficiency": (success_rate + priority_satisfaction + zone_match_rate) / 3,
+        "priority_satisfaction": priority_satisfaction,
+        "zone_match_rate": zone_match_rate,
+        "container_utilization": [
+            {
+                "id": row.container_id,
+                "name": row.container_name,
+                "utilization_percentage": ((row.container_used_volume or 0) / row.container_volume * 100) if row.container_volume else 0
+            }
+            for row in container_rows
+        ]
+    }
+
+async def fetch_placement_summary(db: AsyncSession) -> Dict[str, Any]:
+    """
+    Compute placement statistics with a single query.
+
+    Args:
+        db: Async database session
+
+    Returns:
+        dict: Fields of the PlacementStatistics schema
+    """
+    rows = (await db.execute(placement_summary_statement())).all()
+    return summarize_placement_rows(rows)
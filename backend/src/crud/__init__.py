@@ -1,3 +1,7 @@
 # CRUD package initialization
 from . import container_crud
-from . import item_crud 
\ No newline at end of file
+from . import item_crud
+from . import unit_of_work
+from . import csv_import
+from . import async_container_crud
+from . import async_item_crud
@@ -0,0 +1,54 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import logging
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+# Read-only: async sessions use the shared read pool, so writes go through
+# container_crud on a get_write_db session and queue on the writer connection
+
+async def get_container(db: AsyncSession, container_id: int) -> Optional[models.Container]:
+    """
+    Get a container by ID
+
+    Args:
+        db: Async database session
+        container_id: ID of the container to retrieve
+
+    Returns:
+        Container object or None if not found
+    """
+    logger.info(f"Getting container with id {container_id}")
+    return await db.get(models.Container, container_id)
+
+async def get_containers(db: AsyncSession, skip: int = 0, limit: Optional[int] = 100,
+                         zone: Optional[str] = None,
+                         is_full: Optional[bool] = None) -> List[models.Container]:
+    """
+    Get a list of containers, optionally filtered by zone and fill state
+
+    Args:
+        db: Async database session
+        skip: Number of records to skip (for pagination)
+        limit: Maximum number of records to return (None for all)
+        zone: Optional zone to filter by
+        is_full: Optional fill state to filter by
+
+    Returns:
+        List of Container objects
+    """
+    logger.info(f"Getting containers (skip={skip}, limit={limit}, zone={zone}, is_full={is_full})")
+    statement = select(models.Container)
+
+    if zone:
+        statement = statement.where(models.Container.zone == zone)
+    if is_full is not None:
+        statement = statement.where(models.Container.is_full == is_full)
+
+    statement = statement.offset(skip)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return list((await db.scalars(statement)).all())
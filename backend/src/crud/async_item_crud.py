@@ -0,0 +1,100 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import logging
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+# Read-only: async sessions use the shared read pool, so writes go through
+# item_crud on a get_write_db session and queue on the writer connection
+
+def _filtered(statement, category: Optional[str] = None, status: Optional[str] = None,
+              container_id: Optional[int] = None, is_placed: Optional[bool] = None):
+    """Apply the shared item filters to a select statement."""
+    if category:
+        statement = statement.where(models.Item.category == category)
+    if status:
+        statement = statement.where(models.Item.status == status)
+    if container_id is not None:
+        statement = statement.where(models.Item.container_id == container_id)
+    if is_placed is not None:
+        statement = statement.where(models.Item.is_placed == is_placed)
+    return statement
+
+async def get_item(db: AsyncSession, item_id: int) -> Optional[models.Item]:
+    """
+    Get an item by ID
+
+    Args:
+        db: Async database session
+        item_id: ID of the item to retrieve
+
+    Returns:
+        Item object or None if not found
+    """
+    logger.info(f"Getting item with id {item_id}")
+    return await db.get(models.Item, item_id)
+
+async def get_items(db: AsyncSession, skip: int = 0, limit: Optional[int] = 100,
+                    category: Optional[str] = None,
+                    status: Optional[str] = None,
+                    container_id: Optional[int] = None,
+                    is_placed: Optional[bool] = None) -> List[models.Item]:
+    """
+    Get a list of items with filtering options
+
+    Args:
+        db: Async database session
+        skip: Number of records to skip (for pagination)
+        limit: Maximum number of records to return (None for all)
+        category: Optional category to filter by
+        status: Optional status to filter by (AVAILABLE, CONSUMED, EXPIRED)
+        container_id: Optional container ID to filter by
+        is_placed: Optional placement state to filter by
+
+    Returns:
+        List of Item objects
+    """
+    logger.info(f"Getting items (skip={skip}, limit={limit}, category={category}, "
+                f"status={status}, container_id={container_id}, is_placed={is_placed})")
+
+    statement = _filtered(select(models.Item), category, status, container_id, is_placed).offset(skip)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return list((await db.scalars(statement)).all())
+
+async def get_items_by_container(db: AsyncSession, container_id: int) -> List[models.Item]:
+    """
+    Get all items in a specific container
+
+    Args:
+        db: Async database session
+        container_id: ID of the container
+
+    Returns:
+        List of Item objects in the container
+    """
+    logger.info(f"Getting items in container {container_id}")
+    return await get_items(db, limit=None, container_id=container_id)
+
+async def count_items(db: AsyncSession, category: Optional[str] = None,
+                      status: Optional[str] = None,
+                      container_id: Optional[int] = None,
+                      is_placed: Optional[bool] = None) -> int:
+    """
+    Count items matching the same filters as get_items
+
+    Args:
+        db: Async database session
+        category: Optional category to filter by
+        status: Optional status to filter by
+        container_id: Optional container ID to filter by
+        is_placed: Optional placement state to filter by
+
+    Returns:
+        Number of matching items
+    """
+    statement = _filtered(select(func.count(models.Item.id)), category, status, container_id, is_placed)
+    return await db.scalar(statement)
@@ -0,0 +1,198 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any, BinaryIO, Iterator, Tuple
+import codecs
+import csv
+import itertools
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+# Import specs: model column -> (CSV column, type, default when the column is absent)
+CONTAINER_UPLOAD_SPEC = {
+    "model": models.Container,
+    "label": "containers",
+    "fields": {
+        "name": ("name", str, ""),
+        "width": ("width", float, 0.0),
+        "height": ("height", float, 0.0),
+        "depth": ("length", float, 0.0),
+        "max_weight": ("max_weight", float, 0.0),
+        "zone": ("zone", str, ""),
+    },
+    "constants": {"used_volume": 0.0, "used_weight": 0.0, "is_full": False},
+    "unique": "name",
+}
+
+ITEM_UPLOAD_SPEC = {
+    "model": models.Item,
+    "label": "items",
+    "fields": {
+        "name": ("name", str, ""),
+        "width": ("width", float, 0.0),
+        "height": ("height", float, 0.0),
+        "depth": ("length", float, 0.0),
+        "weight": ("weight", float, 0.0),
+        "category": ("category", str, ""),
+        "priority": ("priority", int, 0),
+        "preferred_zone": ("zone", str, ""),
+    },
+    "constants": {"status": "available", "is_placed": False},
+    "unique": None,
+}
+
+
+def _unique_header(header: List[str]) -> List[str]:
+    """Number repeated column names the way pandas does (``a``, ``a.1``, ...)."""
+    seen: Dict[str, int] = {}
+    unique = []
+    for name in header:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        unique.append(f"{name}.{count}" if count else name)
+    return unique
+
+
+def read_chunks(file: BinaryIO, chunk_size: int) -> Iterator[Tuple[pd.DataFrame, np.ndarray]]:
+    """
+    Yield a CSV upload as chunks of strings plus a mask of malformed rows
+
+    Rows whose field count differs from the header are padded or cut to the
+    header so row numbers stay aligned, and flagged for rejection. pandas
+    would instead take an extra field in the first row as an index column
+    and shift every value. Blank lines are skipped.
+
+    Args:
+        file: Binary file object positioned at the start of the CSV
+        chunk_size: Number of rows per chunk
+
+    Yields:
+        Tuple of (chunk with every column as a string, boolean mask of malformed rows)
+    """
+    rows = (row for row in csv.reader(codecs.iterdecode(file, "utf-8-sig")) if row)
+    header = next(rows, None)
+    if header is None:
+        return
+    header = _unique_header(header)
+    width = len(header)
+    while batch := list(itertools.islice(rows, chunk_size)):
+        malformed = np.array([len(row) != width for row in batch], dtype=bool)
+        padded = [(row + [""] * width)[:width] for row in batch]
+        yield pd.DataFrame(padded, columns=header, dtype=str), malformed
+
+
+def coerce_chunk(chunk: pd.DataFrame, spec: Dict[str, Any], first_row: int, malformed=None):
+    """
+    Validate and convert one chunk of raw CSV strings in vectorized form
+
+    Args:
+        chunk: Chunk read with every column as a string
+        spec: Import spec describing the target columns
+        first_row: 1-based data row number of the chunk's first row
+        malformed: Optional boolean mask of rows whose field count differs from the header
+
+    Returns:
+        Tuple of (DataFrame of valid rows keyed by model column, {row number: [errors]})
+    """
+    out = pd.DataFrame(index=chunk.index)
+    invalid = pd.Series(False, index=chunk.index)
+    errors: Dict[int, List[str]] = {}
+
+    # Values of a malformed row are misaligned; only its field count is reported
+    misaligned = pd.Series(False if malformed is None else malformed, index=chunk.index)
+
+    def report(mask, message):
+        for position in np.flatnonzero(mask.to_numpy()):
+            errors.setdefault(first_row + int(position), []).append(message)
+
+    report(misaligned, f"expected {len(chunk.columns)} fields like the header")
+    invalid |= misaligned
+
+    for column, (source, kind, default) in spec["fields"].items():
+        if source not in chunk.columns:
+            out[column] = default
+            continue
+        raw = chunk[source].str.strip()
+        if kind is str:
+            out[column] = raw
+            continue
+        values = pd.to_numeric(raw, errors="coerce")
+        bad = values.isna()
+        if kind is int:
+            bad |= values.notna() & (values % 1 != 0)
+        report(bad & ~misaligned, f"{source}: expected {kind.__name__}")
+        invalid |= bad
+        out[column] = values.where(~bad, 0).astype(kind)
+
+    return out[~invalid], errors
+
+
+def import_csv(db: Session, file: BinaryIO, spec: Dict[str, Any], chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Stream a CSV upload into the database with chunked bulk inserts
+
+    The file is parsed ``chunk_size`` rows at a time (see ``read_chunks``),
+    each chunk is validated in
+    vectorized form, and valid rows are inserted with one executemany per chunk.
+    Everything commits in a single transaction; invalid rows are reported and
+    skipped without aborting the batch.
+
+    Args:
+        db: Database session
+        file: Binary file object positioned at the start of the CSV
+        spec: Import spec (e.g. CONTAINER_UPLOAD_SPEC)
+        chunk_size: Number of rows parsed and inserted per chunk
+
+    Returns:
+        Dictionary with imported/failed counts and per-row error reports
+    """
+    model = spec["model"]
+    unique = spec.get("unique")
+    seen = set()
+    if unique:
+        seen = {value for (value,) in db.query(getattr(model, unique)).all()}
+
+    imported = 0
+    failed = 0
+    errors: List[Dict[str, Any]] = []
+
+    try:
+        first_row = 1
+        for chunk, malformed in read_chunks(file, chunk_size):
+            valid, chunk_errors = coerce_chunk(chunk, spec, first_row, malformed)
+
+            if unique and not valid.empty:
+                duplicate = valid[unique].isin(seen) | valid[unique].duplicated()
+                for position in np.flatnonzero(duplicate.to_numpy()):
+                    row_number = first_row + int(valid.index[position])
+                    chunk_errors.setdefault(row_number, []).append(f"{unique}: duplicate value")
+                valid = valid[~duplicate]
+                seen.update(valid[unique])
+
+            if not valid.empty:
+                records = valid.assign(**spec["constants"]).to_dict(orient="records")
+                db.execute(insert(model), records)
+                imported += len(records)
+
+            failed += len(chunk_errors)
+            for row_number in sorted(chunk_errors):
+                if len(errors) >= MAX_REPORTED_ERRORS:
+                    break
+                errors.append({"row": row_number, "errors": chunk_errors[row_number]})
+            first_row += len(chunk)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(f"Imported {imported} {spec['label']}, {failed} rows rejected")
+    return {"imported": imported, "failed": failed, "errors": errors}
@@ -0,0 +1,211 @@
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+import logging
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+ITEM_FIELDS = (
+    "id", "name", "width", "height", "depth", "weight", "priority", "preferred_zone",
+    "category", "status", "container_id", "position_x", "position_y", "position_z",
+    "is_placed", "placement_date", "consumed_date"
+)
+
+CONTAINER_FIELDS = (
+    "id", "name", "width", "height", "depth", "max_weight", "zone",
+    "used_volume", "used_weight", "is_full"
+)
+
+
+class ItemState:
+    """In-memory copy of an item row tracked by a unit of work."""
+    __slots__ = ITEM_FIELDS
+
+    def __init__(self, **values):
+        for field in ITEM_FIELDS:
+            setattr(self, field, values.get(field))
+
+    def to_row(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in ITEM_FIELDS}
+
+
+class ContainerState:
+    """In-memory copy of a container row tracked by a unit of work."""
+    __slots__ = CONTAINER_FIELDS + ("items",)
+
+    def __init__(self, **values):
+        for field in CONTAINER_FIELDS:
+            setattr(self, field, values.get(field))
+        self.used_volume = self.used_volume or 0.0
+        self.used_weight = self.used_weight or 0.0
+        self.items: List[ItemState] = []
+
+    @property
+    def volume(self) -> float:
+        return (self.width or 0) * (self.height or 0) * (self.depth or 0)
+
+
+class UnitOfWork:
+    """
+    Buffers item creations, placements and status changes in memory and writes
+    them with bulk INSERT/UPDATE statements and a single commit per flush.
+
+    Item and container rows are loaded once into ``ItemState``/``ContainerState``
+    objects. Callers mutate them through the unit of work, and ``flush`` sends the
+    accumulated changes to the database.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.containers: Dict[int, ContainerState] = {}
+        self._new_items: List[ItemState] = []
+        self._dirty_items: Dict[int, ItemState] = {}
+        self._dirty_containers: Dict[int, ContainerState] = {}
+
+    def load_containers(self) -> List[ContainerState]:
+        """
+        Load all containers, with the items currently placed in them
+
+        Returns:
+            List of ContainerState objects
+        """
+        columns = [getattr(models.Container, field) for field in CONTAINER_FIELDS]
+        for row in self.db.query(*columns).all():
+            self.containers[row.id] = ContainerState(**row._asdict())
+
+        item_columns = [getattr(models.Item, field) for field in ITEM_FIELDS]
+        placed = self.db.query(*item_columns).filter(models.Item.container_id.isnot(None)).all()
+        for row in placed:
+            container = self.containers.get(row.container_id)
+            if container is not None:
+                container.items.append(ItemState(**row._asdict()))
+
+        logger.info(f"Unit of work loaded {len(self.containers)} containers")
+        return list(self.containers.values())
+
+    def load_items(self, status: Optional[str] = None) -> List[ItemState]:
+        """
+        Load items, optionally filtered by status
+
+        Args:
+            status: Optional status to filter by
+
+        Returns:
+            List of ItemState objects
+        """
+        columns = [getattr(models.Item, field) for field in ITEM_FIELDS]
+        query = self.db.query(*columns)
+        if status:
+            query = query.filter(models.Item.status == status)
+        return [ItemState(**row._asdict()) for row in query.all()]
+
+    def create_item(self, item_data: Dict[str, Any]) -> ItemState:
+        """
+        Buffer a new item; its id is assigned on the next flush
+
+        Args:
+            item_data: Dictionary with item attributes
+
+        Returns:
+            The pending ItemState
+        """
+        item = ItemState(
+            name=item_data.get("name", ""),
+            width=item_data.get("width"),
+            height=item_data.get("height"),
+            depth=item_data.get("depth", item_data.get("length")),
+            weight=item_data.get("weight", 0),
+            priority=item_data.get("priority", 1),
+            preferred_zone=item_data.get("preferred_zone", "general"),
+            category=item_data.get("category", "general"),
+            status=item_data.get("status", "AVAILABLE"),
+            is_placed=False
+        )
+        self._new_items.append(item)
+        return item
+
+    def place_item(self, item: ItemState, container: ContainerState, position: Dict[str, Any]) -> None:
+        """
+        Record an item placement and update the container's usage
+
+        Args:
+            item: Item being placed
+            container: Target container
+            position: Position with x, y, z coordinates
+        """
+        item.container_id = container.id
+        item.position_x = position["x"]
+        item.position_y = position["y"]
+        item.position_z = position["z"]
+        item.is_placed = True
+        item.status = "placed"
+        item.placement_date = datetime.now()
+        container.items.append(item)
+
+        container.used_volume += (item.width or 0) * (item.height or 0) * (item.depth or 0)
+        container.used_weight += item.weight or 0
+        container.is_full = container.used_volume >= container.volume * 0.95
+
+        self._mark_dirty(item)
+        self._dirty_containers[container.id] = container
+
+    def consume_item(self, item: ItemState) -> None:
+        """
+        Mark an item as consumed
+
+        Args:
+            item: Item to mark as consumed
+        """
+        item.status = "CONSUMED"
+        item.consumed_date = datetime.now()
+        self._mark_dirty(item)
+
+    def _mark_dirty(self, item: ItemState) -> None:
+        # Pending items carry their latest state into the INSERT itself
+        if item.id is not None:
+            self._dirty_items[item.id] = item
+
+    def flush(self) -> Dict[str, int]:
+        """
+        Write all buffered changes in one transaction
+
+        Returns:
+            Counts of inserted items, updated items and updated containers
+        """
+        counts = {
+            "items_inserted": len(self._new_items),
+            "items_updated": len(self._dirty_items),
+            "containers_updated": len(self._dirty_containers)
+        }
+        try:
+            if self._new_items:
+                rows = [{k: v for k, v in item.to_row().items() if k != "id"} for item in self._new_items]
+                ids = self.db.scalars(
+                    insert(models.Item).returning(models.Item.id, sort_by_parameter_order=True),
+                    rows
+                ).all()
+                for item, item_id in zip(self._new_items, ids):
+                    item.id = item_id
+
+            if self._dirty_items:
+                self.db.execute(update(models.Item), [item.to_row() for item in self._dirty_items.values()])
+
+            if self._dirty_containers:
+                self.db.execute(update(models.Container), [
+                    {"id": c.id, "used_volume": c.used_volume, "used_weight": c.used_weight, "is_full": c.is_full}
+                    for c in self._dirty_containers.values()
+                ])
+
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self._new_items = []
+        self._dirty_items = {}
+        self._dirty_containers = {}
+        logger.info(f"Unit of work flushed: {counts}")
+        return counts
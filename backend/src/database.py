@@ -1,19 +1,135 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .metrics import DB_POOL_CONNECTIONS, WRITE_QUEUE_DEPTH
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./space_cargo.db"
+ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./space_cargo.db"
+
+# Applied to every new SQLite connection. WAL lets readers proceed while a
+# write transaction is open; the rest trades a little durability on power
+# loss for far fewer fsyncs and keeps hot pages in memory.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 30000,        # ms to wait for a lock before "database is locked"
+    "cache_size": -65536,         # negative = KiB, i.e. 64 MiB page cache per connection
+    "mmap_size": 268435456,       # 256 MiB memory-mapped I/O
+    "temp_store": "MEMORY",
+}
+
+# Readers share a pool; writers go through a single connection
+READ_POOL_SIZE = 8
+READ_MAX_OVERFLOW = 16
+WRITE_POOL_TIMEOUT = 300  # seconds a writer waits for its turn
+
+def configure_sqlite_connection(dbapi_connection, connection_record):
+    """Apply SQLITE_PRAGMAS to a freshly opened connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=READ_POOL_SIZE,
+    max_overflow=READ_MAX_OVERFLOW
 )
+
+# A one-connection pool is the writer queue: write sessions wait in FIFO order
+# for the connection, so writes never contend for SQLite's lock with each other
+# and readers on `engine` keep reading the last committed snapshot.
+write_engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=1,
+    max_overflow=0,
+    pool_timeout=WRITE_POOL_TIMEOUT
+)
+
+# Async readers for `async def` endpoints; queries run on aiosqlite's worker
+# threads, so a slow query does not block the event loop
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=READ_POOL_SIZE,
+    max_overflow=READ_MAX_OVERFLOW
+)
+
+for _engine in (engine, write_engine, async_engine.sync_engine):
+    event.listen(_engine, "connect", configure_sqlite_connection)
+
+def _pool_connections():
+    """Checked-out and idle connections per pool, read when /metrics is scraped."""
+    pools = {"read": engine.pool, "write": write_engine.pool, "async_read": async_engine.sync_engine.pool}
+    stats = {}
+    for name, pool in pools.items():
+        stats[(name, "checked_out")] = pool.checkedout()
+        stats[(name, "idle")] = pool.checkedin()
+    return stats
+
+DB_POOL_CONNECTIONS.set_function(_pool_connections)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+WriteSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=write_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
+def _sql_literal(value):
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+def migrate_schema(bind):
+    """
+    Bring the database up to the models, idempotently.
+
+    ``create_all`` only creates missing tables, so columns added to a model
+    after its table was first created are added here with ``ALTER TABLE``
+    (found missing via ``PRAGMA table_info``), with their scalar default so
+    existing rows get it, followed by any missing indexes.
+    """
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table.name}")')}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column.type.compile(dialect=bind.dialect)}'
+                if column.default is not None and column.default.is_scalar:
+                    ddl += f" DEFAULT {_sql_literal(column.default.arg)}"
+                conn.exec_driver_sql(ddl)
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+def get_write_db():
+    """Session for endpoints that write; requests are serialized on the writer connection."""
+    WRITE_QUEUE_DEPTH.inc()
+    db = WriteSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+        WRITE_QUEUE_DEPTH.dec()
+
+async def get_async_db():
+    """Async session for `async def` endpoints."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,10 +1,14 @@
 import logging
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 import os
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
+from starlette.concurrency import run_in_threadpool
+import time
 
-from .database import engine, Base
+from .database import engine, migrate_schema
+from . import metrics, profiling
 from .routers import placement, search, upload, simulation
 import pathlib
 
@@ -21,11 +25,18 @@ logger = logging.getLogger(__name__)
 data_dir = pathlib.Path(__file__).parent.parent.parent / "data"
 data_dir.mkdir(exist_ok=True)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and add columns introduced since they were created
+migrate_schema(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the data folder once per process, off the request path
+    await run_in_threadpool(upload.warm_load_data_folder)
+    yield
 
 app = FastAPI(
     title="Space Cargo System API",
+    lifespan=lifespan,
     default_response_class=JSONResponse  # Ensure JSON responses
 )
 
@@ -42,9 +53,48 @@ app.add_middleware(
 @app.middleware("http")
 async def add_content_type_header(request: Request, call_next):
     response = await call_next(request)
-    response.headers["Content-Type"] = "application/json"
+    if request.url.path != "/metrics" and not request.url.path.startswith("/profiles/"):
+        response.headers["Content-Type"] = "application/json"
+    return response
+
+# Profile one request on demand (X-Profile / ?profile= with PROFILE_TOKEN)
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    if request.url.path.startswith("/profiles/") or not profiling.profiling_requested(request):
+        return await call_next(request)
+    token = profiling.start_capture()
+    if token is None:
+        return await call_next(request)
+    try:
+        response = await call_next(request)
+    finally:
+        capture = profiling.finish_capture(token)
+    profile_id = await run_in_threadpool(profiling.save_capture, capture)
+    if profile_id:
+        logger.info(f"Profiled {request.method} {request.url.path} as {profile_id}")
+        response.headers["X-Profile-Id"] = profile_id
     return response
 
+# Record request latency per route template (bounded label set)
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    metrics.REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        metrics.REQUESTS_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        metrics.REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status_code
+        )
+
 # Include routers
 app.include_router(placement.router, prefix="/api/placement", tags=["placement"])
 app.include_router(search.router, prefix="/api/search", tags=["search"])
@@ -53,4 +103,20 @@ app.include_router(simulation.router, prefix="/api/simulation", tags=["simulatio
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to Space Cargo System API", "status": "online"} 
\ No newline at end of file
+    return {"message": "Welcome to Space Cargo System API", "status": "online"} 
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/profiles/{profile_id}", include_in_schema=False)
+def get_profile(profile_id: str, request: Request, format: str = "text"):
+    """Return a stored capture as a cumulative-time summary or (format=pstats) the raw file."""
+    if not profiling.profiling_requested(request):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Unknown profile id")
+    if format == "pstats":
+        return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+    return PlainTextResponse(profiling.summarize(path))
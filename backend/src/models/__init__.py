@@ -1,4 +1,4 @@
-from .placement import Container, Item, PlacementHistory
+from .placement import Container, Item, PlacementHistory, SystemConfig
 from ..database import Base
 
-__all__ = ['Container', 'Item', 'PlacementHistory'] 
\ No newline at end of file
+__all__ = ['Container', 'Item', 'PlacementHistory', 'SystemConfig'] 
\ No newline at end of file
@@ -35,6 +35,10 @@ class Item(Base):
     position_z = Column(Float, nullable=True)
     is_placed = Column(Boolean, default=False)
     placement_date = Column(DateTime, nullable=True)
+    category = Column(String, nullable=True, index=True)
+    status = Column(String, default="AVAILABLE", index=True)
+    expiry_date = Column(DateTime, nullable=True)
+    consumed_date = Column(DateTime, nullable=True)
     
     # Foreign keys
     container_id = Column(Integer, ForeignKey("containers.id"), nullable=True)
@@ -54,4 +58,11 @@ class PlacementHistory(Base):
     
     # Relationships
     item = relationship("Item")
-    container = relationship("Container") 
\ No newline at end of file
+    container = relationship("Container") 
+
+class SystemConfig(Base):
+    __tablename__ = "system_config"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, unique=True, index=True)
+    value = Column(String, nullable=True)
@@ -0,0 +1,145 @@
+"""
+Opt-in profiling of a single request.
+
+A request is profiled when it carries ``X-Profile: <token>`` or
+``?profile=<token>`` matching the ``PROFILE_TOKEN`` environment variable
+(profiling is off when it is unset). Sync endpoints run on worker threads,
+so the middleware only opens a capture; ``ProfiledRoute`` runs the endpoint
+under cProfile on whichever thread executes it. Captures are written as
+pstats files to ``PROFILE_DIR`` (newest ``PROFILE_MAX_FILES`` kept) and the
+response carries the id in ``X-Profile-Id``.
+"""
+
+import cProfile
+import contextvars
+import functools
+import hmac
+import inspect
+import io
+import os
+import pathlib
+import pstats
+import re
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+
+PROFILE_HEADER = "x-profile"
+PROFILE_PARAM = "profile"
+PROFILE_DIR = pathlib.Path(os.environ.get("PROFILE_DIR", pathlib.Path(__file__).parent.parent / "profiles"))
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", 20))
+SUMMARY_LINES = 60
+
+_PROFILE_ID = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+_capture_lock = threading.Lock()
+
+
+class Capture:
+    """Profilers collected for one request, one per endpoint invocation."""
+
+    def __init__(self):
+        self.profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def add(self, profiler: cProfile.Profile) -> None:
+        with self._lock:
+            self.profilers.append(profiler)
+
+
+_current_capture: contextvars.ContextVar[Optional[Capture]] = contextvars.ContextVar("profile_capture", default=None)
+
+
+def profiling_requested(request: Request) -> bool:
+    token = os.environ.get("PROFILE_TOKEN")
+    value = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_PARAM)
+    # Compared as bytes: compare_digest rejects non-ASCII str
+    return bool(token and value) and hmac.compare_digest(value.encode(), token.encode())
+
+
+def start_capture() -> Optional[contextvars.Token]:
+    """Open a capture for the current request, or return None if one is already running."""
+    if not _capture_lock.acquire(blocking=False):
+        return None
+    return _current_capture.set(Capture())
+
+
+def finish_capture(token: contextvars.Token) -> Optional[Capture]:
+    """Close the capture opened by ``start_capture`` (in the same context) and return it."""
+    capture = _current_capture.get()
+    _current_capture.reset(token)
+    _capture_lock.release()
+    return capture
+
+
+def save_capture(capture: Optional[Capture]) -> Optional[str]:
+    """Write a closed capture to the profile directory and return its id (None if empty)."""
+    if capture is None or not capture.profilers:
+        return None
+
+    profile_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    stats = pstats.Stats(*capture.profilers)
+    stats.dump_stats(PROFILE_DIR / f"{profile_id}.pstats")
+
+    # Keep the directory bounded: drop the oldest captures
+    captures = sorted(PROFILE_DIR.glob("*.pstats"))
+    for stale in captures[:-PROFILE_MAX_FILES]:
+        stale.unlink(missing_ok=True)
+    return profile_id
+
+
+def profile_path(profile_id: str) -> Optional[pathlib.Path]:
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = PROFILE_DIR / f"{profile_id}.pstats"
+    return path if path.exists() else None
+
+
+def summarize(path: pathlib.Path) -> str:
+    stream = io.StringIO()
+    pstats.Stats(str(path), stream=stream).sort_stats("cumulative").print_stats(SUMMARY_LINES)
+    return stream.getvalue()
+
+
+def _profiled(endpoint: Callable) -> Callable:
+    """Wrap an endpoint so it runs under cProfile when its request is being captured."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            capture = _current_capture.get()
+            if capture is None:
+                return await endpoint(*args, **kwargs)
+            # Other requests interleaving on the event loop are included here
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profiler.disable()
+                capture.add(profiler)
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def sync_wrapper(*args, **kwargs):
+        capture = _current_capture.get()
+        if capture is None:
+            return endpoint(*args, **kwargs)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profiler.disable()
+            capture.add(profiler)
+    return sync_wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose endpoint can be profiled on the thread that runs it."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _profiled(endpoint), **kwargs)
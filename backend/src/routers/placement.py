@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from datetime import datetime
 import logging
 from fastapi.responses import JSONResponse
 
-from ..database import get_db
+from .. import models
+from ..crud import async_container_crud, async_item_crud
+from ..database import get_db, get_write_db, get_async_db
+from ..metrics import STAGE_LATENCY
 from ..models import Container, Item, PlacementHistory
 from ..schemas.placement import (
     ContainerCreate, Container,
@@ -15,12 +20,15 @@ from ..schemas.placement import (
     PlacementResponse
 )
 from ..algorithms.placement_manager import PlacementManager
+from ..algorithms import placement_statistics
+from ..profiling import ProfiledRoute
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
+    route_class=ProfiledRoute,
     prefix="/placement",
     tags=["placement"],
     responses={404: {"description": "Not found"}}
@@ -31,7 +39,7 @@ placement_manager = PlacementManager()
 
 # Container endpoints
 @router.post("/containers/", response_model=Container)
-def create_container(container: ContainerCreate, db: Session = Depends(get_db)):
+def create_container(container: ContainerCreate, db: Session = Depends(get_write_db)):
     db_container = Container(**container.model_dump())
     db.add(db_container)
     db.commit()
@@ -52,7 +60,7 @@ def read_container(container_id: int, db: Session = Depends(get_db)):
 
 # Item endpoints
 @router.post("/items/", response_model=Item)
-def create_item(item: ItemCreate, db: Session = Depends(get_db)):
+def create_item(item: ItemCreate, db: Session = Depends(get_write_db)):
     db_item = Item(**item.model_dump())
     db.add(db_item)
     db.commit()
@@ -73,7 +81,7 @@ def read_item(item_id: int, db: Session = Depends(get_db)):
 
 # Placement endpoints
 @router.post("/place", response_model=PlacementResponse)
-def place_item(item_id: int, container_id: Optional[int] = None, db: Session = Depends(get_db)):
+def place_item(item_id: int, container_id: Optional[int] = None, db: Session = Depends(get_write_db)):
     try:
         logger.info(f"Processing placement request for item_id={item_id}, container_id={container_id}")
         
@@ -92,12 +100,14 @@ def place_item(item_id: int, container_id: Optional[int] = None, db: Session = D
             if not containers:
                 raise HTTPException(status_code=404, detail="No containers available")
                 
-            container = placement_manager.find_optimal_container(item, containers)
+            with STAGE_LATENCY.time(stage="pack"):
+                container = placement_manager.find_optimal_container(item, containers)
             if not container:
                 raise HTTPException(status_code=400, detail="No suitable container found")
         
         # Place the item
-        result = placement_manager.place_item(db, item, container)
+        with STAGE_LATENCY.time(stage="place"):
+            result = placement_manager.place_item(db, item, container)
         
         if result["success"]:
             # Update item status
@@ -123,7 +133,8 @@ def place_item(item_id: int, container_id: Optional[int] = None, db: Session = D
             )
             db.add(history)
             
-            db.commit()
+            with STAGE_LATENCY.time(stage="persist"):
+                db.commit()
             
             return PlacementResponse(
                 success=True,
@@ -142,41 +153,47 @@ def place_item(item_id: int, container_id: Optional[int] = None, db: Session = D
         logger.error(f"Error in place_item: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error placing item: {str(e)}")
 
+def _build_recommendations(unplaced_items, containers) -> List[PlacementRecommendation]:
+    """Score every unplaced item against the available containers (CPU-bound)."""
+    recommendations = []
+    for item in unplaced_items:
+        # Find optimal container for the item
+        optimal_container = placement_manager.find_optimal_container(item, containers)
+        if optimal_container:
+            # Calculate compatibility score
+            score = placement_manager.calculate_compatibility_score(item, optimal_container)
+            
+            recommendations.append(PlacementRecommendation(
+                item_id=item.id,
+                item_name=item.name,
+                container_id=optimal_container.id,
+                container_name=optimal_container.name,
+                reasoning=placement_manager.generate_reasoning(item, optimal_container, score),
+                score=score
+            ))
+    
+    # Sort recommendations by score (highest first)
+    recommendations.sort(key=lambda x: x.score, reverse=True)
+    return recommendations
+
 @router.get("/recommendations", response_model=List[PlacementRecommendation])
-async def get_recommendations(db: Session = Depends(get_db)):
+async def get_recommendations(db: AsyncSession = Depends(get_async_db)):
     """Get placement recommendations for unplaced items."""
     try:
         logger.info("Fetching placement recommendations")
         
         # Get unplaced items
-        unplaced_items = db.query(Item).filter(Item.is_placed == False).all()
+        unplaced_items = await async_item_crud.get_items(db, limit=None, is_placed=False)
         if not unplaced_items:
             return []
             
         # Get available containers
-        containers = db.query(Container).filter(Container.is_full == False).all()
+        containers = await async_container_crud.get_containers(db, limit=None, is_full=False)
         if not containers:
             raise HTTPException(status_code=404, detail="No containers available")
             
-        recommendations = []
-        for item in unplaced_items:
-            # Find optimal container for the item
-            optimal_container = placement_manager.find_optimal_container(item, containers)
-            if optimal_container:
-                # Calculate compatibility score
-                score = placement_manager.calculate_compatibility_score(item, optimal_container)
-                
-                recommendations.append(PlacementRecommendation(
-                    item_id=item.id,
-                    item_name=item.name,
-                    container_id=optimal_container.id,
-                    container_name=optimal_container.name,
-                    reasoning=placement_manager.generate_reasoning(item, optimal_container, score),
-                    score=score
-                ))
-        
-        # Sort recommendations by score (highest first)
-        recommendations.sort(key=lambda x: x.score, reverse=True)
+        # Scoring is pure Python; keep it off the event loop
+        recommendations = await run_in_threadpool(_build_recommendations, unplaced_items, containers)
         
         logger.info(f"Generated {len(recommendations)} placement recommendations")
         return recommendations
@@ -188,60 +205,14 @@ async def get_recommendations(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error generating recommendations: {str(e)}")
 
 @router.get("/statistics", response_model=PlacementStatistics)
-async def get_placement_statistics(db: Session = Depends(get_db)):
+async def get_placement_statistics(db: AsyncSession = Depends(get_async_db)):
     """Get statistics about placement algorithm performance."""
     try:
         logger.info("Fetching placement statistics")
         
-        # Get total items and placed items
-        total_items = db.query(Item).count()
-        placed_items = db.query(Item).filter(Item.is_placed == True).count()
-        
-        # Calculate success rate
-        successful_placements = db.query(PlacementHistory).filter(PlacementHistory.success == True).count()
-        total_placements = db.query(PlacementHistory).count()
-        success_rate = (successful_placements / total_placements * 100) if total_placements > 0 else 0
-        
-        # Calculate space utilization
-        containers = db.query(Container).all()
-        total_volume = sum(c.width * c.height * c.depth for c in containers)
-        used_volume = sum(c.used_volume for c in containers)
-        space_utilization = (used_volume / total_volume * 100) if total_volume > 0 else 0
-        
-        # Calculate priority satisfaction
-        high_priority_items = db.query(Item).filter(Item.priority >= 70).count()
-        placed_high_priority = db.query(Item).filter(Item.priority >= 70, Item.is_placed == True).count()
-        priority_satisfaction = (placed_high_priority / high_priority_items * 100) if high_priority_items > 0 else 0
-        
-        # Calculate zone match rate
-        zone_matches = db.query(Item).filter(
-            Item.is_placed == True,
-            Item.preferred_zone == Container.zone
-        ).join(Container).count()
-        zone_match_rate = (zone_matches / placed_items * 100) if placed_items > 0 else 0
-        
-        # Calculate efficiency
-        efficiency = (success_rate + priority_satisfaction + zone_match_rate) / 3
-        
-        # Get container utilization details
-        container_utilization = []
-        for container in containers:
-            utilization = (container.used_volume / (container.width * container.height * container.depth)) * 100
-            container_utilization.append({
-                "id": container.id,
-                "name": container.name,
-                "utilization_percentage": utilization
-            })
-        
-        return PlacementStatistics(
-            total_items_placed=placed_items,
-            space_utilization=space_utilization,
-            success_rate=success_rate,
-            efficiency=efficiency,
-            priority_satisfaction=priority_satisfaction,
-            zone_match_rate=zone_match_rate,
-            container_utilization=container_utilization
-        )
+        # Totals, rates and per-container utilization in one query
+        summary = await placement_statistics.fetch_placement_summary(db)
+        return PlacementStatistics(**summary)
         
     except Exception as e:
         logger.error(f"Error in get_placement_statistics: {str(e)}", exc_info=True)
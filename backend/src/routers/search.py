@@ -6,11 +6,13 @@ import logging
 from ..database import get_db
 from ..crud import container_crud, item_crud
 from .. import models
+from ..profiling import ProfiledRoute
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
+    route_class=ProfiledRoute,
     tags=["search"],
     responses={404: {"description": "Not found"}}
 )
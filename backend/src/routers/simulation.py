@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_db, get_write_db
 from .. import models
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
@@ -8,13 +8,17 @@ import random
 import logging
 import traceback
 
-from ..crud import container_crud, item_crud
-from ..algorithms import placement_manager
+from ..crud.unit_of_work import UnitOfWork
+from ..algorithms import placement_manager, placement_algorithm
+from ..algorithms.event_simulation import EventSimulator
+from ..algorithms.monte_carlo import generate_random_item, run_monte_carlo
+from ..profiling import ProfiledRoute
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
+    route_class=ProfiledRoute,
     tags=["simulation"],
     responses={404: {"description": "Not found"}}
 )
@@ -24,7 +28,7 @@ def run_simulation(
     days: int = Query(7, description="Number of days to simulate"),
     items_per_day: int = Query(5, description="Average number of items to process per day"),
     random_seed: Optional[int] = Query(None, description="Random seed for reproducibility"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """
     Run a simulation of the space cargo system over a specified period
@@ -33,17 +37,20 @@ def run_simulation(
     - New items arriving
     - Items being placed in containers
     - Items being consumed
+    
+    Changes are buffered in a unit of work and flushed once per simulated day.
     """
     logger.info(f"Starting simulation: {days} days, {items_per_day} items/day, seed: {random_seed}")
     
-    # Set random seed if provided
-    if random_seed is not None:
-        random.seed(random_seed)
+    # Seeded generator so runs are reproducible without touching the global random state
+    rng = random.Random(random_seed)
     
     try:
-        # Get all containers and items
-        containers = container_crud.get_containers(db)
-        items = item_crud.get_items(db, status="available")
+        # Load containers and items once; the unit of work keeps them in sync
+        uow = UnitOfWork(db)
+        containers = uow.load_containers()
+        items = uow.load_items(status="available")
+        placed_items = uow.load_items(status="placed")
         
         if not containers:
             raise HTTPException(status_code=400, detail="No containers available for simulation")
@@ -74,61 +81,66 @@ def run_simulation(
             }
             
             # Generate random number of items for the day
-            day_items_count = max(1, int(random.gauss(items_per_day, items_per_day/3)))
+            day_items_count = max(1, int(rng.gauss(items_per_day, items_per_day/3)))
             
             # Process items
             for _ in range(day_items_count):
                 # Get available items or create new ones if needed
-                if not items or random.random() > 0.7:  # 30% chance to generate new item
-                    new_item_data = generate_random_item()
-                    new_item = item_crud.create_item(db, new_item_data)
-                    items.append(new_item)
+                if not items or rng.random() > 0.7:  # 30% chance to generate new item
+                    items.append(uow.create_item(generate_random_item(rng)))
                 
                 # Select a random item to process
-                item_index = random.randint(0, len(items) - 1)
+                item_index = rng.randint(0, len(items) - 1)
                 item = items[item_index]
                 
                 daily_stats["items_processed"] += 1
                 stats["items_processed"] += 1
                 
-                # Try to place the item
-                try:
-                    # Choose a container or let the algorithm find the best one
-                    use_specific_container = random.random() > 0.5
-                    container_id = None
-                    
-                    if use_specific_container and containers:
-                        container_id = random.choice(containers).id
-                    
-                    # Try to place the item using placement algorithm
-                    placement_result = placement_manager.place_item(db, item.id, container_id)
-                    
-                    if placement_result.get("success", False):
-                        daily_stats["items_placed"] += 1
-                        stats["items_placed"] += 1
-                        # Remove from available items
-                        items.pop(item_index)
-                    else:
-                        daily_stats["items_failed"] += 1
-                        stats["items_failed"] += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error placing item in simulation: {str(e)}")
+                # Choose a container or let the algorithm find the best one
+                if rng.random() > 0.5:
+                    candidates = [rng.choice(containers)]
+                else:
+                    # Preferred zone first, then everything else
+                    candidates = sorted(containers, key=lambda c: c.zone != item.preferred_zone)
+                
+                # Try to place the item using placement algorithm
+                placed = False
+                for container in candidates:
+                    try:
+                        position = placement_algorithm.calculate_position(
+                            item.width or 0, item.depth or 0, item.height or 0,
+                            container.width or 0, container.depth or 0, container.height or 0,
+                            container.items
+                        )
+                    except ValueError:
+                        continue
+                    uow.place_item(item, container, position)
+                    placed = True
+                    break
+                
+                if placed:
+                    daily_stats["items_placed"] += 1
+                    stats["items_placed"] += 1
+                    # Move from available to placed items
+                    items.pop(item_index)
+                    placed_items.append(item)
+                else:
                     daily_stats["items_failed"] += 1
                     stats["items_failed"] += 1
             
             # Randomly consume some items
-            placed_items = item_crud.get_items(db, status="placed")
             if placed_items:
-                consumed_count = random.randint(0, min(3, len(placed_items)))
+                consumed_count = rng.randint(0, min(3, len(placed_items)))
                 for _ in range(consumed_count):
-                    item_to_consume = random.choice(placed_items)
-                    item_crud.mark_item_consumed(db, item_to_consume.id)
-                    placed_items.remove(item_to_consume)
+                    item_to_consume = placed_items.pop(rng.randrange(len(placed_items)))
+                    uow.consume_item(item_to_consume)
                     
                     daily_stats["items_consumed"] += 1
                     stats["items_consumed"] += 1
             
+            # Write the day's creations and status changes in one transaction
+            uow.flush()
+            
             # Add daily stats to overall record
             stats["daily_activity"].append(daily_stats)
         
@@ -138,37 +150,46 @@ def run_simulation(
         
         return stats
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error running simulation: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error running simulation: {str(e)}")
 
-def generate_random_item() -> Dict[str, Any]:
-    """Generate random item data for simulation"""
-    categories = ["Food", "Equipment", "Medical", "Science", "Personal"]
-    zones = ["A", "B", "C", "D", "E"]
+@router.post("/monte-carlo")
+def run_monte_carlo_simulation(
+    trajectories: int = Query(100, description="Number of simulated trajectories"),
+    days: int = Query(7, description="Number of days to simulate per trajectory"),
+    items_per_day: int = Query(5, description="Average number of items to process per day"),
+    random_seed: Optional[int] = Query(None, description="Base random seed; trajectory i uses seed + i"),
+    db: Session = Depends(get_db)
+):
+    """
+    Run many seeded simulations in parallel for capacity planning
     
-    # Random dimensions between 0.1 and 1.0 meters
-    length = round(random.uniform(0.1, 1.0), 2)
-    width = round(random.uniform(0.1, 1.0), 2)
-    height = round(random.uniform(0.1, 1.0), 2)
+    Each trajectory runs against an in-memory copy of the current station
+    state, so the database is only read once and never modified. Items fit a
+    container by remaining volume and weight only, without 3D packing.
+    """
+    if trajectories < 1 or trajectories > 2000:
+        raise HTTPException(status_code=400, detail="Trajectories must be between 1 and 2000")
+    if days < 1 or days > 365:
+        raise HTTPException(status_code=400, detail="Days must be between 1 and 365")
+    if items_per_day < 1:
+        raise HTTPException(status_code=400, detail="Items per day must be at least 1")
     
-    # Random weight between 0.5 and 10 kg
-    weight = round(random.uniform(0.5, 10.0), 2)
+    logger.info(f"Starting Monte Carlo simulation: {trajectories} trajectories, {days} days, seed: {random_seed}")
     
-    return {
-        "name": f"Sim-Item-{random.randint(1000, 9999)}",
-        "length": length,
-        "width": width,
-        "height": height,
-        "weight": weight,
-        "category": random.choice(categories),
-        "priority": random.randint(1, 5),
-        "preferred_zone": random.choice(zones),
-        "status": "available"
-    }
+    try:
+        return run_monte_carlo(db, trajectories, days, items_per_day, random_seed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error running Monte Carlo simulation: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error running Monte Carlo simulation: {str(e)}")
 
 @router.post("/day")
-def simulate_next_day(db: Session = Depends(get_db)) -> Dict[str, Any]:
+def simulate_next_day(db: Session = Depends(get_write_db)) -> Dict[str, Any]:
     """
     Simulate the passage of one day in the space cargo system.
     Updates item statuses, simulates usage, and handles expiry dates.
@@ -201,10 +222,16 @@ def simulate_next_day(db: Session = Depends(get_db)) -> Dict[str, Any]:
 
 
 @router.post("/days")
-def simulate_multiple_days(days: int, db: Session = Depends(get_db)) -> Dict[str, Any]:
+def simulate_multiple_days(
+    days: int,
+    random_seed: Optional[int] = Query(None, description="Random seed for reproducibility"),
+    db: Session = Depends(get_write_db)
+) -> Dict[str, Any]:
     """
     Simulate the passage of multiple days in the space cargo system.
     Updates item statuses, simulates usage, and handles expiry dates.
+    
+    All days are processed in a single event-driven pass and persisted in one transaction.
     """
     if days < 1 or days > 90:
         raise HTTPException(status_code=400, detail="Days must be between 1 and 90")
@@ -216,36 +243,25 @@ def simulate_multiple_days(days: int, db: Session = Depends(get_db)) -> Dict[str
         # Set end date after simulating multiple days
         end_date = current_date + timedelta(days=days)
         
-        # Collect aggregated results
-        total_consumed = 0
-        total_expired = 0
-        all_alerts = []
+        simulator = EventSimulator(db, seed=random_seed)
+        results = simulator.run(current_date, days)
+        simulator.persist()
         
-        # Process each day in the simulation
-        temp_date = current_date
-        for _ in range(days):
-            next_date = temp_date + timedelta(days=1)
-            daily_results = process_day_simulation(db, temp_date, next_date)
-            
-            total_consumed += daily_results["items_consumed"]
-            total_expired += daily_results["new_expired_items"]
-            all_alerts.extend(daily_results["alerts"])
-            
-            temp_date = next_date
-        
-        # Update the simulation date in the database
+        # Update the simulation date; commits the status changes too and raises if that fails
         update_simulation_date(db, end_date)
         
+        all_alerts = results["alerts"]
         return {
             "success": True,
             "daysSimulated": days,
             "startDate": current_date.isoformat(),
             "currentDate": end_date.isoformat(),
-            "itemsConsumed": total_consumed,
-            "newExpiredItems": total_expired,
+            "itemsConsumed": results["items_consumed"],
+            "newExpiredItems": results["new_expired_items"],
             "alerts": all_alerts[-10:] if len(all_alerts) > 10 else all_alerts
         }
     except Exception as e:
+        db.rollback()
         logging.error(f"Error simulating multiple days: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error simulating multiple days: {str(e)}")
 
@@ -272,7 +288,13 @@ def get_simulation_date(db: Session) -> datetime:
 
 
 def update_simulation_date(db: Session, new_date: datetime) -> None:
-    """Update the simulation date in the database"""
+    """
+    Update the simulation date in the database.
+
+    Commits the pending simulation changes together with the date. On error
+    the transaction is rolled back and the error re-raised, so the endpoint
+    reports the failure instead of success with nothing saved.
+    """
     try:
         sim_config = db.query(models.SystemConfig).filter(models.SystemConfig.key == "simulation_date").first()
         
@@ -287,6 +309,7 @@ def update_simulation_date(db: Session, new_date: datetime) -> None:
         logger.error(f"Error updating simulation date: {str(e)}")
         logger.error(traceback.format_exc())
         db.rollback()
+        raise
 
 
 def process_day_simulation(db: Session, current_date: datetime, next_date: datetime) -> Dict[str, Any]:
@@ -299,74 +322,15 @@ def process_day_simulation(db: Session, current_date: datetime, next_date: datet
     
     Returns stats about the simulation day.
     """
-    items_consumed = 0
-    new_expired_items = 0
-    alerts = []
-    
-    # Get all items
-    items = db.query(models.Item).all()
-    
-    # Consume items based on priority (higher priority = more likely to be consumed)
-    for item in items:
-        # Skip already consumed items
-        if item.status == "CONSUMED":
-            continue
-            
-        # Check for expiry
-        if item.expiry_date and datetime.fromisoformat(str(item.expiry_date)) <= next_date:
-            if item.status != "EXPIRED":
-                item.status = "EXPIRED"
-                new_expired_items += 1
-                
-                # Generate alert for expired items
-                alerts.append({
-                    "severity": "warning",
-                    "message": f"Item '{item.name}' has expired on {item.expiry_date}"
-                })
-        
-        # Simulate consumption based on priority
-        # Higher priority = less likely to be consumed
-        consumption_chance = 0.05 - (item.priority * 0.01)  # Base 5% chance, reduced by priority
-        
-        if item.status == "AVAILABLE" and random.random() < consumption_chance:
-            item.status = "CONSUMED"
-            item.consumed_date = next_date.isoformat()
-            items_consumed += 1
-    
-    # Generate alerts for low stock
-    item_categories = {}
-    for item in items:
-        if item.category not in item_categories:
-            item_categories[item.category] = {
-                "total": 0,
-                "available": 0
-            }
-        
-        item_categories[item.category]["total"] += 1
-        if item.status == "AVAILABLE":
-            item_categories[item.category]["available"] += 1
-    
-    # Check if any category is running low
-    for category, counts in item_categories.items():
-        if counts["total"] > 0:
-            available_percentage = counts["available"] / counts["total"] * 100
-            
-            if available_percentage <= 10:
-                alerts.append({
-                    "severity": "critical",
-                    "message": f"Critical shortage of {category}: only {counts['available']} items left ({available_percentage:.1f}%)"
-                })
-            elif available_percentage <= 25:
-                alerts.append({
-                    "severity": "warning", 
-                    "message": f"Low stock of {category}: only {counts['available']} items left ({available_percentage:.1f}%)"
-                })
+    simulator = EventSimulator(db)
+    results = simulator.run(current_date, max(1, (next_date - current_date).days))
+    simulator.persist()
     
     # Commit all changes
     db.commit()
     
     return {
-        "items_consumed": items_consumed,
-        "new_expired_items": new_expired_items,
-        "alerts": alerts
-    } 
\ No newline at end of file
+        "items_consumed": results["items_consumed"],
+        "new_expired_items": results["new_expired_items"],
+        "alerts": results["alerts"]
+    }
@@ -1,22 +1,29 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from .. import models
-from ..database import get_db
+from ..database import get_db, get_write_db, WriteSessionLocal
 import csv
-import io
 import os
 import pathlib
-import shutil
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 import hashlib
+import itertools
+import json
 import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from ..crud import container_crud, item_crud
+from ..crud import csv_import
+from ..metrics import STAGE_LATENCY, record_cache
+from ..profiling import ProfiledRoute
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
+    route_class=ProfiledRoute,
     tags=["upload"],
     responses={404: {"description": "Not found"}}
 )
@@ -24,26 +31,32 @@ router = APIRouter(
 # Path to data directory relative to the project root
 DATA_DIR = pathlib.Path(__file__).parent.parent.parent.parent / "data"
 
-def parse_csv(file: UploadFile) -> List[Dict[str, Any]]:
-    """Parse CSV file into a list of dictionaries."""
-    content = file.file.read().decode('utf-8')
-    csv_reader = csv.DictReader(io.StringIO(content))
-    
-    records = []
-    for row in csv_reader:
-        # Convert empty strings to None
-        cleaned_row = {k: (v if v else None) for k, v in row.items()}
-        records.append(cleaned_row)
-    
-    # Reset file cursor for potential reuse
-    file.file.seek(0)
-    return records
+# Uploads stream here first so the data folder's mtime only changes when a file is stored
+INCOMING_DIR = DATA_DIR / ".incoming"
+# Manifest of stored uploads: file name -> content hash, size and mtime. It
+# lives below the data folder, not in it, so rewriting it leaves the folder's
+# mtime (the manifest's freshness check) alone.
+MANIFEST_PATH = INCOMING_DIR / "upload_manifest.json"
+HASH_CHUNK_SIZE = 64 * 1024
+# Rows added to the session between flushes when processing an upload
+RECORD_BATCH_SIZE = 1000
+_manifest: Optional[Dict[str, Any]] = None
+_manifest_lock = threading.Lock()
+
+# SystemConfig key holding the data folder version loaded by warm_load_data_folder
+DATA_VERSION_KEY = "data_folder_version"
+_warm_loaded = False
+_warm_load_lock = threading.Lock()
 
 def parse_csv_file(file_path: pathlib.Path) -> List[Dict[str, Any]]:
     """Parse a CSV file from disk into a list of dictionaries."""
-    with open(file_path, 'r', newline='') as file:
-        csv_reader = csv.DictReader(file)
-        return [{k: (v if v else None) for k, v in row.items()} for row in csv_reader]
+    return list(iter_csv_file(file_path))
+
+def iter_csv_file(file_path: pathlib.Path) -> Iterator[Dict[str, Any]]:
+    """Yield the rows of a CSV file one at a time, with empty strings converted to None."""
+    with open(file_path, 'r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            yield {k: (v if v else None) for k, v in row.items()}
 
 def detect_csv_type(headers: List[str]) -> str:
     """Detect if the CSV is for containers or items."""
@@ -61,208 +74,410 @@ def calculate_file_hash(file_path: pathlib.Path) -> str:
     """Calculate MD5 hash of a file to check for duplicates."""
     with open(file_path, "rb") as f:
         file_hash = hashlib.md5()
-        while chunk := f.read(8192):
+        while chunk := f.read(HASH_CHUNK_SIZE):
             file_hash.update(chunk)
     return file_hash.hexdigest()
 
-def is_duplicate_file(file: UploadFile) -> bool:
-    """Check if the uploaded file already exists in the data folder."""
+def _file_signature(file_path: pathlib.Path) -> Dict[str, Any]:
+    """Size and modification time used to decide whether a manifest entry is still valid."""
+    stat = file_path.stat()
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+def _load_manifest() -> Dict[str, Any]:
+    """Return the in-memory manifest, reading it from disk on first use."""
+    global _manifest
+    if _manifest is None:
+        try:
+            with MANIFEST_PATH.open("r") as f:
+                _manifest = json.load(f)
+            _manifest.setdefault("files", {})
+        except (OSError, ValueError):
+            _manifest = {"files": {}, "dir_mtime": None}
+    return _manifest
+
+def _save_manifest(manifest: Dict[str, Any]) -> None:
+    """Record the directory mtime and write the manifest atomically."""
+    INCOMING_DIR.mkdir(parents=True, exist_ok=True)
+    manifest["dir_mtime"] = DATA_DIR.stat().st_mtime_ns
+    tmp_path = MANIFEST_PATH.with_suffix(".tmp")
+    with tmp_path.open("w") as f:
+        json.dump({"files": manifest["files"], "dir_mtime": manifest["dir_mtime"]}, f)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+def _reconcile_manifest(manifest: Dict[str, Any]) -> None:
+    """
+    Bring the manifest in line with the data folder.
+
+    Only runs when the folder's mtime changed behind our back (files copied in
+    or deleted by hand). Known files are re-hashed only if their size or
+    mtime changed.
+    """
+    unchanged = manifest.get("dir_mtime") == DATA_DIR.stat().st_mtime_ns
+    record_cache("upload_manifest", unchanged)
+    if unchanged:
+        return
+    files = manifest["files"]
+    on_disk = {path.name: path for path in DATA_DIR.glob("*.csv")}
+    for name in set(files) - set(on_disk):
+        del files[name]
+    for name, path in on_disk.items():
+        signature = _file_signature(path)
+        entry = files.get(name)
+        if entry is None or entry["size"] != signature["size"] or entry["mtime"] != signature["mtime"]:
+            files[name] = {"hash": calculate_file_hash(path), **signature}
+    manifest["by_hash"] = None
+    _save_manifest(manifest)
+
+def _hash_index(manifest: Dict[str, Any]) -> Dict[str, str]:
+    """Map content hash -> stored file name, built once per manifest change."""
+    if not manifest.get("by_hash"):
+        manifest["by_hash"] = {entry["hash"]: name for name, entry in manifest["files"].items()}
+    return manifest["by_hash"]
+
+def find_duplicate(file_hash: str) -> Optional[pathlib.Path]:
+    """
+    Look up a content hash in the upload manifest.
+
+    The matching entry is validated by size and mtime before it is trusted;
+    a stale entry is re-hashed from disk.
+    """
+    manifest = _load_manifest()
+    _reconcile_manifest(manifest)
+    name = _hash_index(manifest).get(file_hash)
+    if name is None:
+        return None
+
+    path = DATA_DIR / name
+    entry = manifest["files"][name]
     try:
-        # Ensure data directory exists
-        DATA_DIR.mkdir(exist_ok=True)
-        
-        # Get the original file content for hashing
-        content = file.file.read()
-        file_hash = hashlib.md5(content).hexdigest()
-        file.file.seek(0)  # Reset cursor for reuse
-        
-        # Check against all existing files
-        for existing_file in DATA_DIR.glob("*.csv"):
-            if calculate_file_hash(existing_file) == file_hash:
-                return True
-        
-        return False
-    except Exception as e:
-        print(f"Error checking for duplicate file: {e}")
-        return False
+        signature = _file_signature(path)
+    except OSError:
+        signature = None
+    if signature is None or entry["size"] != signature["size"] or entry["mtime"] != signature["mtime"]:
+        if signature is None:
+            del manifest["files"][name]
+        else:
+            manifest["files"][name] = {"hash": calculate_file_hash(path), **signature}
+        manifest["by_hash"] = None
+        _save_manifest(manifest)
+        return path if signature is not None and manifest["files"][name]["hash"] == file_hash else None
+    return path
+
+def _unique_destination(filename: str) -> pathlib.Path:
+    """Pick a destination in the data folder that does not overwrite an existing file."""
+    destination = DATA_DIR / filename
+    counter = 1
+    while destination.exists():
+        name_parts = filename.rsplit('.', 1)
+        new_name = f"{name_parts[0]}_{counter}.{name_parts[1]}" if len(name_parts) > 1 else f"{filename}_{counter}"
+        destination = DATA_DIR / new_name
+        counter += 1
+    return destination
+
+def spool_upload(file: UploadFile) -> Tuple[pathlib.Path, str, List[str]]:
+    """
+    Stream an upload to a temporary file in one pass.
+
+    The content hash is computed and the CSV header is sniffed from the same
+    chunks that are written, so the upload is read exactly once.
 
-def save_csv_to_data_folder(file: UploadFile) -> pathlib.Path:
-    """Save uploaded CSV file to the data folder."""
+    Returns:
+        Tuple of (temporary file path, MD5 hex digest, header columns)
+    """
+    INCOMING_DIR.mkdir(parents=True, exist_ok=True)
+
+    file_hash = hashlib.md5()
+    head = b""
+    headers = None
+    with tempfile.NamedTemporaryFile("wb", dir=INCOMING_DIR, suffix=".part", delete=False) as buffer:
+        tmp_path = pathlib.Path(buffer.name)
+        try:
+            while chunk := file.file.read(HASH_CHUNK_SIZE):
+                file_hash.update(chunk)
+                buffer.write(chunk)
+                if headers is None:
+                    head += chunk
+                    if b"\n" in head:
+                        headers = _parse_header(head.split(b"\n", 1)[0])
+        except Exception:
+            buffer.close()
+            tmp_path.unlink()
+            raise
+
+    if headers is None:
+        headers = _parse_header(head)
+    return tmp_path, file_hash.hexdigest(), headers
+
+def _parse_header(line: bytes) -> List[str]:
+    """Split the first CSV line into column names."""
+    text = line.decode("utf-8").strip("\r\n")
+    return next(csv.reader([text]), [])
+
+def store_spooled_upload(tmp_path: pathlib.Path, digest: str, filename: str) -> Tuple[pathlib.Path, bool]:
+    """
+    Move a spooled upload into the data folder unless its content is already stored.
+
+    Returns:
+        Tuple of (path of the stored file, whether it was a duplicate)
+    """
+    with _manifest_lock:
+        existing = find_duplicate(digest)
+        if existing is not None:
+            tmp_path.unlink()
+            return existing, True
+
+        destination = _unique_destination(filename)
+        os.replace(tmp_path, destination)
+        manifest = _load_manifest()
+        manifest["files"][destination.name] = {"hash": digest, **_file_signature(destination)}
+        _hash_index(manifest)[digest] = destination.name
+        _save_manifest(manifest)
+    return destination, False
+
+def discard_stored_upload(path: pathlib.Path) -> None:
+    """Remove a stored upload and its manifest entry, e.g. when importing it failed."""
+    with _manifest_lock:
+        path.unlink(missing_ok=True)
+        manifest = _load_manifest()
+        if manifest["files"].pop(path.name, None) is not None:
+            manifest["by_hash"] = None
+        _save_manifest(manifest)
+
+def save_csv_to_data_folder(file: UploadFile) -> Tuple[pathlib.Path, bool]:
+    """
+    Save uploaded CSV file to the data folder unless its content is already stored.
+
+    The upload is hashed while it streams to a temporary file, so the content
+    is read once. The hash is then looked up in the manifest; a duplicate is
+    discarded, a new file is renamed into place and recorded.
+
+    Returns:
+        Tuple of (path of the stored file, whether it was a duplicate)
+    """
+    tmp_path = None
     try:
-        # Ensure data directory exists
-        DATA_DIR.mkdir(exist_ok=True)
-        
-        # Create a unique filename based on current timestamp and original name
-        destination = DATA_DIR / file.filename
-        
-        # Use a counter for cases where the file might exist
-        counter = 1
-        while destination.exists():
-            name_parts = file.filename.rsplit('.', 1)
-            new_name = f"{name_parts[0]}_{counter}.{name_parts[1]}" if len(name_parts) > 1 else f"{file.filename}_{counter}"
-            destination = DATA_DIR / new_name
-            counter += 1
-        
-        # Save the file
-        with destination.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        file.file.seek(0)  # Reset cursor for reuse
-        return destination
+        tmp_path, digest, _ = spool_upload(file)
+        return store_spooled_upload(tmp_path, digest, file.filename)
     except Exception as e:
+        if tmp_path is not None and tmp_path.exists():
+            tmp_path.unlink()
         print(f"Error saving file to data folder: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Error saving file: {str(e)}"
         )
 
-def load_data_from_folder(db: Session):
-    """Load data from the data folder if database is empty."""
-    # Check if we have any data in the database
-    container_count = db.query(models.Container).count()
-    item_count = db.query(models.Item).count()
-    
-    if container_count == 0 and item_count == 0:
-        try:
-            # Create data directory if it doesn't exist
-            DATA_DIR.mkdir(exist_ok=True)
-            
-            # Process all CSV files in the data directory
-            for file_path in DATA_DIR.glob("*.csv"):
+def data_folder_version() -> str:
+    """Fingerprint of the CSV files in the data folder (names, sizes and mtimes)."""
+    fingerprint = hashlib.md5()
+    for file_path in sorted(DATA_DIR.glob("*.csv")):
+        stat = file_path.stat()
+        fingerprint.update(f"{file_path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return fingerprint.hexdigest()
+
+def _read_csv_for_load(file_path: pathlib.Path) -> Tuple[str, List[Dict[str, Any]]]:
+    """Parse one CSV file and detect its type; runs in a worker thread."""
+    records = parse_csv_file(file_path)
+    csv_type = detect_csv_type(list(records[0].keys())) if records else "unknown"
+    return csv_type, records
+
+def load_data_from_folder(db: Session) -> Dict[str, Any]:
+    """
+    Load data from the data folder if database is empty.
+
+    CSV files are parsed in parallel worker threads and bulk-inserted,
+    containers before items, in one transaction: if any file fails to parse
+    or insert, nothing is committed, so a later load starts again from an
+    empty database.
+
+    Returns:
+        Number of records loaded per CSV type, plus the names of the files
+        that failed under "failed"
+    """
+    loaded = {"container": 0, "item": 0, "failed": []}
+    if db.query(models.Container.id).first() is not None or db.query(models.Item.id).first() is not None:
+        return loaded
+
+    try:
+        # Create data directory if it doesn't exist
+        DATA_DIR.mkdir(exist_ok=True)
+        file_paths = sorted(DATA_DIR.glob("*.csv"))
+        if not file_paths:
+            return loaded
+
+        parsed = {}
+        with STAGE_LATENCY.time(stage="load"), \
+                ThreadPoolExecutor(max_workers=min(len(file_paths), os.cpu_count() or 1)) as executor:
+            futures = {executor.submit(_read_csv_for_load, file_path): file_path for file_path in file_paths}
+            for future in as_completed(futures):
                 try:
-                    records = parse_csv_file(file_path)
-                    if records:
-                        csv_type = detect_csv_type(records[0].keys())
-                        process_records(records, csv_type, db)
+                    parsed[futures[future]] = future.result()
                 except Exception as e:
-                    print(f"Error processing file {file_path}: {e}")
-                    
+                    loaded["failed"].append(futures[future].name)
+                    print(f"Error processing file {futures[future]}: {e}")
+        if loaded["failed"]:
+            return loaded
+
+        with STAGE_LATENCY.time(stage="persist"):
+            for csv_type in ("container", "item"):
+                for file_path in file_paths:
+                    if parsed[file_path][0] != csv_type:
+                        continue
+                    try:
+                        loaded[csv_type] += process_records(parsed[file_path][1], csv_type, db, commit=False)
+                    except Exception as e:
+                        loaded["failed"].append(file_path.name)
+                        print(f"Error processing file {file_path}: {e}")
+                        return loaded
+            db.commit()
+
+    except Exception as e:
+        db.rollback()
+        loaded["failed"].append(DATA_DIR.name)
+        print(f"Error loading data from folder: {e}")
+    return loaded
+
+def warm_load_data_folder(session_factory=WriteSessionLocal) -> None:
+    """
+    Load the data folder into the database once per process.
+
+    Meant to run at application startup. A persisted ``data_folder_version``
+    marker in system_config records which state of the data folder has been
+    loaded, so restarts with an unchanged folder skip even the emptiness
+    check. The marker is not written when a file failed to load, so the next
+    start tries again. The request path never touches the filesystem.
+    """
+    global _warm_loaded
+    with _warm_load_lock:
+        if _warm_loaded:
+            return
+
+        db = session_factory()
+        try:
+            DATA_DIR.mkdir(exist_ok=True)
+            version = data_folder_version()
+            marker = db.query(models.SystemConfig).filter(models.SystemConfig.key == DATA_VERSION_KEY).first()
+            record_cache("data_folder_version", marker is not None and marker.value == version)
+            if marker is None or marker.value != version:
+                loaded = load_data_from_folder(db)
+                if loaded["failed"]:
+                    logger.error(f"Warm load from {DATA_DIR} failed for {', '.join(loaded['failed'])}; "
+                                 f"nothing was loaded")
+                else:
+                    logger.info(f"Warm load from {DATA_DIR}: {loaded['container']} containers, {loaded['item']} items")
+                    if marker is None:
+                        marker = models.SystemConfig(key=DATA_VERSION_KEY)
+                        db.add(marker)
+                    marker.value = version
+                    db.commit()
+            _warm_loaded = True
         except Exception as e:
-            print(f"Error loading data from folder: {e}")
+            db.rollback()
+            logger.error(f"Error warm loading data folder: {str(e)}")
+        finally:
+            db.close()
+
+def _container_row(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a container CSV record onto Container columns."""
+    return {
+        "name": data.get("container_id") or "Container",
+        "width": float(data["width_cm"]),
+        "height": float(data["height_cm"]),
+        "depth": float(data["depth_cm"]),
+        "max_weight": 1000.0,  # Default value
+        "zone": data.get("zone"),
+        "used_volume": 0.0,
+        "used_weight": 0.0,
+        "is_full": False
+    }
+
+def _item_row(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an item CSV record onto Item columns."""
+    return {
+        "name": data["name"],
+        "width": float(data["width_cm"]),
+        "height": float(data["height_cm"]),
+        "depth": float(data["depth_cm"]),
+        "weight": float(data["mass_kg"]),
+        "priority": int(data["priority"]) if data.get("priority") else 1,
+        "preferred_zone": data.get("preferred_zone"),
+        "is_placed": False
+    }
 
-def process_records(records: List[Dict[str, Any]], csv_type: str, db: Session):
-    """Process records based on CSV type."""
+def process_records(records: Iterable[Dict[str, Any]], csv_type: str, db: Session,
+                    commit: bool = True) -> int:
+    """
+    Process records based on CSV type.
+
+    Records may be any iterable, including a generator over a file; they are
+    inserted in batches of RECORD_BATCH_SIZE and committed once, or left to
+    the caller to commit when ``commit`` is False. On error the session's
+    transaction is rolled back.
+
+    Returns:
+        Number of records inserted
+    """
     if csv_type == "container":
-        for data in records:
-            container = models.Container(
-                name=data.get("container_id", "Container"),
-                width=int(data["width_cm"]),
-                height=int(data["height_cm"]),
-                depth=int(data["depth_cm"]),
-                max_weight=1000.0,  # Default value
-                current_weight=0.0,
-                is_active=True
-            )
-            db.add(container)
-            
+        model, to_row = models.Container, _container_row
     elif csv_type == "item":
-        for data in records:
-            # Calculate volume in cubic meters
-            width_cm = float(data["width_cm"])
-            height_cm = float(data["height_cm"])
-            depth_cm = float(data["depth_cm"])
-            volume = width_cm * height_cm * depth_cm / 1000000  # Convert from cm³ to m³
-            
-            item = models.Item(
-                name=data["name"],
-                description=data.get("item_id", ""),
-                weight=float(data["mass_kg"]),
-                volume=volume,
-                priority=int(data["priority"]) if data["priority"] else 1,
-                is_fragile=False  # Default value
-            )
-            db.add(item)
-    
-    db.commit()
+        model, to_row = models.Item, _item_row
+    else:
+        return 0
+
+    count = 0
+    rows = (to_row(data) for data in records)
+    try:
+        while batch := list(itertools.islice(rows, RECORD_BATCH_SIZE)):
+            db.execute(insert(model), batch)
+            count += len(batch)
+        if commit:
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return count
 
 @router.post("/containers")
-async def upload_containers(
+def upload_containers(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """
     Upload containers from a CSV file
     
     Expected columns: name, length, width, height, max_weight, zone, priority
+    
+    Rows are parsed and inserted in chunks inside one transaction; rows that
+    fail validation are reported individually and skipped.
     """
     logger.info(f"Uploading containers from file: {file.filename}")
     
     try:
-        contents = await file.read()
-        contents_str = contents.decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(contents_str))
-        
-        containers_created = 0
-        
-        for row in csv_reader:
-            try:
-                container_data = {
-                    "name": row.get("name", ""),
-                    "length": float(row.get("length", 0)),
-                    "width": float(row.get("width", 0)),
-                    "height": float(row.get("height", 0)),
-                    "max_weight": float(row.get("max_weight", 0)),
-                    "zone": row.get("zone", ""),
-                    "priority": int(row.get("priority", 0)),
-                    "used_volume": 0  # Initialize with zero used volume
-                }
-                
-                # Create container
-                container_crud.create_container(db, container_data)
-                containers_created += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing container row: {str(e)}")
-                continue
-        
-        return {"message": f"Successfully imported {containers_created} containers"}
+        result = csv_import.import_csv(db, file.file, csv_import.CONTAINER_UPLOAD_SPEC)
+        return {"message": f"Successfully imported {result['imported']} containers", **result}
         
     except Exception as e:
         logger.error(f"Error uploading containers: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error uploading containers: {str(e)}")
 
 @router.post("/items")
-async def upload_items(
+def upload_items(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """
     Upload items from a CSV file
     
     Expected columns: name, length, width, height, weight, category, priority, zone
+    
+    Rows are parsed and inserted in chunks inside one transaction; rows that
+    fail validation are reported individually and skipped.
     """
     logger.info(f"Uploading items from file: {file.filename}")
     
     try:
-        contents = await file.read()
-        contents_str = contents.decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(contents_str))
-        
-        items_created = 0
-        
-        for row in csv_reader:
-            try:
-                item_data = {
-                    "name": row.get("name", ""),
-                    "length": float(row.get("length", 0)),
-                    "width": float(row.get("width", 0)),
-                    "height": float(row.get("height", 0)),
-                    "weight": float(row.get("weight", 0)),
-                    "category": row.get("category", ""),
-                    "priority": int(row.get("priority", 0)),
-                    "preferred_zone": row.get("zone", ""),
-                    "status": "available"  # Initialize as available
-                }
-                
-                # Create item
-                item_crud.create_item(db, item_data)
-                items_created += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing item row: {str(e)}")
-                continue
-        
-        return {"message": f"Successfully imported {items_created} items"}
+        result = csv_import.import_csv(db, file.file, csv_import.ITEM_UPLOAD_SPEC)
+        return {"message": f"Successfully imported {result['imported']} items", **result}
         
     except Exception as e:
         logger.error(f"Error uploading items: {str(e)}")
@@ -270,7 +485,7 @@ async def upload_items(
 
 @router.post("/reset")
 def reset_data(
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """
     Reset all data in the database - remove items and containers
@@ -284,6 +499,9 @@ def reset_data(
         # Delete all containers
         db.query(models.Container).delete()
         
+        # Let the next startup load the data folder again
+        db.query(models.SystemConfig).filter(models.SystemConfig.key == DATA_VERSION_KEY).delete()
+        
         # Commit changes
         db.commit()
         
@@ -295,78 +513,100 @@ def reset_data(
         raise HTTPException(status_code=500, detail=f"Error resetting data: {str(e)}")
 
 @router.post("/csv", status_code=status.HTTP_201_CREATED)
-async def upload_csv(
+def upload_csv(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
-    """Upload and process a CSV file."""
+    """
+    Upload and process a CSV file.
+
+    The upload is streamed once: it is written to a temporary file while being
+    hashed and having its header sniffed. Rows are then read back from the
+    stored file in batches, so memory stays bounded for large files.
+    """
     if not file.filename.endswith('.csv'):
         raise HTTPException(
             status_code=400,
             detail="Only CSV files are allowed."
         )
     
+    tmp_path = None
     try:
-        records = parse_csv(file)
-        if not records:
+        tmp_path, digest, headers = spool_upload(file)
+        if not headers:
             raise HTTPException(
                 status_code=400,
                 detail="The CSV file is empty."
             )
         
         # Detect CSV type
-        csv_type = detect_csv_type(records[0].keys())
+        csv_type = detect_csv_type(headers)
         if csv_type == "unknown":
             raise HTTPException(
                 status_code=400,
                 detail="Invalid CSV format. Please check the required headers for items or containers."
             )
         
-        # Check for duplicates
-        if is_duplicate_file(file):
+        # A header-only file is rejected before it is stored
+        preview = list(itertools.islice(iter_csv_file(tmp_path), 5))
+        if not preview:
+            raise HTTPException(
+                status_code=400,
+                detail="The CSV file is empty."
+            )
+        
+        # Store the file in the data folder; duplicates are not stored again
+        saved_path, duplicate = store_spooled_upload(tmp_path, digest, file.filename)
+        tmp_path = None
+        
+        if duplicate:
             return {
                 "message": "This file already exists in the database",
-                "items": [{"name": record.get("name", record.get("container_id", "Unknown"))} for record in records[:5]],
+                "items": [{"name": record.get("name", record.get("container_id", "Unknown"))} for record in preview],
                 "duplicate": True
             }
         
-        # Save file to data folder
-        saved_path = save_csv_to_data_folder(file)
-        
-        # Process the records
-        process_records(records, csv_type, db)
+        # Process the records; a file that fails to import is not kept, so a
+        # later upload of the same content is imported rather than reported
+        # as a duplicate
+        try:
+            record_count = process_records(iter_csv_file(saved_path), csv_type, db)
+        except Exception:
+            discard_stored_upload(saved_path)
+            raise
         
         if csv_type == "container":
             return {
-                "message": f"Successfully imported {len(records)} containers",
-                "items": [{"name": data.get("container_id", f"Container {i+1}")} for i, data in enumerate(records[:5])],
+                "message": f"Successfully imported {record_count} containers",
+                "items": [{"name": data.get("container_id", f"Container {i+1}")} for i, data in enumerate(preview)],
                 "file_path": str(saved_path)
             }
         else:
             return {
-                "message": f"Successfully imported {len(records)} items",
-                "items": [{"name": data.get("name", f"Item {i+1}")} for i, data in enumerate(records[:5])],
+                "message": f"Successfully imported {record_count} items",
+                "items": [{"name": data.get("name", f"Item {i+1}")} for i, data in enumerate(preview)],
                 "file_path": str(saved_path)
             }
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error processing the CSV file: {str(e)}"
         )
+    finally:
+        if tmp_path is not None and tmp_path.exists():
+            tmp_path.unlink()
 
 @router.get("/containers")
 def get_containers(db: Session = Depends(get_db)):
     """Get all containers."""
-    # Ensure data is loaded from data folder if DB is empty
-    load_data_from_folder(db)
     containers = db.query(models.Container).all()
     return containers
 
 @router.get("/items")
 def get_items(db: Session = Depends(get_db)):
     """Get all items."""
-    # Ensure data is loaded from data folder if DB is empty
-    load_data_from_folder(db)
     items = db.query(models.Item).all()
     return items 
\ No newline at end of file
@@ -0,0 +1,82 @@
+import io
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src import models
+from src.crud import csv_import
+from src.database import Base
+
+
+class ImportCsvTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+
+    def run_import(self, text: str, spec=csv_import.CONTAINER_UPLOAD_SPEC, chunk_size: int = 2):
+        return csv_import.import_csv(self.db, io.BytesIO(text.encode()), spec, chunk_size=chunk_size)
+
+    def names(self, model=models.Container):
+        return [name for (name,) in self.db.query(model.name).order_by(model.id)]
+
+    def test_chunks_are_imported_in_order(self):
+        rows = "".join(f"C{i},{i},1,1,10,Lab\n" for i in range(1, 6))
+        result = self.run_import("name,width,height,length,max_weight,zone\n" + rows)
+        self.assertEqual((result["imported"], result["failed"]), (5, 0))
+        self.assertEqual(self.names(), ["C1", "C2", "C3", "C4", "C5"])
+        container = self.db.query(models.Container).filter_by(name="C4").one()
+        self.assertEqual((container.width, container.depth, container.is_full), (4.0, 1.0, False))
+
+    def test_bad_rows_are_reported_across_chunks(self):
+        result = self.run_import(
+            "name,width,height,length,max_weight,zone\n"
+            "C1,1,1,1,10,Lab\n"
+            "C2,wide,1,high,10,Lab\n"
+            "C1,1,1,1,10,Lab\n"
+            "C4,1,1,1,10,Lab,extra\n"
+            "C5,1\n"
+            "C6,1,1,1,10,Lab\n"
+        )
+        self.assertEqual((result["imported"], result["failed"]), (2, 4))
+        self.assertEqual(result["errors"], [
+            {"row": 2, "errors": ["width: expected float", "length: expected float"]},
+            {"row": 3, "errors": ["name: duplicate value"]},
+            {"row": 4, "errors": ["expected 6 fields like the header"]},
+            {"row": 5, "errors": ["expected 6 fields like the header"]},
+        ])
+        self.assertEqual(self.names(), ["C1", "C6"])
+
+    def test_extra_field_in_first_row_is_not_shifted(self):
+        result = self.run_import("name,width\nA,1,2,3\nB,2\n", spec=csv_import.ITEM_UPLOAD_SPEC)
+        self.assertEqual((result["imported"], result["failed"]), (1, 1))
+        self.assertEqual(result["errors"][0]["row"], 1)
+        self.assertEqual(self.names(models.Item), ["B"])
+
+    def test_empty_file_imports_nothing(self):
+        self.assertEqual(self.run_import(""), {"imported": 0, "failed": 0, "errors": []})
+
+    def test_failure_rolls_back_every_chunk(self):
+        execute = self.db.execute
+        calls = []
+
+        def fail_on_second_chunk(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError("disk full")
+            return execute(*args, **kwargs)
+
+        rows = "".join(f"C{i},1,1,1,10,Lab\n" for i in range(1, 5))
+        with mock.patch.object(self.db, "execute", side_effect=fail_on_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.run_import("name,width,height,length,max_weight,zone\n" + rows)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.names(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
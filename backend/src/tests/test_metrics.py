@@ -0,0 +1,41 @@
+import unittest
+
+from src import metrics
+
+
+class MetricsTests(unittest.TestCase):
+    def test_counter_gauge_and_histogram(self):
+        counter = metrics.Counter("test_total", "Test counter.", ("cache", "result"))
+        counter.inc(cache="a", result="hit")
+        counter.inc(2, cache="a", result="hit")
+        self.assertEqual(counter.value(cache="a", result="hit"), 3)
+        self.assertEqual(counter.value(cache="a", result="miss"), 0)
+        self.assertEqual(counter.snapshot(), {("a", "hit"): 3})
+
+        gauge = metrics.Gauge("test_gauge", "Test gauge.")
+        gauge.set(5)
+        gauge.dec()
+        self.assertIn("test_gauge 4", gauge.render())
+
+        histogram = metrics.Histogram("test_seconds", "Test histogram.", ("stage",), buckets=(0.1, 1.0))
+        with histogram.time(stage="place"):
+            pass
+        histogram.observe(0.5, stage="place")
+        self.assertEqual(histogram.count(stage="place"), 2)
+        self.assertEqual(histogram.count(stage="pack"), 0)
+        self.assertIn('test_seconds_bucket{stage="place",le="1.0"} 2', histogram.render())
+
+    def test_timed_stage(self):
+        before = metrics.STAGE_LATENCY.count(stage="test")
+
+        @metrics.timed_stage("test")
+        def work():
+            return 1
+
+        self.assertEqual(work(), 1)
+        self.assertEqual(metrics.STAGE_LATENCY.count(stage="test"), before + 1)
+        self.assertIn("# TYPE api_stage_duration_seconds histogram", metrics.render())
+
+
+if __name__ == "__main__":
+    unittest.main()
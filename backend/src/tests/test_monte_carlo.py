@@ -0,0 +1,40 @@
+import unittest
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src import models
+from src.algorithms import monte_carlo
+from src.database import Base
+from src.routers import simulation
+
+
+class MonteCarloTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        self.db.add(models.Container(name="C1", width=100, height=100, depth=100, max_weight=500, zone="A"))
+        self.db.commit()
+
+    def test_results_name_the_fit_model(self):
+        result = monte_carlo.run_monte_carlo(self.db, trajectories=2, days=3, items_per_day=2,
+                                             random_seed=1, max_workers=1)
+        self.assertEqual(result["fit_model"], monte_carlo.FIT_MODEL)
+        self.assertEqual(len(result["daily_utilization_mean"]), 3)
+
+    def test_items_per_day_must_be_positive(self):
+        for items_per_day in (0, -3):
+            with self.assertRaises(HTTPException) as raised:
+                simulation.run_monte_carlo_simulation(trajectories=2, days=3, items_per_day=items_per_day,
+                                                      random_seed=1, db=self.db)
+            self.assertEqual(raised.exception.status_code, 400)
+            with self.assertRaises(ValueError):
+                monte_carlo.run_monte_carlo(self.db, 2, 3, items_per_day, random_seed=1, max_workers=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src import models
+from src.algorithms.placement_statistics import (
+    HIGH_PRIORITY_THRESHOLD, placement_summary_statement, summarize_placement_rows
+)
+from src.database import Base
+
+
+class PlacementSummaryTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+
+    def summary_rows(self):
+        return self.db.execute(placement_summary_statement()).all()
+
+    def test_counts_on_seeded_tables(self):
+        lab = models.Container(name="Lab", width=2, height=2, depth=2, zone="A", used_volume=2)
+        store = models.Container(name="Store", width=1, height=1, depth=4, zone="B", used_volume=0)
+        self.db.add_all([lab, store])
+        self.db.flush()
+        # (priority, placed in, preferred zone): the threshold itself counts as high priority
+        for priority, container, zone in [
+            (HIGH_PRIORITY_THRESHOLD - 1, lab, "A"),
+            (HIGH_PRIORITY_THRESHOLD, lab, "B"),
+            (HIGH_PRIORITY_THRESHOLD + 20, None, "A"),
+            (HIGH_PRIORITY_THRESHOLD + 10, store, "B"),
+            (10, None, None),
+        ]:
+            self.db.add(models.Item(name=f"P{priority}", priority=priority, preferred_zone=zone,
+                                    is_placed=container is not None,
+                                    container_id=container.id if container else None))
+        self.db.add_all([models.PlacementHistory(success=success) for success in (True, True, False, True)])
+        self.db.commit()
+
+        rows = self.summary_rows()
+        self.assertEqual([row.container_name for row in rows], ["Lab", "Store"])
+        first = rows[0]
+        self.assertEqual((first.total_items, first.placed_items), (5, 3))
+        self.assertEqual((first.high_priority_items, first.placed_high_priority), (3, 2))
+        self.assertEqual((first.total_placements, first.successful_placements), (4, 3))
+        self.assertEqual(first.zone_matches, 2)
+        self.assertEqual([(row.container_volume, row.container_used_volume) for row in rows], [(8, 2), (4, 0)])
+
+        summary = summarize_placement_rows(rows)
+        self.assertEqual(summary["total_items_placed"], 3)
+        self.assertAlmostEqual(summary["priority_satisfaction"], 200 / 3)
+        self.assertAlmostEqual(summary["success_rate"], 75)
+        self.assertAlmostEqual(summary["space_utilization"], 100 * 2 / 12)
+        self.assertEqual([c["utilization_percentage"] for c in summary["container_utilization"]], [25, 0])
+
+    def test_empty_tables_give_one_row_of_zeros(self):
+        rows = self.summary_rows()
+        self.assertEqual(len(rows), 1)
+        row, = rows
+        self.assertEqual((row.total_items, row.placed_items, row.high_priority_items, row.placed_high_priority,
+                          row.total_placements, row.successful_placements, row.zone_matches),
+                         (0, 0, 0, 0, 0, 0, 0))
+        self.assertIsNone(row.container_id)
+
+        summary = summarize_placement_rows(rows)
+        self.assertEqual((summary["total_items_placed"], summary["efficiency"], summary["space_utilization"]),
+                         (0, 0, 0))
+        self.assertEqual(summary["container_utilization"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
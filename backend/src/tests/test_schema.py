@@ -0,0 +1,43 @@
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.database import migrate_schema
+from src.models import Item, SystemConfig
+
+# Committed database, created before Item gained category/status/expiry columns
+OLD_DATABASE = pathlib.Path(__file__).resolve().parents[2] / "space_cargo.db"
+
+
+class MigrateSchemaTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = pathlib.Path(directory.name) / "space_cargo.db"
+        shutil.copy(OLD_DATABASE, path)
+        self.engine = create_engine(f"sqlite:///{path}")
+        self.addCleanup(self.engine.dispose)
+
+    def columns(self, table):
+        with self.engine.connect() as conn:
+            return {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table}")')}
+
+    def test_adds_missing_columns_to_old_schema(self):
+        self.assertNotIn("category", self.columns("items"))
+        migrate_schema(self.engine)
+        migrate_schema(self.engine)  # idempotent
+
+        self.assertTrue({"category", "status", "expiry_date", "consumed_date"} <= self.columns("items"))
+        with Session(self.engine) as db:
+            count = db.query(Item).count()
+            self.assertEqual(db.query(Item).filter(Item.status == "AVAILABLE").count(), count)
+            db.add(SystemConfig(key="current_date", value="2025-01-01"))
+            db.commit()
+
+
+if __name__ == "__main__":
+    unittest.main()
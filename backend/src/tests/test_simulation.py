@@ -0,0 +1,48 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src import models
+from src.database import Base
+from src.routers import simulation
+
+START = datetime(2025, 1, 1)
+
+
+class SimulateDaysTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        self.db.add(models.SystemConfig(key="simulation_date", value=START.isoformat()))
+        # Priority 5 is never consumed, so only the expiry changes the item
+        self.item = models.Item(name="Milk", width=1, height=1, depth=1, weight=1, priority=5,
+                                category="Food", status="AVAILABLE", expiry_date=datetime(2025, 1, 2))
+        self.db.add(self.item)
+        self.db.commit()
+
+    def test_days_commit_status_changes_with_the_date(self):
+        result = simulation.simulate_multiple_days(days=3, random_seed=1, db=self.db)
+        self.assertEqual((result["success"], result["newExpiredItems"]), (True, 1))
+        self.db.expire_all()
+        self.assertEqual(self.db.get(models.Item, self.item.id).status, "EXPIRED")
+        self.assertEqual(simulation.get_simulation_date(self.db), datetime(2025, 1, 4))
+
+    def test_failed_commit_is_reported(self):
+        with mock.patch.object(self.db, "commit", side_effect=RuntimeError("disk I/O error")):
+            with self.assertRaises(HTTPException) as raised:
+                simulation.simulate_multiple_days(days=3, random_seed=1, db=self.db)
+        self.assertEqual(raised.exception.status_code, 500)
+        self.db.expire_all()
+        self.assertEqual(self.db.get(models.Item, self.item.id).status, "AVAILABLE")
+        self.assertEqual(simulation.get_simulation_date(self.db), START)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from unittest import mock
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.dml import Update
+
+from src import models
+from src.crud import unit_of_work
+from src.database import Base
+from src.routers import simulation
+
+
+class RecordingUnitOfWork(unit_of_work.UnitOfWork):
+    """Keeps the unit of work built by ``run_simulation`` and the rows it wrote per flush."""
+    instances = []
+
+    def __init__(self, db):
+        super().__init__(db)
+        self.flushed = []
+        RecordingUnitOfWork.instances.append(self)
+
+    def flush(self):
+        new_items = list(self._new_items)
+        dirty_items = list(self._dirty_items.values())
+        counts = super().flush()
+        self.flushed.append((new_items, dirty_items, snapshot(self.db)))
+        return counts
+
+
+def snapshot(db):
+    items = db.query(models.Item.id, models.Item.name, models.Item.status, models.Item.container_id,
+                     models.Item.position_x, models.Item.position_y, models.Item.position_z)
+    containers = db.query(models.Container.id, models.Container.used_volume, models.Container.used_weight)
+    return sorted(map(tuple, items.all())), sorted(map(tuple, containers.all()))
+
+
+class RunSimulationTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        self.db.add_all([
+            models.Container(name=f"C{i}", width=3, height=3, depth=3, max_weight=500, zone=zone)
+            for i, zone in enumerate("AB")
+        ])
+        self.db.commit()
+        RecordingUnitOfWork.instances = []
+        patcher = mock.patch.object(simulation, "UnitOfWork", RecordingUnitOfWork)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_days(self, days):
+        return simulation.run_simulation(days=days, items_per_day=6, random_seed=7, db=self.db)
+
+    def test_flushes_write_each_day_to_the_right_rows(self):
+        stats = self.run_days(4)
+        uow, = RecordingUnitOfWork.instances
+        self.assertEqual(len(uow.flushed), 4)
+        self.assertGreater(stats["items_placed"], 0)
+        self.assertGreater(stats["items_consumed"], 0)
+
+        # Ids returned by the bulk INSERT belong to the rows built from the same objects
+        inserted = [item for new_items, _, _ in uow.flushed for item in new_items]
+        self.assertEqual(len({item.id for item in inserted}), len(inserted))
+        for item in inserted:
+            row = self.db.get(models.Item, item.id)
+            self.assertEqual((row.name, row.width, row.height, row.depth),
+                             (item.name, item.width, item.height, item.depth))
+
+        # Updates by primary key reach the rows of the changed items and containers only
+        self.db.expire_all()
+        for _, dirty_items, _ in uow.flushed:
+            for item in dirty_items:
+                row = self.db.get(models.Item, item.id)
+                self.assertEqual((row.name, row.container_id, row.position_x, row.position_y, row.position_z),
+                                 (item.name, item.container_id, item.position_x, item.position_y, item.position_z))
+        for container in uow.containers.values():
+            row = self.db.get(models.Container, container.id)
+            self.assertAlmostEqual(row.used_volume, sum(i.width * i.height * i.depth for i in container.items))
+            self.assertAlmostEqual(row.used_weight, sum(i.weight for i in container.items))
+
+        statuses = [row.status for row in self.db.query(models.Item.status)]
+        self.assertEqual(statuses.count("CONSUMED"), stats["items_consumed"])
+        self.assertEqual(statuses.count("placed") + statuses.count("CONSUMED"), stats["items_placed"])
+
+    def test_failed_flush_rolls_back_the_whole_day(self):
+        execute = self.db.execute
+        container_updates = []
+
+        def fail_second_container_update(statement, *args, **kwargs):
+            if isinstance(statement, Update) and statement.table.name == "containers":
+                container_updates.append(statement)
+                if len(container_updates) == 2:
+                    raise RuntimeError("disk I/O error")
+            return execute(statement, *args, **kwargs)
+
+        with mock.patch.object(self.db, "execute", side_effect=fail_second_container_update):
+            with self.assertRaises(HTTPException) as raised:
+                self.run_days(4)
+        self.assertEqual(raised.exception.status_code, 500)
+
+        uow, = RecordingUnitOfWork.instances
+        (_, _, after_first_day), = uow.flushed
+        # The failing day had inserted and updated items before the container update
+        self.assertTrue(uow._new_items and uow._dirty_items)
+        self.db.expire_all()
+        self.assertEqual(snapshot(self.db), after_first_day)
+
+
+if __name__ == "__main__":
+    unittest.main()
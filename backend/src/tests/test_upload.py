@@ -0,0 +1,149 @@
+import io
+import pathlib
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src import models
+from src.database import Base
+from src.metrics import CACHE_LOOKUPS
+from src.routers import upload
+
+ITEM_HEADER = b"item_id,name,width_cm,depth_cm,height_cm,mass_kg,priority\n"
+
+
+def fake_upload(name: str, content: bytes):
+    return types.SimpleNamespace(filename=name, file=io.BytesIO(content))
+
+
+class UploadTestCase(unittest.TestCase):
+    """Points the upload router at an empty temporary data folder."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.data_dir = pathlib.Path(directory.name)
+        # Keep the module's layout relative to the data folder
+        for name, value in {
+            "DATA_DIR": self.data_dir,
+            "INCOMING_DIR": self.data_dir / upload.INCOMING_DIR.relative_to(upload.DATA_DIR),
+            "MANIFEST_PATH": self.data_dir / upload.MANIFEST_PATH.relative_to(upload.DATA_DIR),
+            "_manifest": None,
+        }.items():
+            patcher = mock.patch.object(upload, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def store(self, name: str, content: bytes):
+        return upload.save_csv_to_data_folder(fake_upload(name, content))
+
+
+class ManifestTests(UploadTestCase):
+    def manifest_hits(self) -> float:
+        return CACHE_LOOKUPS.value(cache="upload_manifest", result="hit")
+
+    def test_second_upload_does_not_reconcile(self):
+        self.store("a.csv", b"item_id\n1\n")
+        hits = self.manifest_hits()
+        with mock.patch.object(upload, "calculate_file_hash", wraps=upload.calculate_file_hash) as rehash:
+            path, duplicate = self.store("b.csv", b"item_id\n2\n")
+        self.assertFalse(duplicate)
+        self.assertEqual(self.manifest_hits(), hits + 1)
+        rehash.assert_not_called()
+
+        path, duplicate = self.store("c.csv", b"item_id\n1\n")
+        self.assertTrue(duplicate)
+        self.assertEqual(path.name, "a.csv")
+        self.assertEqual(self.manifest_hits(), hits + 2)
+
+    def test_files_copied_in_by_hand_are_found(self):
+        self.store("a.csv", b"item_id\n1\n")
+        (self.data_dir / "manual.csv").write_bytes(b"item_id\n3\n")
+        path, duplicate = self.store("d.csv", b"item_id\n3\n")
+        self.assertTrue(duplicate)
+        self.assertEqual(path.name, "manual.csv")
+
+
+class UploadCsvTests(UploadTestCase):
+    """Only files that were imported stay in the data folder and the manifest."""
+
+    def setUp(self):
+        super().setUp()
+        engine = create_engine("sqlite://")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+
+    def upload(self, name: str, content: bytes):
+        return upload.upload_csv(file=fake_upload(name, content), db=self.db)
+
+    def assert_not_stored(self):
+        self.assertEqual(list(self.data_dir.glob("*.csv")), [])
+        self.assertEqual(upload._load_manifest()["files"], {})
+
+    def test_header_only_file_is_not_stored(self):
+        with self.assertRaises(HTTPException) as raised:
+            self.upload("items.csv", ITEM_HEADER)
+        self.assertEqual(raised.exception.status_code, 400)
+        self.assert_not_stored()
+
+    def test_failed_import_is_rolled_back(self):
+        bad = ITEM_HEADER + b"1,Food,10,10,10,heavy,5\n"
+        for _ in range(2):
+            with self.assertRaises(HTTPException) as raised:
+                self.upload("items.csv", bad)
+            # Not reported as a duplicate of the file that failed before
+            self.assertEqual(raised.exception.status_code, 500)
+            self.assert_not_stored()
+
+        result = self.upload("items.csv", ITEM_HEADER + b"1,Food,10,10,10,2,5\n")
+        self.assertEqual(result["message"], "Successfully imported 1 items")
+        self.assertEqual(self.db.query(models.Item).count(), 1)
+        self.assertEqual(list(upload._load_manifest()["files"]), ["items.csv"])
+
+
+class WarmLoadTests(UploadTestCase):
+    """The data folder is loaded all or nothing, and marked loaded only on success."""
+
+    def setUp(self):
+        super().setUp()
+        engine = create_engine("sqlite://")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(engine)
+        self.session_factory = sessionmaker(bind=engine)
+        patcher = mock.patch.object(upload, "_warm_loaded", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        (self.data_dir / "containers.csv").write_bytes(
+            b"zone,container_id,width_cm,depth_cm,height_cm\nLab,C1,100,100,100\n")
+
+    def counts(self):
+        with self.session_factory() as db:
+            marker = db.query(models.SystemConfig).filter(models.SystemConfig.key == upload.DATA_VERSION_KEY).first()
+            return db.query(models.Container).count(), db.query(models.Item).count(), marker is not None
+
+    def test_failed_file_skips_the_marker(self):
+        (self.data_dir / "items.csv").write_bytes(ITEM_HEADER + b"1,Food,10,10,10,heavy,5\n")
+        with self.session_factory() as db:
+            loaded = upload.load_data_from_folder(db)
+        self.assertEqual(loaded["failed"], ["items.csv"])
+
+        upload.warm_load_data_folder(self.session_factory)
+        self.assertEqual(self.counts(), (0, 0, False))
+
+        # The next start loads the repaired folder
+        (self.data_dir / "items.csv").write_bytes(ITEM_HEADER + b"1,Food,10,10,10,2,5\n")
+        upload._warm_loaded = False
+        upload.warm_load_data_folder(self.session_factory)
+        self.assertEqual(self.counts(), (1, 1, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
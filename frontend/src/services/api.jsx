@@ -61,6 +61,12 @@ const apiService = {
     },
     processData: () => API.post('/placement/process/'),
     getResults: () => API.get('/placement/results/'),
+    // Packed box geometry (see backend/placement/geometry.py); pass { minSize, containerIds }
+    getGeometry: ({ minSize, containerIds } = {}) => API.get('/placement/geometry/', {
+      params: { min_size: minSize, container_id: containerIds },
+      paramsSerializer: { indexes: null },
+      responseType: 'arraybuffer'
+    }),
     getRecommendations: () => API.get('/placement/recommendations/'),
     placeItem: (itemId, containerId, userId = 'system') => API.post('/placement/place/', {
       item_id: itemId,